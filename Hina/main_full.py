@@ -9,14 +9,23 @@ from __future__ import annotations
 
 import asyncio
 import importlib
+import inspect
 import logging
 import time
 import signal
+import sys
 from typing import Optional, Iterable
 
 from Hina import config as cfg
 from Hina.modules import ALL_MODULES
 from Hina.modules.helper_funcs.misc import paginate_modules
+from Hina.modules.sql import users_sql
+from Hina.modules.sql.chat_config_sql import migrate_chat_config
+from Hina.modules.helper_funcs import broadcast_jobs, exchange_rates, http_client, image_pipeline, response_cache
+from Hina.modules.helper_funcs.regex_helper import sandbox as regex_sandbox
+from Hina.modules.helper_funcs.send_scheduler import scheduler as send_scheduler
+from Hina.modules.helper_funcs.spamwatch_client import sw
+from Hina.modules.helper_funcs.text_view import TEXT_VIEW_GROUP, prepare_text_view
 
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.constants import ParseMode
@@ -293,20 +302,33 @@ async def migrate_chats(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if getattr(msg, "migrate_to_chat_id", None):
         for mod in cfg.MIGRATEABLE:
             try:
-                mod.__migrate__(msg.chat.id, msg.migrate_to_chat_id)
+                result = mod.__migrate__(msg.chat.id, msg.migrate_to_chat_id)
+                if inspect.isawaitable(result):
+                    await result
             except Exception:
                 LOGGER.exception("Module migration failed for %s", getattr(mod, "__mod_name__", str(mod)))
+        migrate_chat_config(msg.chat.id, msg.migrate_to_chat_id)
         LOGGER.info("Migrated chat %s to %s", msg.chat.id, msg.migrate_to_chat_id)
 
+async def initialize_sql_modules():
+    """Create tables and warm the in-memory caches of every loaded sql module."""
+    for name, module in list(sys.modules.items()):
+        if not name.startswith("Hina.modules.sql.") or not hasattr(module, "initialize"):
+            continue
+        try:
+            await module.initialize()
+        except Exception:
+            LOGGER.exception("Failed to initialize %s", name)
+
 async def ensure_bot_in_db(bot):
     # Placeholder: implement DB logic if you have a persistence layer.
     LOGGER.debug("ensure_bot_in_db called (no-op).")
     return
 
 # --- Register core handlers if modules didn't already ---
-def _safe_add_handler(handler):
+def _safe_add_handler(handler, group=0):
     try:
-        app.add_handler(handler)
+        app.add_handler(handler, group)
     except Exception:
         LOGGER.exception("Failed to add handler: %s", handler)
 
@@ -329,6 +351,7 @@ _safe_add_handler(CallbackQueryHandler(help_button, pattern=r"help_.*"))
 _safe_add_handler(CallbackQueryHandler(settings_button, pattern=r"stngs_.*"))
 _safe_add_handler(CommandHandler("donate", donate))
 _safe_add_handler(MessageHandler(filters.StatusUpdate.MIGRATE, migrate_chats))
+_safe_add_handler(MessageHandler(filters.ChatType.GROUPS, prepare_text_view), TEXT_VIEW_GROUP)
 # Global error handler
 app.add_error_handler(error_callback)
 
@@ -349,6 +372,13 @@ async def _stop_telethon():
         except Exception:
             LOGGER.exception("Failed to disconnect Telethon client.")
 
+async def _flush_user_updates():
+    try:
+        await users_sql.stop_write_behind()
+        LOGGER.info("Pending user updates flushed.")
+    except Exception:
+        LOGGER.exception("Failed to flush pending user updates.")
+
 async def _stop_ptb():
     try:
         await app.stop()
@@ -372,7 +402,16 @@ async def _shutdown_signal():
     _shutdown_in_progress = True
     LOGGER.info("Shutdown initiated.")
     await _stop_telethon()
+    await broadcast_jobs.stop_jobs()
     await _stop_ptb()
+    await _flush_user_updates()
+    await exchange_rates.stop_rate_refresh()
+    await sw.stop_mirror()
+    await send_scheduler.stop()
+    await http_client.close()
+    response_cache.save()
+    image_pipeline.shutdown()
+    regex_sandbox.shutdown()
     LOGGER.info("Shutdown complete. Exiting.")
     try:
         asyncio.get_event_loop().stop()
@@ -384,8 +423,21 @@ async def main():
     # Set compat bot pointer for modules
     if hasattr(app, "bot"):
         cfg.set_app_bot(app.bot)
+    # Load settings caches (flood settings, blacklists, filters, ...) before polling
+    await initialize_sql_modules()
     # Ensure bot is recorded in DB if necessary
     await ensure_bot_in_db(app.bot)
+    # Batched write-behind for per-message user tracking
+    users_sql.start_write_behind()
+    # Periodic exchange rate table for /cash
+    exchange_rates.start_rate_refresh()
+    # Local SpamWatch ban list, when SPAMWATCH_MIRROR is set
+    sw.start_mirror()
+    # Broadcasts interrupted by the last shutdown carry on from their checkpoint
+    try:
+        await broadcast_jobs.resume_jobs(app.bot)
+    except Exception:
+        LOGGER.exception("Failed to resume broadcasts.")
     # Support chat notification
     if cfg.SUPPORT_CHAT:
         try:
@@ -414,7 +466,8 @@ async def main():
         except Exception:
             LOGGER.exception("Failed to start Telethon.")
     # Run PTB polling as a task (this returns when stop is called)
-    ptb_task = asyncio.create_task(app.run_polling())
+    # chat_member updates are not delivered unless explicitly requested
+    ptb_task = asyncio.create_task(app.run_polling(allowed_updates=Update.ALL_TYPES))
     # Register signals
     _register_signal_handlers(asyncio.get_event_loop())
     # Wait for tasks
@@ -429,7 +482,16 @@ async def main():
         LOGGER.info("Main finishing, attempting graceful shutdown.")
         if telethon_task:
             await _stop_telethon()
+        await broadcast_jobs.stop_jobs()
         await _stop_ptb()
+        await _flush_user_updates()
+        await exchange_rates.stop_rate_refresh()
+        await sw.stop_mirror()
+        await send_scheduler.stop()
+        await http_client.close()
+        response_cache.save()
+        image_pipeline.shutdown()
+        regex_sandbox.shutdown()
 
 if __name__ == "__main__":
     try:
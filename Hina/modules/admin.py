@@ -4,7 +4,7 @@ import html
 from telegram import Update
 from telegram.constants import ParseMode
 from telegram.error import BadRequest
-from telegram.ext import ContextTypes, CommandHandler, filters
+from telegram.ext import ChatMemberHandler, ContextTypes, CommandHandler, filters
 from telegram.helpers import mention_html
 from contextlib import asynccontextmanager
 from Hina.config import DRAGONS, app
@@ -15,7 +15,9 @@ from Hina.modules.helper_funcs.chat_status import (
     can_promote,
     connection_status,
     user_admin,
-    ADMIN_CACHE,
+    admin_cache_member_update,
+    bot_member_cache_update,
+    refresh_admin_cache,
 )
 from Hina.modules.helper_funcs.extraction import (
     extract_user,
@@ -182,10 +184,7 @@ async def demote(update: Update, context: ContextTypes.DEFAULT_TYPE) -> str:
 # --- REFRESH ADMIN CACHE ---
 @user_admin
 async def refresh_admin(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    try:
-        ADMIN_CACHE.pop(update.effective_chat.id)
-    except KeyError:
-        pass
+    await refresh_admin_cache(update.effective_chat.id)
 
     await update.effective_message.reply_text("Admins cache refreshed!")
 
@@ -458,7 +457,9 @@ def setup_admin_handlers():
         DisableAbleCommandHandler("demote", demote, filters=filters.ChatType.GROUPS),
         CommandHandler("invitelink", invite, filters=filters.ChatType.GROUPS),
         CommandHandler("title", set_title, filters=filters.ChatType.GROUPS),
-        CommandHandler("admincache", refresh_admin, filters=filters.ChatType.GROUPS)
+        CommandHandler("admincache", refresh_admin, filters=filters.ChatType.GROUPS),
+        ChatMemberHandler(admin_cache_member_update, ChatMemberHandler.CHAT_MEMBER),
+        ChatMemberHandler(bot_member_cache_update, ChatMemberHandler.MY_CHAT_MEMBER),
     ]
     
     for handler in handlers:
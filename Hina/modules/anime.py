@@ -1,15 +1,14 @@
-from Hina.config import app
+from Hina.config import app, LOGGER
 import datetime
 import html
 import textwrap
+import urllib.parse
 
 import bs4
-import jikanpy
-import requests
 from Hina.modules.disable import DisableAbleCommandHandler
+from Hina.modules.helper_funcs import http_client, response_cache
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update, Message
 from telegram.constants import ParseMode
-from telegram.constants import ParseMode
 from telegram.ext import ContextTypes
 
 info_btn = "More Information"
@@ -160,6 +159,40 @@ query ($id: Int,$search: String) {
 """
 
 url = "https://graphql.anilist.co"
+jikan_url = "https://api.jikan.moe/v4"
+
+
+class AniListError(Exception):
+    """AniList answered with an error payload; it is handed back but never cached."""
+
+    def __init__(self, payload: dict) -> None:
+        super().__init__(payload.get("errors"))
+        self.payload = payload
+
+
+async def anilist(name: str, query: str, variables: dict, source: str = "anilist") -> dict:
+    """Run an AniList query, sharing the response with identical lookups.
+
+    Failures (not found, rate limits, outages) come back as an "errors" payload
+    and are never cached, so the next lookup asks AniList again.
+    """
+    async def fetch():
+        payload = await http_client.post_json(
+            url, json={"query": query, "variables": variables},
+        )
+        if "errors" in payload:
+            raise AniListError(payload)
+        return payload
+
+    try:
+        return await response_cache.cached(source, (name, variables), fetch)
+    except AniListError as excp:
+        return excp.payload
+    except http_client.HTTPError as excp:
+        response = getattr(excp, "response", None)
+        if response is None or response.status_code != 404:
+            LOGGER.warning("AniList %s lookup failed: %s", name, excp)
+        return {"errors": [{"message": str(excp)}]}
 
 def extract_arg(message: Message):
     split = message.text.split(" ", 1)
@@ -170,18 +203,20 @@ def extract_arg(message: Message):
         return reply.text
     return None
 
-def airing(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def airing(update: Update, context: ContextTypes.DEFAULT_TYPE):
     message = update.effective_message
     search_str = extract_arg(message)
     if not search_str:
-        update.effective_message.reply_text(
+        await update.effective_message.reply_text(
             "Tell Anime Name :) ( /airing <anime name>)",
         )
         return
     variables = {"search": search_str}
-    response = requests.post(
-        url, json={"query": airing_query, "variables": variables},
-    ).json()["data"]["Media"]
+    json = await anilist("airing", airing_query, variables, source="airing")
+    if "errors" in json.keys():
+        await update.effective_message.reply_text("Anime not found")
+        return
+    response = json["data"]["Media"]
     msg = f"*Name*: *{response['title']['romaji']}*(`{response['title']['native']}`)\n*ID*: `{response['id']}`"
     if response["nextAiringEpisode"]:
         time = response["nextAiringEpisode"]["timeUntilAiring"] * 1000
@@ -189,21 +224,19 @@ def airing(update: Update, context: ContextTypes.DEFAULT_TYPE):
         msg += f"\n*Episode*: `{response['nextAiringEpisode']['episode']}`\n*Airing In*: `{time}`"
     else:
         msg += f"\n*Episode*:{response['episodes']}\n*Status*: `N/A`"
-    update.effective_message.reply_text(msg, parse_mode=ParseMode.MARKDOWN)
+    await update.effective_message.reply_text(msg, parse_mode=ParseMode.MARKDOWN)
 
 
-def anime(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def anime(update: Update, context: ContextTypes.DEFAULT_TYPE):
     message = update.effective_message
     search = extract_arg(message)
     if not search:
-        update.effective_message.reply_text("Format : /anime < anime name >")
+        await update.effective_message.reply_text("Format : /anime < anime name >")
         return
     variables = {"search": search}
-    json = requests.post(
-        url, json={"query": anime_query, "variables": variables},
-    ).json()
+    json = await anilist("anime", anime_query, variables)
     if "errors" in json.keys():
-        update.effective_message.reply_text("Anime not found")
+        await update.effective_message.reply_text("Anime not found")
         return
     if json:
         json = json["data"]["Media"]
@@ -242,7 +275,7 @@ def anime(update: Update, context: ContextTypes.DEFAULT_TYPE):
             buttons = [[InlineKeyboardButton("More Info", url=info)]]
         if image:
             try:
-                update.effective_message.reply_photo(
+                await update.effective_message.reply_photo(
                     photo=image,
                     caption=msg,
                     parse_mode=ParseMode.MARKDOWN,
@@ -250,31 +283,29 @@ def anime(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 )
             except:
                 msg += f" [〽️]({image})"
-                update.effective_message.reply_text(
+                await update.effective_message.reply_text(
                     msg,
                     parse_mode=ParseMode.MARKDOWN,
                     reply_markup=InlineKeyboardMarkup(buttons),
                 )
         else:
-            update.effective_message.reply_text(
+            await update.effective_message.reply_text(
                 msg,
                 parse_mode=ParseMode.MARKDOWN,
                 reply_markup=InlineKeyboardMarkup(buttons),
             )
 
 
-def character(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def character(update: Update, context: ContextTypes.DEFAULT_TYPE):
     message = update.effective_message
     search = extract_arg(message)
     if not search:
-        update.effective_message.reply_text("Format : /character < character name >")
+        await update.effective_message.reply_text("Format : /character < character name >")
         return
     variables = {"query": search}
-    json = requests.post(
-        url, json={"query": character_query, "variables": variables},
-    ).json()
+    json = await anilist("character", character_query, variables)
     if "errors" in json.keys():
-        update.effective_message.reply_text("Character not found")
+        await update.effective_message.reply_text("Character not found")
         return
     if json:
         json = json["data"]["Character"]
@@ -285,30 +316,28 @@ def character(update: Update, context: ContextTypes.DEFAULT_TYPE):
         image = json.get("image", None)
         if image:
             image = image.get("large")
-            update.effective_message.reply_photo(
+            await update.effective_message.reply_photo(
                 photo=image,
                 caption=msg.replace("<b>", "</b>"),
                 parse_mode=ParseMode.MARKDOWN,
             )
         else:
-            update.effective_message.reply_text(
+            await update.effective_message.reply_text(
                 msg.replace("<b>", "</b>"), parse_mode=ParseMode.MARKDOWN,
             )
 
 
-def manga(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def manga(update: Update, context: ContextTypes.DEFAULT_TYPE):
     message = update.effective_message
     search = extract_arg(message)
     if not search:
-        update.effective_message.reply_text("Format : /manga < manga name >")
+        await update.effective_message.reply_text("Format : /manga < manga name >")
         return
     variables = {"search": search}
-    json = requests.post(
-        url, json={"query": manga_query, "variables": variables},
-    ).json()
+    json = await anilist("manga", manga_query, variables)
     msg = ""
     if "errors" in json.keys():
-        update.effective_message.reply_text("Manga not found")
+        await update.effective_message.reply_text("Manga not found")
         return
     if json:
         json = json["data"]["Media"]
@@ -340,7 +369,7 @@ def manga(update: Update, context: ContextTypes.DEFAULT_TYPE):
         msg += f"_{json.get('description', None)}_"
         if image:
             try:
-                update.effective_message.reply_photo(
+                await update.effective_message.reply_photo(
                     photo=image,
                     caption=msg,
                     parse_mode=ParseMode.MARKDOWN,
@@ -348,42 +377,41 @@ def manga(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 )
             except:
                 msg += f" [〽️]({image})"
-                update.effective_message.reply_text(
+                await update.effective_message.reply_text(
                     msg,
                     parse_mode=ParseMode.MARKDOWN,
                     reply_markup=InlineKeyboardMarkup(buttons),
                 )
         else:
-            update.effective_message.reply_text(
+            await update.effective_message.reply_text(
                 msg,
                 parse_mode=ParseMode.MARKDOWN,
                 reply_markup=InlineKeyboardMarkup(buttons),
             )
 
 
-def user(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def user(update: Update, context: ContextTypes.DEFAULT_TYPE):
     message = update.effective_message
     search_query = extract_arg(message)
 
     if not search_query:
-        update.effective_message.reply_text("Format : /user <username>")
+        await update.effective_message.reply_text("Format : /user <username>")
         return
 
-    jikan = jikanpy.jikan.Jikan()
-
-    try:
-        us = jikan.user(search_query)
-    except jikanpy.APIException:
-        update.effective_message.reply_text("Username not found.")
+    response = await http_client.get(
+        f"{jikan_url}/users/{urllib.parse.quote(search_query, safe='')}/full"
+    )
+    if response.status_code != 200:
+        await update.effective_message.reply_text("Username not found.")
         return
+    us = response.json()["data"]
 
-    progress_message = update.effective_message.reply_text("Searching.... ")
+    progress_message = await update.effective_message.reply_text("Searching.... ")
 
     date_format = "%Y-%m-%d"
-    if us["image_url"] is None:
+    img = (us.get("images") or {}).get("jpg", {}).get("image_url")
+    if img is None:
         img = "https://cdn.myanimelist.net/images/questionmark_50.gif"
-    else:
-        img = us["image_url"]
 
     try:
         user_birthday = datetime.datetime.fromisoformat(us["birthday"])
@@ -391,14 +419,20 @@ def user(update: Update, context: ContextTypes.DEFAULT_TYPE):
     except:
         user_birthday_formatted = "Unknown"
 
-    user_joined_date = datetime.datetime.fromisoformat(us["joined"])
-    user_joined_date_formatted = user_joined_date.strftime(date_format)
+    try:
+        user_joined_date = datetime.datetime.fromisoformat(us["joined"])
+        user_joined_date_formatted = user_joined_date.strftime(date_format)
+    except (TypeError, ValueError):
+        user_joined_date_formatted = "Unknown"
+    statistics = us.get("statistics") or {}
+    days_watched = (statistics.get("anime") or {}).get("days_watched", "Unknown")
+    days_read = (statistics.get("manga") or {}).get("days_read", "Unknown")
 
     for entity in us:
         if us[entity] is None:
             us[entity] = "Unknown"
 
-    about = us["about"].split(" ", 60)
+    about = (us.get("about") or "Unknown").split(" ", 60)
 
     try:
         about.pop(60)
@@ -417,8 +451,8 @@ def user(update: Update, context: ContextTypes.DEFAULT_TYPE):
     *Gender*: `{us['gender']}`
     *Birthday*: `{user_birthday_formatted}`
     *Joined*: `{user_joined_date_formatted}`
-    *Days wasted watching anime*: `{us['anime_stats']['days_watched']}`
-    *Days wasted reading manga*: `{us['manga_stats']['days_read']}`
+    *Days wasted watching anime*: `{days_watched}`
+    *Days wasted reading manga*: `{days_read}`
 
     """,
     )
@@ -434,21 +468,29 @@ def user(update: Update, context: ContextTypes.DEFAULT_TYPE):
         ],
     ]
 
-    update.effective_message.reply_photo(
+    await update.effective_message.reply_photo(
         photo=img,
         caption=caption,
         parse_mode=ParseMode.MARKDOWN,
         reply_markup=InlineKeyboardMarkup(buttons),
         disable_web_page_preview=False,
     )
-    progress_message.delete()
+    await progress_message.delete()
 
 
-def upcoming(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    jikan = jikanpy.jikan.Jikan()
-    upcomin = jikan.top("anime", page=1, subtype="upcoming")
+async def upcoming(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    try:
+        upcomin = await response_cache.cached(
+            "jikan",
+            ("upcoming",),
+            lambda: http_client.get_json(f"{jikan_url}/top/anime", params={"filter": "upcoming"}),
+        )
+    except http_client.HTTPError as excp:
+        LOGGER.warning("Jikan upcoming lookup failed: %s", excp)
+        await update.effective_message.reply_text("Couldn't fetch upcoming anime right now, try again later.")
+        return
 
-    upcoming_list = [entry["title"] for entry in upcomin["top"]]
+    upcoming_list = [entry["title"] for entry in upcomin.get("data", [])]
     upcoming_message = ""
 
     for entry_num in range(len(upcoming_list)):
@@ -456,21 +498,21 @@ def upcoming(update: Update, context: ContextTypes.DEFAULT_TYPE):
             break
         upcoming_message += f"{entry_num + 1}. {upcoming_list[entry_num]}\n"
 
-    update.effective_message.reply_text(upcoming_message)
+    await update.effective_message.reply_text(upcoming_message)
 
 
-def site_search(update: Update, context: ContextTypes.DEFAULT_TYPE, site: str):
+async def site_search(update: Update, context: ContextTypes.DEFAULT_TYPE, site: str):
     message = update.effective_message
     search_query = extract_arg(message)
     more_results = True
 
     if not search_query:
-        message.reply_text("Give something to search")
+        await message.reply_text("Give something to search")
         return
 
     if site == "kaizoku":
         search_url = f"https://animekaizoku.com/?s={search_query}"
-        html_text = requests.get(search_url).text
+        html_text = await http_client.get_text(search_url)
         soup = bs4.BeautifulSoup(html_text, "html.parser")
         search_result = soup.find_all("h2", {"class": "post-title"})
 
@@ -486,7 +528,7 @@ def site_search(update: Update, context: ContextTypes.DEFAULT_TYPE, site: str):
 
     elif site == "kayo":
         search_url = f"https://animekayo.com/?s={search_query}"
-        html_text = requests.get(search_url).text
+        html_text = await http_client.get_text(search_url)
         soup = bs4.BeautifulSoup(html_text, "html.parser")
         search_result = soup.find_all("h2", {"class": "title"})
 
@@ -505,24 +547,24 @@ def site_search(update: Update, context: ContextTypes.DEFAULT_TYPE, site: str):
     buttons = [[InlineKeyboardButton("See all results", url=search_url)]]
 
     if more_results:
-        message.reply_text(
+        await message.reply_text(
             result,
             parse_mode=ParseMode.HTML,
             reply_markup=InlineKeyboardMarkup(buttons),
             disable_web_page_preview=True,
         )
     else:
-        message.reply_text(
+        await message.reply_text(
             result, parse_mode=ParseMode.HTML, disable_web_page_preview=True,
         )
 
 
-def kaizoku(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    site_search(update, context, "kaizoku")
+async def kaizoku(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await site_search(update, context, "kaizoku")
 
 
-def kayo(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    site_search(update, context, "kayo")
+async def kayo(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await site_search(update, context, "kayo")
 
 
 __help__ = """
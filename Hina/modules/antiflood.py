@@ -15,10 +15,13 @@ from Hina.modules.helper_funcs.chat_status import (
 )
 from Hina.modules.log_channel import loggable
 from Hina.modules.sql import antiflood_sql as sql
+from Hina.modules.sql.chat_config_sql import get_chat_config
+from Hina.modules.sql.chat_features_sql import Feature
 from telegram.error import BadRequest
 from telegram.ext import filters
 from telegram.ext import ContextTypes, CallbackQueryHandler, CommandHandler, MessageHandler, BaseHandler
 from telegram.helpers import mention_html
+from Hina.modules.helper_funcs.filters import ChatFeature
 from Hina.modules.helper_funcs.string_handling import extract_time
 from Hina.modules.connection import connected
 from Hina.modules.helper_funcs.alternate import send_message
@@ -36,17 +39,20 @@ async def check_flood(update: Update, context: ContextTypes.DEFAULT_TYPE) -> str
         return ""
 
     if await is_user_admin(chat, user.id) or user.id in WOLVES or user.id in TIGERS:
-        sql.update_flood(chat.id, None)
+        await sql.update_flood(chat.id, None)
         return ""
     if is_approved(chat.id, user.id):
-        sql.update_flood(chat.id, None)
-        return
-    should_ban = sql.update_flood(chat.id, user.id)
+        await sql.update_flood(chat.id, None)
+        return ""
+    # timed flood first, so the window keeps counting even when the consecutive check fires
+    flooded_window = sql.update_flood_window(chat.id, user.id)
+    should_ban = await sql.update_flood(chat.id, user.id) or flooded_window
     if not should_ban:
         return ""
 
     try:
-        getmode, getvalue = sql.get_flood_setting(chat.id)
+        config = await get_chat_config(chat.id)
+        getmode, getvalue = config.flood_type, config.flood_value
         if getmode == 1:
             await chat.ban_member(user.id)
             execstrings = "Banned"
@@ -218,6 +224,73 @@ async def set_flood(update: Update, context: ContextTypes.DEFAULT_TYPE) -> str:
     return ""
 
 
+def _parse_seconds(value: str) -> int:
+    """Parse '30', '30s', '5m' or '1h' into seconds; 0 if invalid"""
+    value = value.lower()
+    multipliers = {"s": 1, "m": 60, "h": 3600}
+    if value[-1:] in multipliers:
+        value, unit = value[:-1], multipliers[value[-1]]
+    else:
+        unit = 1
+    return int(value) * unit if value.isdigit() else 0
+
+
+@user_admin
+@loggable
+async def set_flood_timer(update: Update, context: ContextTypes.DEFAULT_TYPE) -> str:
+    chat = update.effective_chat
+    user = update.effective_user
+    message = update.effective_message
+    args = context.args
+
+    conn = await connected(context.bot, update, chat, user.id, need_admin=True)
+    if conn:
+        chat_id = conn
+        chat_name = (await app.bot.getChat(conn)).title
+    else:
+        if update.effective_message.chat.type == "private":
+            await send_message(
+                update.effective_message,
+                "This command is meant to use in group not in PM",
+            )
+            return ""
+        chat_id = update.effective_chat.id
+        chat_name = update.effective_message.chat.title
+
+    if len(args) == 1 and args[0].lower() in ["off", "no", "0"]:
+        await sql.set_flood_timer(chat_id, 0, 0)
+        await message.reply_text("Timed antiflood has been disabled.")
+        return (
+            f"<b>{html.escape(chat_name)}:</b>"
+            "\n#SETFLOODTIMER"
+            f"\n<b>Admin:</b> {mention_html(user.id, html.escape(user.first_name))}"
+            "\nDisabled timed antiflood."
+        )
+
+    if len(args) != 2 or not args[0].isdigit():
+        await message.reply_text(
+            "Use `/setfloodtimer <count> <duration>` (e.g. `/setfloodtimer 10 30s`) or `/setfloodtimer off`.",
+            parse_mode="markdown",
+        )
+        return ""
+
+    count, seconds = int(args[0]), _parse_seconds(args[1])
+    if count <= 1 or not seconds:
+        await message.reply_text("Count must be greater than 1 and duration must be like 30s, 5m or 1h.")
+        return ""
+
+    await sql.set_flood_timer(chat_id, count, seconds)
+    await message.reply_text(
+        f"Members sending {count} messages within {args[1]} will be restricted in {chat_name}.",
+    )
+    return (
+        f"<b>{html.escape(chat_name)}:</b>"
+        "\n#SETFLOODTIMER"
+        f"\n<b>Admin:</b> {mention_html(user.id, html.escape(user.first_name))}"
+        f"\nSet timed antiflood to <code>{count}</code> messages in <code>{args[1]}</code>."
+    )
+
+
 async def flood(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat = update.effective_chat
     user = update.effective_user
@@ -255,6 +328,12 @@ async def flood(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 f"I'm currently restricting members after {limit} consecutive messages.",
             )
 
+    count, seconds = sql.get_flood_timer(chat_id)
+    if count:
+        await msg.reply_text(
+            f"Members sending {count} messages within {seconds} seconds are restricted too.",
+        )
+
 
 @user_admin
 async def set_flood_mode(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -362,13 +441,14 @@ def __chat_settings__(chat_id, user_id):
 
 # Handlers
 FLOOD_BAN_HANDLER = MessageHandler(
-    filters.ALL & ~filters.StatusUpdate.ALL & filters.ChatType.GROUPS, 
+    filters.ALL & ~filters.StatusUpdate.ALL & filters.ChatType.GROUPS & ChatFeature(Feature.FLOOD),
     check_flood
 )
 FLOOD_QUERY_HANDLER = CallbackQueryHandler(flood_button, pattern=r"unmute_flooder_")
 SET_FLOOD_HANDLER = CommandHandler("setflood", set_flood, filters=filters.ChatType.GROUPS)
 FLOOD_HANDLER = CommandHandler("flood", flood, filters=filters.ChatType.GROUPS)
 SET_FLOOD_MODE_HANDLER = CommandHandler("setfloodmode", set_flood_mode, filters=filters.ChatType.GROUPS)
+SET_FLOOD_TIMER_HANDLER = CommandHandler("setfloodtimer", set_flood_timer, filters=filters.ChatType.GROUPS)
 
 def setup_antiflood_handlers(application):
     """Register antiflood handlers"""
@@ -376,6 +456,7 @@ def setup_antiflood_handlers(application):
     application.add_handler(FLOOD_QUERY_HANDLER)
     application.add_handler(SET_FLOOD_HANDLER)
     application.add_handler(SET_FLOOD_MODE_HANDLER)
+    application.add_handler(SET_FLOOD_TIMER_HANDLER)
     application.add_handler(FLOOD_HANDLER)
 
 __mod_name__ = "Anti-Flood"
@@ -387,6 +468,7 @@ Prevent spam by restricting users who send too many consecutive messages.
 *Commands:*
 • `/flood` - Check current flood settings
 • `/setflood <number/off>` - Set message limit (e.g. `/setflood 10`)
+• `/setfloodtimer <count> <duration/off>` - Limit messages per time window (e.g. `/setfloodtimer 10 30s`)
 • `/setfloodmode <action>` - Set punishment:
   `ban`/`kick`/`mute`/`tban 30m`/`tmute 1h`
 
@@ -400,6 +482,7 @@ __handlers__ = [
     SET_FLOOD_HANDLER,
     FLOOD_HANDLER,
     SET_FLOOD_MODE_HANDLER,
+    SET_FLOOD_TIMER_HANDLER,
     FLOOD_QUERY_HANDLER
 ]
 
@@ -1,4 +1,4 @@
-from Hina.config import app
+from Hina.config import DRAGONS, app
 import html
 from Hina.modules.disable import DisableAbleCommandHandler
 from Hina.modules.helper_funcs.extraction import extract_user
@@ -14,35 +14,35 @@ from telegram.error import BadRequest
 APPROVE_GROUP = 9
 @loggable
 @user_admin
-def approve(update, context):
+async def approve(update, context):
     message = update.effective_message
     chat_title = message.chat.title
     chat = update.effective_chat
     args = context.args
     user = update.effective_user
-    user_id = extract_user(message, args)
+    user_id = await extract_user(message, args)
     if not user_id:
-        message.reply_text(
+        await message.reply_text(
             "I don't know who you're talking about, you're going to need to specify a user!",
         )
         return ""
     try:
-        member = chat.get_member(user_id)
+        member = await chat.get_member(user_id)
     except BadRequest:
         return ""
     if member.status == "administrator" or member.status == "creator":
-        message.reply_text(
+        await message.reply_text(
             "User is already admin - locks, blocklists, and antiflood already don't apply to them.",
         )
         return ""
     if sql.is_approved(message.chat_id, user_id):
-        message.reply_text(
+        await message.reply_text(
             f"[{member.user['first_name']}](tg://user?id={member.user['id']}) is already approved in {chat_title}",
             parse_mode=ParseMode.MARKDOWN,
         )
         return ""
-    sql.approve(message.chat_id, user_id)
-    message.reply_text(
+    await sql.approve(message.chat_id, user_id)
+    await message.reply_text(
         f"[{member.user['first_name']}](tg://user?id={member.user['id']}) has been approved in {chat_title}! They will now be ignored by automated admin actions like locks, blocklists, and antiflood.",
         parse_mode=ParseMode.MARKDOWN,
     )
@@ -58,30 +58,30 @@ def approve(update, context):
 
 @loggable
 @user_admin
-def disapprove(update, context):
+async def disapprove(update, context):
     message = update.effective_message
     chat_title = message.chat.title
     chat = update.effective_chat
     args = context.args
     user = update.effective_user
-    user_id = extract_user(message, args)
+    user_id = await extract_user(message, args)
     if not user_id:
-        message.reply_text(
+        await message.reply_text(
             "I don't know who you're talking about, you're going to need to specify a user!",
         )
         return ""
     try:
-        member = chat.get_member(user_id)
+        member = await chat.get_member(user_id)
     except BadRequest:
         return ""
     if member.status == "administrator" or member.status == "creator":
-        message.reply_text("This user is an admin, they can't be unapproved.")
+        await message.reply_text("This user is an admin, they can't be unapproved.")
         return ""
     if not sql.is_approved(message.chat_id, user_id):
-        message.reply_text(f"{member.user['first_name']} isn't approved yet!")
+        await message.reply_text(f"{member.user['first_name']} isn't approved yet!")
         return ""
-    sql.disapprove(message.chat_id, user_id)
-    message.reply_text(
+    await sql.disapprove(message.chat_id, user_id)
+    await message.reply_text(
         f"{member.user['first_name']} is no longer approved in {chat_title}.",
     )
     log_message = (
@@ -95,50 +95,50 @@ def disapprove(update, context):
 
 
 @user_admin
-def approved(update, context):
+async def approved(update, context):
     message = update.effective_message
     chat_title = message.chat.title
     chat = update.effective_chat
     msg = "The following users are approved.\n"
-    approved_users = sql.list_approved(message.chat_id)
+    approved_users = await sql.list_approved(message.chat_id)
     for i in approved_users:
-        member = chat.get_member(int(i.user_id))
+        member = await chat.get_member(int(i.user_id))
         msg += f"- `{i.user_id}`: {member.user['first_name']}\n"
     if msg.endswith("approved.\n"):
-        message.reply_text(f"No users are approved in {chat_title}.")
+        await message.reply_text(f"No users are approved in {chat_title}.")
         return ""
     else:
-        message.reply_text(msg, parse_mode=ParseMode.MARKDOWN)
+        await message.reply_text(msg, parse_mode=ParseMode.MARKDOWN)
 
 
 @user_admin
-def approval(update, context):
+async def approval(update, context):
     message = update.effective_message
     chat = update.effective_chat
     args = context.args
-    user_id = extract_user(message, args)
-    member = chat.get_member(int(user_id))
+    user_id = await extract_user(message, args)
+    member = await chat.get_member(int(user_id))
     if not user_id:
-        message.reply_text(
+        await message.reply_text(
             "I don't know who you're talking about, you're going to need to specify a user!",
         )
         return ""
     if sql.is_approved(message.chat_id, user_id):
-        message.reply_text(
+        await message.reply_text(
             f"{member.user['first_name']} is an approved user. Locks, antiflood, and blocklists won't apply to them.",
         )
     else:
-        message.reply_text(
+        await message.reply_text(
             f"{member.user['first_name']} is not an approved user. They are affected by normal commands.",
         )
 
 
-def unapproveall(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def unapproveall(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat = update.effective_chat
     user = update.effective_user
-    member = chat.get_member(user.id)
+    member = await chat.get_member(user.id)
     if member.status != "creator" and user.id not in DRAGONS:
-        update.effective_message.reply_text(
+        await update.effective_message.reply_text(
             "Only the chat owner can unapprove all users at once.",
         )
     else:
@@ -156,43 +156,50 @@ def unapproveall(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 ],
             ],
         )
-        update.effective_message.reply_text(
+        await update.effective_message.reply_text(
             f"Are you sure you would like to unapprove ALL users in {chat.title}? This action cannot be undone.",
             reply_markup=buttons,
             parse_mode=ParseMode.MARKDOWN,
         )
 
 
-def unapproveall_btn(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def unapproveall_btn(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     chat = update.effective_chat
     message = update.effective_message
-    member = chat.get_member(query.from_user.id)
+    member = await chat.get_member(query.from_user.id)
     if query.data == "unapproveall_user":
         if member.status == "creator" or query.from_user.id in DRAGONS:
-            approved_users = sql.list_approved(chat.id)
-            users = [int(i.user_id) for i in approved_users]
-            for user_id in users:
-                sql.disapprove(chat.id, user_id)      
-            message.edit_text("Successfully Unapproved all user in this Chat.")
+            await sql.disapprove_all(chat.id)
+            await message.edit_text("Successfully Unapproved all user in this Chat.")
             return
 
         if member.status == "administrator":
-            query.answer("Only owner of the chat can do this.")
+            await query.answer("Only owner of the chat can do this.")
 
         if member.status == "member":
-            query.answer("You need to be admin to do this.")
+            await query.answer("You need to be admin to do this.")
     elif query.data == "unapproveall_cancel":
         if member.status == "creator" or query.from_user.id in DRAGONS:
-            message.edit_text("Removing of all approved users has been cancelled.")
+            await message.edit_text("Removing of all approved users has been cancelled.")
             return ""
         if member.status == "administrator":
-            query.answer("Only owner of the chat can do this.")
+            await query.answer("Only owner of the chat can do this.")
         if member.status == "member":
-            query.answer("You need to be admin to do this.")
+            await query.answer("You need to be admin to do this.")
 
 
-# [Previous imports and functions remain exactly the same...]
+async def __import_data__(chat_id, data):
+    approvals = data.get("approvals", [])
+    await sql.approve_many(chat_id, approvals)
+
+
+def __export_data__(chat_id):
+    return {"approvals": sorted(sql.APPROVED_USERS.get(str(chat_id), ()))}
+
+
+async def __migrate__(old_chat_id, new_chat_id):
+    await sql.migrate_chat(old_chat_id, new_chat_id)
 
 # Handlers
 APPROVE_HANDLER = CommandHandler("approve", approve, filters=filters.ChatType.GROUPS)
@@ -1,4 +1,5 @@
 from Hina.config import app, DATA_IMPORT
+import inspect
 import json, time, os
 from io import BytesIO
 
@@ -85,7 +86,9 @@ async def import_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         try:
             for mod in DATA_IMPORT:
-                mod.__import_data__(str(chat_id), data)
+                result = mod.__import_data__(str(chat_id), data)
+                if inspect.isawaitable(result):
+                    await result
         except Exception:
             await msg.reply_text(
                 f"An error occurred while recovering your data. The process failed. If you experience a problem with this, please take it to @{SUPPORT_CHAT}",
@@ -1,4 +1,4 @@
-from Hina.config import app
+from Hina.config import app, LOGGER
 import html
 from typing import Optional
 
@@ -9,6 +9,7 @@ from Hina.modules.helper_funcs.alternate import send_message
 from Hina.modules.helper_funcs.chat_status import user_admin, user_not_admin
 from Hina.modules.helper_funcs.misc import split_message
 from Hina.modules.helper_funcs.string_handling import extract_time
+from Hina.modules.helper_funcs.verdict_cache import UNKNOWN, get_verdicts
 from Hina.modules.log_channel import loggable
 from Hina.modules.warns import warn
 from telegram import Chat, ChatPermissions, Update, User
@@ -321,87 +322,93 @@ async def del_blackliststicker(update: Update, context: ContextTypes.DEFAULT_TYP
     if not message.sticker or not message.sticker.set_name:
         return
     
-    getmode, value = sql.get_blacklist_setting(chat.id)
-    chat_filters = sql.get_chat_stickers(chat.id)
-    
-    for trigger in chat_filters:
-        if message.sticker.set_name.lower() == trigger.lower():
-            try:
-                if getmode == 0:
-                    return
-                elif getmode == 1:
-                    await message.delete()
-                elif getmode == 2:
-                    await message.delete()
-                    await warn(
-                        user,
-                        chat,
-                        f"Using sticker '{trigger}' which in blacklist stickers",
-                        message,
-                        user,
-                    )
-                    return
-                elif getmode == 3:
-                    await message.delete()
-                    await bot.restrict_chat_member(
-                        chat.id,
-                        user.id,
-                        permissions=ChatPermissions(can_send_messages=False),
-                    )
-                    await send_message(
-                        chat,
-                        f"{mention_markdown(user.id, user.first_name)} muted because using '{trigger}' which in blacklist stickers",
-                        parse_mode=ParseMode.MARKDOWN,
-                    )
-                    return
-                elif getmode == 4:
-                    await message.delete()
-                    res = await chat.unban_member(user.id)
-                    if res:
-                        await send_message(
-                            chat,
-                            f"{mention_markdown(user.id, user.first_name)} kicked because using '{trigger}' which in blacklist stickers",
-                            parse_mode=ParseMode.MARKDOWN,
-                        )
-                    return
-                elif getmode == 5:
-                    await message.delete()
-                    await chat.ban_member(user.id)
-                    await send_message(
-                        chat,
-                        f"{mention_markdown(user.id, user.first_name)} banned because using '{trigger}' which in blacklist stickers",
-                        parse_mode=ParseMode.MARKDOWN,
-                    )
-                    return
-                elif getmode == 6:
-                    await message.delete()
-                    bantime = extract_time(message, value)
-                    await chat.ban_member(user.id, until_date=bantime)
-                    await send_message(
-                        chat,
-                        f"{mention_markdown(user.id, user.first_name)} banned for {value} because using '{trigger}' which in blacklist stickers",
-                        parse_mode=ParseMode.MARKDOWN,
-                    )
-                    return
-                elif getmode == 7:
-                    await message.delete()
-                    mutetime = extract_time(message, value)
-                    await bot.restrict_chat_member(
-                        chat.id,
-                        user.id,
-                        permissions=ChatPermissions(can_send_messages=False),
-                        until_date=mutetime,
-                    )
-                    await send_message(
-                        chat,
-                        f"{mention_markdown(user.id, user.first_name)} muted for {value} because using '{trigger}' which in blacklist stickers",
-                        parse_mode=ParseMode.MARKDOWN,
-                    )
-                    return
-            except BadRequest as excp:
-                if excp.message != "Message to delete not found":
-                    LOGGER.exception("Error while deleting blacklist message.")
-            break
+    verdicts = get_verdicts(update, context)
+    trigger = verdicts.sticker
+    if trigger is UNKNOWN:
+        set_name = message.sticker.set_name.lower()
+        chat_filters = await sql.get_chat_stickers(chat.id)
+        trigger = verdicts.sticker = next(
+            (trigger for trigger in chat_filters if trigger.lower() == set_name), None
+        )
+    if trigger is None:
+        return
+
+    getmode, value = await sql.get_blacklist_setting(chat.id)
+    try:
+        if getmode == 0:
+            return
+        elif getmode == 1:
+            await message.delete()
+        elif getmode == 2:
+            await message.delete()
+            await warn(
+                user,
+                chat,
+                f"Using sticker '{trigger}' which in blacklist stickers",
+                message,
+                user,
+            )
+            return
+        elif getmode == 3:
+            await message.delete()
+            await bot.restrict_chat_member(
+                chat.id,
+                user.id,
+                permissions=ChatPermissions(can_send_messages=False),
+            )
+            await send_message(
+                chat,
+                f"{mention_markdown(user.id, user.first_name)} muted because using '{trigger}' which in blacklist stickers",
+                parse_mode=ParseMode.MARKDOWN,
+            )
+            return
+        elif getmode == 4:
+            await message.delete()
+            res = await chat.unban_member(user.id)
+            if res:
+                await send_message(
+                    chat,
+                    f"{mention_markdown(user.id, user.first_name)} kicked because using '{trigger}' which in blacklist stickers",
+                    parse_mode=ParseMode.MARKDOWN,
+                )
+            return
+        elif getmode == 5:
+            await message.delete()
+            await chat.ban_member(user.id)
+            await send_message(
+                chat,
+                f"{mention_markdown(user.id, user.first_name)} banned because using '{trigger}' which in blacklist stickers",
+                parse_mode=ParseMode.MARKDOWN,
+            )
+            return
+        elif getmode == 6:
+            await message.delete()
+            bantime = extract_time(message, value)
+            await chat.ban_member(user.id, until_date=bantime)
+            await send_message(
+                chat,
+                f"{mention_markdown(user.id, user.first_name)} banned for {value} because using '{trigger}' which in blacklist stickers",
+                parse_mode=ParseMode.MARKDOWN,
+            )
+            return
+        elif getmode == 7:
+            await message.delete()
+            mutetime = extract_time(message, value)
+            await bot.restrict_chat_member(
+                chat.id,
+                user.id,
+                permissions=ChatPermissions(can_send_messages=False),
+                until_date=mutetime,
+            )
+            await send_message(
+                chat,
+                f"{mention_markdown(user.id, user.first_name)} muted for {value} because using '{trigger}' which in blacklist stickers",
+                parse_mode=ParseMode.MARKDOWN,
+            )
+            return
+    except BadRequest as excp:
+        if excp.message != "Message to delete not found":
+            LOGGER.exception("Error while deleting blacklist message.")
 
 def __import_data__(chat_id, data):
     blacklist = data.get("sticker_blacklist", {})
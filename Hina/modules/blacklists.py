@@ -1,6 +1,5 @@
-from Hina.config import app
+from Hina.config import app, LOGGER
 import html
-import re
 from typing import Optional
 
 from telegram import ChatPermissions, Update
@@ -11,9 +10,12 @@ from telegram.helpers import mention_html
 from contextlib import asynccontextmanager
 
 import Hina.modules.sql.blacklist_sql as sql
+from Hina.modules.helper_funcs.filters import ChatFeature
+from Hina.modules.sql.chat_features_sql import Feature
 from Hina.modules.disable import DisableAbleCommandHandler
 from Hina.modules.helper_funcs.chat_status import user_admin, user_not_admin
-from Hina.modules.helper_funcs.extraction import extract_text
+from Hina.modules.helper_funcs.text_view import get_text_view
+from Hina.modules.helper_funcs.verdict_cache import UNKNOWN, get_verdicts
 from Hina.modules.helper_funcs.misc import split_message
 from Hina.modules.log_channel import loggable
 from Hina.modules.warns import warn
@@ -296,94 +298,95 @@ async def del_blacklist(update: Update, context: ContextTypes.DEFAULT_TYPE):
     message = update.effective_message
     user = update.effective_user
     bot = context.bot
-    to_match = extract_text(message)
-    if not to_match:
+    view = get_text_view(update, context)
+    if not view:
+        return
+    verdicts = get_verdicts(update, context)
+    trigger = verdicts.blacklist
+    if trigger is UNKNOWN:
+        trigger = verdicts.blacklist = sql.match_blacklist(chat.id, view.text)
+    if trigger is None:
         return
     if is_approved(chat.id, user.id):
         return
-    getmode, value = sql.get_blacklist_setting(chat.id)
+    getmode, value = await sql.get_blacklist_setting(chat.id)
 
-    chat_filters = sql.get_chat_blacklist(chat.id)
-    for trigger in chat_filters:
-        pattern = r"( |^|[^\w])" + re.escape(trigger) + r"( |$|[^\w])"
-        if re.search(pattern, to_match, flags=re.IGNORECASE):
+    try:
+        if getmode == 0:
+            return
+        elif getmode == 1:
             try:
-                if getmode == 0:
-                    return
-                elif getmode == 1:
-                    try:
-                        await message.delete()
-                    except BadRequest:
-                        pass
-                elif getmode == 2:
-                    try:
-                        await message.delete()
-                    except BadRequest:
-                        pass
-                    await warn(
-                        update.effective_user,
-                        chat,
-                        f"Using blacklisted trigger: {trigger}",
-                        message,
-                        update.effective_user,
-                    )
-                    return
-                elif getmode == 3:
-                    await message.delete()
-                    await bot.restrict_chat_member(
-                        chat.id,
-                        update.effective_user.id,
-                        permissions=ChatPermissions(can_send_messages=False),
-                    )
-                    await bot.sendMessage(
-                        chat.id,
-                        f"Muted {user.first_name} for using Blacklisted word: {trigger}!",
-                    )
-                    return
-                elif getmode == 4:
-                    await message.delete()
-                    res = await chat.unban_member(update.effective_user.id)
-                    if res:
-                        await bot.sendMessage(
-                            chat.id,
-                            f"Kicked {user.first_name} for using Blacklisted word: {trigger}!",
-                        )
-                    return
-                elif getmode == 5:
-                    await message.delete()
-                    await chat.ban_member(user.id)
-                    await bot.sendMessage(
-                        chat.id,
-                        f"Banned {user.first_name} for using Blacklisted word: {trigger}",
-                    )
-                    return
-                elif getmode == 6:
-                    await message.delete()
-                    bantime = extract_time(message, value)
-                    await chat.ban_member(user.id, until_date=bantime)
-                    await bot.sendMessage(
-                        chat.id,
-                        f"Banned {user.first_name} until '{value}' for using Blacklisted word: {trigger}!",
-                    )
-                    return
-                elif getmode == 7:
-                    await message.delete()
-                    mutetime = extract_time(message, value)
-                    await bot.restrict_chat_member(
-                        chat.id,
-                        user.id,
-                        until_date=mutetime,
-                        permissions=ChatPermissions(can_send_messages=False),
-                    )
-                    await bot.sendMessage(
-                        chat.id,
-                        f"Muted {user.first_name} until '{value}' for using Blacklisted word: {trigger}!",
-                    )
-                    return
-            except BadRequest as excp:
-                if excp.message != "Message to delete not found":
-                    LOGGER.exception("Error while deleting blacklist message.")
-            break
+                await message.delete()
+            except BadRequest:
+                pass
+        elif getmode == 2:
+            try:
+                await message.delete()
+            except BadRequest:
+                pass
+            await warn(
+                update.effective_user,
+                chat,
+                f"Using blacklisted trigger: {trigger}",
+                message,
+                update.effective_user,
+            )
+            return
+        elif getmode == 3:
+            await message.delete()
+            await bot.restrict_chat_member(
+                chat.id,
+                update.effective_user.id,
+                permissions=ChatPermissions(can_send_messages=False),
+            )
+            await bot.sendMessage(
+                chat.id,
+                f"Muted {user.first_name} for using Blacklisted word: {trigger}!",
+            )
+            return
+        elif getmode == 4:
+            await message.delete()
+            res = await chat.unban_member(update.effective_user.id)
+            if res:
+                await bot.sendMessage(
+                    chat.id,
+                    f"Kicked {user.first_name} for using Blacklisted word: {trigger}!",
+                )
+            return
+        elif getmode == 5:
+            await message.delete()
+            await chat.ban_member(user.id)
+            await bot.sendMessage(
+                chat.id,
+                f"Banned {user.first_name} for using Blacklisted word: {trigger}",
+            )
+            return
+        elif getmode == 6:
+            await message.delete()
+            bantime = extract_time(message, value)
+            await chat.ban_member(user.id, until_date=bantime)
+            await bot.sendMessage(
+                chat.id,
+                f"Banned {user.first_name} until '{value}' for using Blacklisted word: {trigger}!",
+            )
+            return
+        elif getmode == 7:
+            await message.delete()
+            mutetime = extract_time(message, value)
+            await bot.restrict_chat_member(
+                chat.id,
+                user.id,
+                until_date=mutetime,
+                permissions=ChatPermissions(can_send_messages=False),
+            )
+            await bot.sendMessage(
+                chat.id,
+                f"Muted {user.first_name} until '{value}' for using Blacklisted word: {trigger}!",
+            )
+            return
+    except BadRequest as excp:
+        if excp.message != "Message to delete not found":
+            LOGGER.exception("Error while deleting blacklist message.")
 
 def __import_data__(chat_id, data):
     # set chat blacklist
@@ -422,7 +425,7 @@ UNBLACKLIST_HANDLER = CommandHandler("unblacklist", unblacklist)
 BLACKLISTMODE_HANDLER = CommandHandler("blacklistmode", blacklist_mode)
 BLACKLIST_DEL_HANDLER = MessageHandler(
     (filters.TEXT | filters.COMMAND | filters.Sticker.ALL | filters.PHOTO | filters.Caption) &
-    filters.ChatType.GROUPS,
+    filters.ChatType.GROUPS & ChatFeature(Feature.BLACKLIST),
     del_blacklist
 )
 
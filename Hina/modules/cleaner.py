@@ -3,14 +3,17 @@ import html
 from telethon import TelegramClient
 from Hina.config import ALLOW_EXCL
 from Hina.modules.helper_funcs.handlers import CustomCommandHandler
+from Hina.modules.helper_funcs.filters import ChatFeature
 from Hina.modules.disable import DisableAbleCommandHandler
 from Hina.modules.helper_funcs.chat_status import (
     bot_can_delete,
+    can_delete,
     connection_status,
     dev_plus,
     user_admin,
 )
 from Hina.modules.sql import cleaner_sql as sql
+from Hina.modules.sql.chat_features_sql import Feature
 from telegram import Update
 from telegram.constants import ParseMode
 from telegram.ext import (
@@ -60,10 +63,10 @@ async def clean_blue_text_must_click(update: Update, context: ContextTypes.DEFAU
     chat = update.effective_chat
     message = update.effective_message
     
-    if not message.text or not chat.get_member(bot.id).can_delete_messages:
+    if not message.text or not await sql.is_enabled(chat.id):
         return
-        
-    if not sql.is_enabled(chat.id):
+
+    if not await can_delete(chat, bot.id):
         return
 
     fst_word = message.text.strip().split(None, 1)[0]
@@ -206,7 +209,7 @@ ADD_CLEAN_BLUE_TEXT_GLOBAL_HANDLER = CommandHandler("gignoreblue", add_bluetext_
 REMOVE_CLEAN_BLUE_TEXT_GLOBAL_HANDLER = CommandHandler("ungignoreblue", remove_bluetext_ignore_global)
 LIST_CLEAN_BLUE_TEXT_HANDLER = CommandHandler("listblue", bluetext_ignore_list)
 CLEAN_BLUE_TEXT_HANDLER = MessageHandler(
-    filters.COMMAND & filters.ChatType.GROUPS,
+    filters.COMMAND & filters.ChatType.GROUPS & ChatFeature(Feature.CLEAN_BLUE_TEXT),
     clean_blue_text_must_click
 )
 
@@ -1,13 +1,50 @@
 from Hina.config import app
-import requests
+import time
+
 from Hina.config import CASH_API_KEY, app
+from Hina.modules.helper_funcs import exchange_rates, http_client, response_cache
 from telegram import Update
 from telegram.constants import ParseMode
-from telegram.constants import ParseMode
 from telegram.ext import ContextTypes, CommandHandler
 
 
-def convert(update: Update, context: ContextTypes.DEFAULT_TYPE):
+class RateUnavailable(Exception):
+    """Alpha Vantage answered without a rate, e.g. a rate-limit note or an unknown pair."""
+
+
+async def pair_rate(orig_cur: str, new_cur: str):
+    """Single pair lookup on Alpha Vantage, for currencies missing from the rate table."""
+    request_url = (
+        f"https://www.alphavantage.co/query"
+        f"?function=CURRENCY_EXCHANGE_RATE"
+        f"&from_currency={orig_cur}"
+        f"&to_currency={new_cur}"
+        f"&apikey={CASH_API_KEY}"
+    )
+
+    async def fetch():
+        payload = await http_client.get_json(request_url)
+        # "Note" and "Error Message" bodies come back as 200s; raising keeps them out of the cache
+        if "Realtime Currency Exchange Rate" not in payload:
+            raise RateUnavailable(payload)
+        return payload
+
+    try:
+        response = await response_cache.cached("currency", (orig_cur, new_cur), fetch, ttl=60 * 60)
+        return float(response["Realtime Currency Exchange Rate"]["5. Exchange Rate"])
+    except (RateUnavailable, KeyError):
+        return None
+
+
+def staleness(table: exchange_rates.RateTable) -> str:
+    updated = time.strftime("%Y-%m-%d %H:%M UTC", time.gmtime(table.updated_at))
+    note = f"_Rates as of {updated}"
+    if exchange_rates.LAST_ERROR_AT is not None:
+        note += ", rate source unreachable"
+    return note + "_"
+
+
+async def convert(update: Update, context: ContextTypes.DEFAULT_TYPE):
     args = update.effective_message.text.split(" ")
 
     if len(args) == 4:
@@ -15,38 +52,34 @@ def convert(update: Update, context: ContextTypes.DEFAULT_TYPE):
             orig_cur_amount = float(args[1])
 
         except ValueError:
-            update.effective_message.reply_text("Invalid Amount Of Currency")
+            await update.effective_message.reply_text("Invalid Amount Of Currency")
             return
 
         orig_cur = args[2].upper()
 
         new_cur = args[3].upper()
 
-        request_url = (
-            f"https://www.alphavantage.co/query"
-            f"?function=CURRENCY_EXCHANGE_RATE"
-            f"&from_currency={orig_cur}"
-            f"&to_currency={new_cur}"
-            f"&apikey={CASH_API_KEY}"
-        )
-        response = requests.get(request_url).json()
-        try:
-            current_rate = float(
-                response["Realtime Currency Exchange Rate"]["5. Exchange Rate"],
-            )
-        except KeyError:
-            update.effective_message.reply_text("Currency Not Supported.")
-            return
-        new_cur_amount = round(orig_cur_amount * current_rate, 5)
-        update.effective_message.reply_text(
-            f"{orig_cur_amount} {orig_cur} = {new_cur_amount} {new_cur}",
+        table = await exchange_rates.get_rates()
+        if table is not None and orig_cur in table and new_cur in table:
+            new_cur_amount = round(table.convert(orig_cur_amount, orig_cur, new_cur), 5)
+            note = staleness(table)
+        else:
+            current_rate = await pair_rate(orig_cur, new_cur) if CASH_API_KEY else None
+            if current_rate is None:
+                await update.effective_message.reply_text("Currency Not Supported.")
+                return
+            new_cur_amount = round(orig_cur_amount * current_rate, 5)
+            note = "_Live rate_"
+        await update.effective_message.reply_text(
+            f"{orig_cur_amount} {orig_cur} = {new_cur_amount} {new_cur}\n{note}",
+            parse_mode=ParseMode.MARKDOWN,
         )
 
     elif len(args) == 1:
-        update.effective_message.reply_text(__help__, parse_mode=ParseMode.MARKDOWN)
+        await update.effective_message.reply_text(__help__, parse_mode=ParseMode.MARKDOWN)
 
     else:
-        update.effective_message.reply_text(
+        await update.effective_message.reply_text(
             f"*Invalid Args!!:* Required 3 But Passed {len(args) -1}",
             parse_mode=ParseMode.MARKDOWN,
         )
@@ -1,5 +1,4 @@
 from Hina.config import app
-import re
 import random
 from html import escape
 
@@ -19,17 +18,17 @@ from telegram.helpers import mention_html, escape_markdown
 from Hina.modules.disable import DisableAbleCommandHandler
 from Hina.modules.helper_funcs.handlers import MessageHandlerChecker
 from Hina.modules.helper_funcs.chat_status import user_admin
-from Hina.modules.helper_funcs.extraction import extract_text
-from Hina.modules.helper_funcs.filters import CustomFilters
-from Hina.modules.helper_funcs.misc import build_keyboard_parser
+from Hina.modules.helper_funcs.text_view import get_text_view
+from Hina.modules.helper_funcs.verdict_cache import UNKNOWN, get_verdicts
+from Hina.modules.helper_funcs.filters import ChatFeature, CustomFilters
 from Hina.modules.helper_funcs.msg_types import get_filter_type
 from Hina.modules.helper_funcs.string_handling import (
     split_quotes,
     button_markdown_parser,
-    escape_invalid_curly_brackets,
     markdown_to_html,
 )
 from Hina.modules.sql import cust_filters_sql as sql
+from Hina.modules.sql.chat_features_sql import Feature
 
 from Hina.modules.connection import connected
 
@@ -244,152 +243,146 @@ async def reply_filter(update: telegram.Update, context: ContextTypes.DEFAULT_TY
     if not update.effective_user or update.effective_user.id == 777000:
         return
 
-    to_match = extract_text(message)
-    if not to_match:
+    view = get_text_view(update, context)
+    if not view:
         return
 
-    chat_filters = sql.get_chat_triggers(chat.id)
-    for keyword in chat_filters:
-        pattern = r"( |^|[^\w])" + re.escape(keyword) + r"( |$|[^\w])"
-        if re.search(pattern, to_match, flags=re.IGNORECASE):
-            if MessageHandlerChecker.check_user(update.effective_user.id):
-                return
-            filt = sql.get_filter(chat.id, keyword)
-            if filt.reply == "there is should be a new reply":
-                buttons = sql.get_buttons(chat.id, filt.keyword)
-                keyb = build_keyboard_parser(context.bot, chat.id, buttons)
-                keyboard = InlineKeyboardMarkup(keyb)
-
-                VALID_WELCOME_FORMATTERS = ["first", "last", "fullname", "username", "id", "chatname", "mention"]
-                if filt.reply_text:
-                    if "%%%" in filt.reply_text:
-                        split = filt.reply_text.split("%%%")
-                        text = random.choice(split) if all(split) else filt.reply_text
-                    else:
-                        text = filt.reply_text
-                    
-                    if text.startswith("~!") and text.endswith("!~"):
-                        sticker_id = text.replace("~!", "").replace("!~", "")
-                        try:
-                            await context.bot.send_sticker(
-                                chat.id,
-                                sticker_id,
-                                reply_to_message_id=message.message_id,
-                            )
-                            return
-                        except BadRequest as excp:
-                            if excp.message == "Wrong remote file identifier specified: wrong padding in the string":
-                                await context.bot.send_message(
-                                    chat.id,
-                                    "Message couldn't be sent, Is the sticker id valid?",
-                                )
-                                return
-                            raise
-
-                    valid_format = escape_invalid_curly_brackets(text, VALID_WELCOME_FORMATTERS)
-                    if valid_format:
-                        filtext = valid_format.format(
-                            first=escape(message.from_user.first_name),
-                            last=escape(message.from_user.last_name or message.from_user.first_name),
-                            fullname=" ".join(
-                                [escape(message.from_user.first_name), escape(message.from_user.last_name)]
-                                if message.from_user.last_name
-                                else [escape(message.from_user.first_name)]
-                            ),
-                            username=f"@{escape(message.from_user.username)}" if message.from_user.username 
-                                   else mention_html(message.from_user.id, message.from_user.first_name),
-                            mention=mention_html(message.from_user.id, message.from_user.first_name),
-                            chatname=escape(message.chat.title) if message.chat.type != "private"
-                                   else escape(message.from_user.first_name),
-                            id=message.from_user.id,
-                        )
-                    else:
-                        filtext = ""
-                else:
-                    filtext = ""
-
-                if filt.file_type in (sql.Types.BUTTON_TEXT, sql.Types.TEXT):
-                    try:
+    verdicts = get_verdicts(update, context)
+    keyword = verdicts.filter
+    if keyword is UNKNOWN:
+        keyword = verdicts.filter = next(
+            (keyword for keyword in sql.get_chat_triggers(chat.id) if view.contains(keyword)), None
+        )
+    if keyword is None:
+        return
+    if MessageHandlerChecker.check_user(update.effective_user.id):
+        return
+    filt = sql.get_filter_record(chat.id, keyword)
+    if filt is None:
+        return
+    if filt["reply"] == "there is should be a new reply":
+        keyboard = await sql.get_filter_keyboard(context.bot, chat.id, keyword)
+
+        if filt["reply_variants"]:
+            text = random.choice(filt["reply_variants"])
+
+            if text.startswith("~!") and text.endswith("!~"):
+                sticker_id = text.replace("~!", "").replace("!~", "")
+                try:
+                    await context.bot.send_sticker(
+                        chat.id,
+                        sticker_id,
+                        reply_to_message_id=message.message_id,
+                    )
+                    return
+                except BadRequest as excp:
+                    if excp.message == "Wrong remote file identifier specified: wrong padding in the string":
                         await context.bot.send_message(
                             chat.id,
-                            markdown_to_html(filtext),
-                            parse_mode=ParseMode.HTML,
-                            disable_web_page_preview=True,
-                            reply_markup=keyboard,
-                            reply_to_message_id=message.message_id
-                        )
-                    except BadRequest as excp:
-                        LOGGER.exception("Error in filters: %s", excp.message)
-                        try:
-                            await send_message(update.effective_message, get_exception(excp, filt, chat))
-                        except BadRequest:
-                            LOGGER.exception("Failed to send message")
-                else:
-                    try:
-                        await ENUM_FUNC_MAP[filt.file_type](
-                            chat.id,
-                            filt.file_id,
-                            reply_markup=keyboard,
-                            reply_to_message_id=message.message_id
-                        )
-                    except BadRequest:
-                        await send_message(
-                            message,
-                            "I don't have the permission to send the content of the filter.",
+                            "Message couldn't be sent, Is the sticker id valid?",
                         )
-                break
+                        return
+                    raise
+
+            if text:
+                filtext = text.format(
+                    first=escape(message.from_user.first_name),
+                    last=escape(message.from_user.last_name or message.from_user.first_name),
+                    fullname=" ".join(
+                        [escape(message.from_user.first_name), escape(message.from_user.last_name)]
+                        if message.from_user.last_name
+                        else [escape(message.from_user.first_name)]
+                    ),
+                    username=f"@{escape(message.from_user.username)}" if message.from_user.username 
+                           else mention_html(message.from_user.id, message.from_user.first_name),
+                    mention=mention_html(message.from_user.id, message.from_user.first_name),
+                    chatname=escape(message.chat.title) if message.chat.type != "private"
+                           else escape(message.from_user.first_name),
+                    id=message.from_user.id,
+                )
             else:
-                if filt.is_sticker:
-                    await message.reply_sticker(filt.reply)
-                elif filt.is_document:
-                    await message.reply_document(filt.reply)
-                elif filt.is_image:
-                    await message.reply_photo(filt.reply)
-                elif filt.is_audio:
-                    await message.reply_audio(filt.reply)
-                elif filt.is_voice:
-                    await message.reply_voice(filt.reply)
-                elif filt.is_video:
-                    await message.reply_video(filt.reply)
-                elif filt.has_markdown:
-                    buttons = sql.get_buttons(chat.id, filt.keyword)
-                    keyb = build_keyboard_parser(context.bot, chat.id, buttons)
-                    keyboard = InlineKeyboardMarkup(keyb)
-
+                filtext = ""
+        else:
+            filtext = ""
+
+        if filt["file_type"] in (sql.Types.BUTTON_TEXT, sql.Types.TEXT):
+            try:
+                await context.bot.send_message(
+                    chat.id,
+                    markdown_to_html(filtext),
+                    parse_mode=ParseMode.HTML,
+                    disable_web_page_preview=True,
+                    reply_markup=keyboard,
+                    reply_to_message_id=message.message_id
+                )
+            except BadRequest as excp:
+                LOGGER.exception("Error in filters: %s", excp.message)
+                try:
+                    await send_message(update.effective_message, get_exception(excp, filt, chat))
+                except BadRequest:
+                    LOGGER.exception("Failed to send message")
+        else:
+            try:
+                await ENUM_FUNC_MAP[filt["file_type"]](
+                    chat.id,
+                    filt["file_id"],
+                    reply_markup=keyboard,
+                    reply_to_message_id=message.message_id
+                )
+            except BadRequest:
+                await send_message(
+                    message,
+                    "I don't have the permission to send the content of the filter.",
+                )
+    else:
+        if filt["is_sticker"]:
+            await message.reply_sticker(filt["reply"])
+        elif filt["is_document"]:
+            await message.reply_document(filt["reply"])
+        elif filt["is_image"]:
+            await message.reply_photo(filt["reply"])
+        elif filt["is_audio"]:
+            await message.reply_audio(filt["reply"])
+        elif filt["is_voice"]:
+            await message.reply_voice(filt["reply"])
+        elif filt["is_video"]:
+            await message.reply_video(filt["reply"])
+        elif filt["has_markdown"]:
+            keyboard = await sql.get_filter_keyboard(context.bot, chat.id, keyword)
+
+            try:
+                await context.bot.send_message(
+                    chat.id,
+                    filt["reply"],
+                    parse_mode=ParseMode.MARKDOWN,
+                    disable_web_page_preview=True,
+                    reply_markup=keyboard,
+                    reply_to_message_id=message.message_id
+                )
+            except BadRequest as excp:
+                if excp.message == "Unsupported url protocol":
                     try:
-                        await context.bot.send_message(
-                            chat.id,
-                            filt.reply,
-                            parse_mode=ParseMode.MARKDOWN,
-                            disable_web_page_preview=True,
-                            reply_markup=keyboard,
-                            reply_to_message_id=message.message_id
+                        await send_message(
+                            update.effective_message,
+                            "You seem to be trying to use an unsupported url protocol. "
+                            "Telegram doesn't support buttons for some protocols, such as tg://. Please try "
+                            "again...",
                         )
-                    except BadRequest as excp:
-                        if excp.message == "Unsupported url protocol":
-                            try:
-                                await send_message(
-                                    update.effective_message,
-                                    "You seem to be trying to use an unsupported url protocol. "
-                                    "Telegram doesn't support buttons for some protocols, such as tg://. Please try "
-                                    "again...",
-                                )
-                            except BadRequest:
-                                LOGGER.exception("Error in filters")
-                        else:
-                            try:
-                                await send_message(
-                                    update.effective_message,
-                                    "This message couldn't be sent as it's incorrectly formatted.",
-                                )
-                            except BadRequest:
-                                LOGGER.exception("Error in filters")
+                    except BadRequest:
+                        LOGGER.exception("Error in filters")
                 else:
                     try:
-                        await context.bot.send_message(chat.id, filt.reply, reply_to_message_id=message.message_id)
+                        await send_message(
+                            update.effective_message,
+                            "This message couldn't be sent as it's incorrectly formatted.",
+                        )
                     except BadRequest:
                         LOGGER.exception("Error in filters")
-                break
+        else:
+            try:
+                await context.bot.send_message(chat.id, filt["reply"], reply_to_message_id=message.message_id)
+            except BadRequest:
+                LOGGER.exception("Error in filters")
 
 async def rmall_filters(update: telegram.Update, context: ContextTypes.DEFAULT_TYPE):
     chat = update.effective_chat
@@ -443,4 +436,7 @@ app.add_handler(CommandHandler("filter", filters, filters=Filters.ChatType.GROUP
 app.add_handler(CommandHandler("stop", stop_filter, filters=Filters.ChatType.GROUPS))
 app.add_handler(CommandHandler("rmallfilters", rmall_filters, filters=Filters.ChatType.GROUPS))
 app.add_handler(CallbackQueryHandler(rmall_callback, pattern=r"filters_.*"))
-app.add_handler(MessageHandler(Filters.TEXT & Filters.ChatType.GROUPS, reply_filter), group=HANDLER_GROUP)
+app.add_handler(
+    MessageHandler(Filters.TEXT & Filters.ChatType.GROUPS & ChatFeature(Feature.FILTERS), reply_filter),
+    group=HANDLER_GROUP,
+)
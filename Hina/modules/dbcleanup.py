@@ -1,11 +1,10 @@
 from Hina.config import app
-from time import sleep
-import asyncio
 
 import Hina.modules.sql.global_bans_sql as gban_sql
 import Hina.modules.sql.users_sql as user_sql
 from Hina.config import DEV_USERS, OWNER_ID
 from Hina.modules.helper_funcs.chat_status import dev_plus
+from Hina.modules.helper_funcs.send_scheduler import scheduler
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.constants import ParseMode
 from telegram.error import BadRequest, TelegramError
@@ -17,37 +16,56 @@ from telegram.ext import (
 )
 
 
+# Ids looked up at once; the scheduler runs each page as fast as the rate limits allow
+LOOKUP_PAGE_SIZE = 200
+
+
+async def _pages(rows):
+    page = []
+    async for row in rows:
+        page.append(row)
+        if len(page) >= LOOKUP_PAGE_SIZE:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
 async def get_invalid_chats(update: Update, context: ContextTypes.DEFAULT_TYPE, remove: bool = False):
     bot = context.bot
     chat_id = update.effective_chat.id
-    chats = user_sql.get_all_chats()
-    kicked_chats, progress = 0, 0
+    total = await user_sql.num_chats() or 0
+    kicked_chats, progress, index = 0, 0, 0
     chat_list = []
     progress_message = None
 
-    for chat in chats:
-        if ((100 * chats.index(chat)) / len(chats)) > progress:
-            progress_bar = f"{progress}% completed in getting invalid chats."
-            if progress_message:
-                try:
-                    await bot.edit_message_text(
-                        progress_bar, chat_id, progress_message.message_id,
-                    )
-                except:
-                    pass
-            else:
-                progress_message = await bot.send_message(chat_id, progress_bar)
-            progress += 5
-
-        cid = chat.chat_id
-        await asyncio.sleep(0.1)
-        try:
-            await bot.get_chat(cid)
-        except (BadRequest, TelegramError):
-            kicked_chats += 1
-            chat_list.append(cid)
-        except:
-            pass
+    async for page in _pages(user_sql.iter_chats()):
+        lookups = [
+            scheduler.submit(bot.get_chat, cid, target=cid, per_chat=False)
+            for cid, _ in page
+        ]
+        for (cid, _), lookup in zip(page, lookups):
+            if total and ((100 * index) / total) > progress:
+                progress_bar = f"{progress}% completed in getting invalid chats."
+                if progress_message:
+                    try:
+                        await bot.edit_message_text(
+                            progress_bar, chat_id, progress_message.message_id,
+                        )
+                    except:
+                        pass
+                else:
+                    progress_message = await bot.send_message(chat_id, progress_bar)
+                progress += 5
+            index += 1
+
+            try:
+                await lookup
+            except (BadRequest, TelegramError):
+                kicked_chats += 1
+                chat_list.append(cid)
+            except:
+                pass
 
     try:
         await progress_message.delete()
@@ -58,34 +76,34 @@ async def get_invalid_chats(update: Update, context: ContextTypes.DEFAULT_TYPE,
         return kicked_chats
     else:
         for muted_chat in chat_list:
-            await asyncio.sleep(0.1)
-            user_sql.rem_chat(muted_chat)
+            await user_sql.rem_chat(muted_chat)
         return kicked_chats
 
 
 async def get_invalid_gban(update: Update, context: ContextTypes.DEFAULT_TYPE, remove: bool = False):
     bot = context.bot
-    banned = gban_sql.get_gban_list()
     ungbanned_users = 0
     ungban_list = []
 
-    for user in banned:
-        user_id = user["user_id"]
-        await asyncio.sleep(0.1)
-        try:
-            await bot.get_chat(user_id)
-        except BadRequest:
-            ungbanned_users += 1
-            ungban_list.append(user_id)
-        except:
-            pass
+    async for page in _pages(gban_sql.iter_gban_list()):
+        lookups = [
+            scheduler.submit(bot.get_chat, user_id, target=user_id, per_chat=False)
+            for user_id, _, _ in page
+        ]
+        for (user_id, _, _), lookup in zip(page, lookups):
+            try:
+                await lookup
+            except BadRequest:
+                ungbanned_users += 1
+                ungban_list.append(user_id)
+            except:
+                pass
 
     if not remove:
         return ungbanned_users
     else:
         for user_id in ungban_list:
-            await asyncio.sleep(0.1)
-            gban_sql.ungban_user(user_id)
+            await gban_sql.ungban_user(user_id)
         return ungbanned_users
 
 
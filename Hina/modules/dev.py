@@ -5,6 +5,7 @@ import sys
 import asyncio
 from contextlib import suppress
 
+from Hina.modules.helper_funcs import response_cache, verdict_cache
 from Hina.modules.helper_funcs.chat_status import dev_plus
 from telegram import Update
 from telegram.constants import ParseMode
@@ -63,6 +64,34 @@ async def gitpull(update: Update, context: ContextTypes.DEFAULT_TYPE):
     os.system("restart.bat")
     os.execv("start.bat", sys.argv)
 
+@dev_plus
+async def cachestats(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    cache = response_cache.get_cache()
+    args = context.args
+    if args and args[0].lower() == "clear":
+        source = args[1].lower() if len(args) > 1 else None
+        dropped = cache.clear(source)
+        await update.effective_message.reply_text(f"Dropped {dropped} cached responses.")
+        return
+    text = (
+        f"<b>Response cache</b>: {len(cache)} entries, "
+        f"{cache.size / 1024:.1f}/{cache.budget / 1024:.0f} KiB\n"
+    )
+    for source, counters in sorted(cache.stats.items()):
+        lookups = counters["hits"] + counters["misses"] + counters["coalesced"]
+        ratio = (counters["hits"] + counters["coalesced"]) / lookups * 100 if lookups else 0
+        text += (
+            f"\n<code>{source}</code>: {counters['hits']} hits, {counters['misses']} misses, "
+            f"{counters['coalesced']} coalesced, {counters['expired']} expired, "
+            f"{counters['evicted']} evicted ({ratio:.0f}% served)"
+        )
+    verdicts = verdict_cache.stats
+    text += (
+        f"\n\n<b>Filter verdicts</b>: {verdict_cache.cache_size()}/{verdict_cache.VERDICT_CACHE_SIZE} entries, "
+        f"{verdicts['hits']} hits, {verdicts['misses']} misses"
+    )
+    await update.effective_message.reply_text(text, parse_mode=ParseMode.HTML)
+
 @dev_plus
 async def restart(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.effective_message.reply_text(
@@ -75,11 +104,15 @@ LEAVE_HANDLER = CommandHandler("leave", leave, filters=Filters.User(DEV_USERS))
 GITPULL_HANDLER = CommandHandler("gitpull", gitpull, filters=Filters.User(DEV_USERS))
 RESTART_HANDLER = CommandHandler("reboot", restart, filters=Filters.User(DEV_USERS))
 ALLOWGROUPS_HANDLER = CommandHandler("lockdown", allow_groups, filters=Filters.User(DEV_USERS))
+CACHESTATS_HANDLER = CommandHandler("cachestats", cachestats, filters=Filters.User(DEV_USERS))
 
 app.add_handler(ALLOWGROUPS_HANDLER)
 app.add_handler(LEAVE_HANDLER)
 app.add_handler(GITPULL_HANDLER)
 app.add_handler(RESTART_HANDLER)
+app.add_handler(CACHESTATS_HANDLER)
 
 __mod_name__ = "Dev"
-__handlers__ = [LEAVE_HANDLER, GITPULL_HANDLER, RESTART_HANDLER, ALLOWGROUPS_HANDLER]
+__handlers__ = [
+    LEAVE_HANDLER, GITPULL_HANDLER, RESTART_HANDLER, ALLOWGROUPS_HANDLER, CACHESTATS_HANDLER,
+]
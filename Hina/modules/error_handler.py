@@ -1,5 +1,4 @@
 import traceback
-import requests
 import html
 import random
 import sys
@@ -11,6 +10,7 @@ from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
 from telegram.constants import ParseMode
 from telegram.ext import ContextTypes, CommandHandler, Application
 from Hina.config import OWNER_ID, DEV_USERS
+from Hina.modules.helper_funcs import http_client
 
 LOGGER = logging.getLogger(__name__)
 
@@ -84,9 +84,9 @@ async def error_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     )
     
     try:
-        key = requests.post(
-            "https://nekobin.com/api/documents", json={"content": pretty_message}, timeout=10
-        ).json()
+        key = await http_client.post_json(
+            "https://nekobin.com/api/documents", json={"content": pretty_message}
+        )
         e = html.escape(f"{context.error}")
         
         if not key.get("result", {}).get("key"):
@@ -1,48 +1,43 @@
 from Hina.config import app
 import os
-from time import sleep
 
 from Hina.config import OWNER_ID, app
 from Hina.modules.helper_funcs.extraction import extract_user
+from Hina.modules.helper_funcs.send_scheduler import Lane, scheduler
 from Hina.modules.sql.users_sql import get_user_com_chats
 from telegram import Update
 from telegram.constants import ParseMode
-from telegram.error import BadRequest, RetryAfter, TelegramError
 from telegram.ext import ContextTypes, CommandHandler, filters
 
 
-def get_user_common_chats(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def get_user_common_chats(update: Update, context: ContextTypes.DEFAULT_TYPE):
     bot, args = context.bot, context.args
     msg = update.effective_message
-    user = extract_user(msg, args)
+    user = await extract_user(msg, args)
     if not user:
-        msg.reply_text("I share no common chats with the void.")
+        await msg.reply_text("I share no common chats with the void.")
         return
-    common_list = get_user_com_chats(user)
+    common_list = await get_user_com_chats(user)
     if not common_list:
-        msg.reply_text("No common chats with this user!")
+        await msg.reply_text("No common chats with this user!")
         return
-    name = bot.get_chat(user).first_name
+    name = (await bot.get_chat(user)).first_name
     text = f"<b>Common chats with {name}</b>\n"
-    for chat in common_list:
-        try:
-            chat_name = bot.get_chat(chat).title
-            sleep(0.3)
-            text += f"• <code>{chat_name}</code>\n"
-        except BadRequest:
-            pass
-        except TelegramError:
-            pass
-        except RetryAfter as e:
-            sleep(e.retry_after)
+    # Flood waits are retried by the scheduler; chats that still fail are skipped
+    results = await scheduler.map(
+        bot.get_chat, [(int(chat), (chat,)) for chat in common_list], lane=Lane.INTERACTIVE, per_chat=False,
+    )
+    for result in results:
+        if not isinstance(result, Exception):
+            text += f"• <code>{result.title}</code>\n"
 
     if len(text) < 4096:
-        msg.reply_text(text, parse_mode="HTML")
+        await msg.reply_text(text, parse_mode="HTML")
     else:
         with open("common_chats.txt", "w") as f:
             f.write(text)
         with open("common_chats.txt", "rb") as f:
-            msg.reply_document(f)
+            await msg.reply_document(f)
         os.remove("common_chats.txt")
 
 
@@ -1,86 +1,65 @@
 from Hina.config import app
 import datetime
-from typing import List
+from typing import Optional
 
-import requests
-from Hina.config import TIME_API_KEY, app
 from Hina.modules.disable import DisableAbleCommandHandler
+from Hina.modules.helper_funcs import timezones
 from telegram import Update
 from telegram.constants import ParseMode
-from telegram.constants import ParseMode
 from telegram.ext import ContextTypes
 
+# Built once at import, /time lookups never leave the process
+timezones.get_index()
 
-def generate_time(to_find: str, findtype: List[str]) -> str:
-    data = requests.get(
-        f"https://api.timezonedb.com/v2.1/list-time-zone"
-        f"?key={TIME_API_KEY}"
-        f"&format=json"
-        f"&fields=countryCode,countryName,zoneName,gmtOffset,timestamp,dst",
-    ).json()
-
-    for zone in data["zones"]:
-        for eachtype in findtype:
-            if to_find in zone[eachtype].lower():
-                country_name = zone["countryName"]
-                country_zone = zone["zoneName"]
-                country_code = zone["countryCode"]
-
-                if zone["dst"] == 1:
-                    daylight_saving = "Yes"
-                else:
-                    daylight_saving = "No"
-
-                date_fmt = r"%d-%m-%Y"
-                time_fmt = r"%H:%M:%S"
-                day_fmt = r"%A"
-                gmt_offset = zone["gmtOffset"]
-                timestamp = datetime.datetime.now(
-                    datetime.timezone.utc,
-                ) + datetime.timedelta(seconds=gmt_offset)
-                current_date = timestamp.strftime(date_fmt)
-                current_time = timestamp.strftime(time_fmt)
-                current_day = timestamp.strftime(day_fmt)
-
-                break
 
-    try:
-        result = (
-            f"<b>Country:</b> <code>{country_name}</code>\n"
-            f"<b>Zone Name:</b> <code>{country_zone}</code>\n"
-            f"<b>Country Code:</b> <code>{country_code}</code>\n"
-            f"<b>Daylight saving:</b> <code>{daylight_saving}</code>\n"
-            f"<b>Day:</b> <code>{current_day}</code>\n"
-            f"<b>Current Time:</b> <code>{current_time}</code>\n"
-            f"<b>Current Date:</b> <code>{current_date}</code>\n"
-            '<b>Timezones:</b> <a href="https://en.wikipedia.org/wiki/List_of_tz_database_time_zones">List here</a>'
-        )
-    except:
-        result = None
+def generate_time(to_find: str) -> Optional[str]:
+    matches = timezones.get_index().search(to_find)
+    if not matches:
+        return None
+    zone = matches[0]
 
+    timestamp = datetime.datetime.now(zone.tz)
+    if timestamp.dst():
+        daylight_saving = "Yes"
+    else:
+        daylight_saving = "No"
+
+    date_fmt = r"%d-%m-%Y"
+    time_fmt = r"%H:%M:%S"
+    day_fmt = r"%A"
+    current_date = timestamp.strftime(date_fmt)
+    current_time = timestamp.strftime(time_fmt)
+    current_day = timestamp.strftime(day_fmt)
+
+    result = (
+        f"<b>Country:</b> <code>{zone.country_name or 'N/A'}</code>\n"
+        f"<b>Zone Name:</b> <code>{zone.zone_name}</code>\n"
+        f"<b>Country Code:</b> <code>{zone.country_code or 'N/A'}</code>\n"
+        f"<b>UTC Offset:</b> <code>{timestamp.strftime('%z')}</code>\n"
+        f"<b>Daylight saving:</b> <code>{daylight_saving}</code>\n"
+        f"<b>Day:</b> <code>{current_day}</code>\n"
+        f"<b>Current Time:</b> <code>{current_time}</code>\n"
+        f"<b>Current Date:</b> <code>{current_date}</code>\n"
+    )
+    if len(matches) > 1:
+        others = ", ".join(entry.zone_name for entry in matches[1:6])
+        result += f"<b>Other zones:</b> <code>{others}</code>\n"
+    result += '<b>Timezones:</b> <a href="https://en.wikipedia.org/wiki/List_of_tz_database_time_zones">List here</a>'
     return result
 
 
-def gettime(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def gettime(update: Update, context: ContextTypes.DEFAULT_TYPE):
     message = update.effective_message
 
     try:
         query = message.text.strip().split(" ", 1)[1]
     except:
-        message.reply_text("Provide a country name/abbreviation/timezone to find.")
+        await message.reply_text("Provide a country name/abbreviation/timezone to find.")
         return
-    send_message = message.reply_text(
-        f"Finding timezone info for <b>{query}</b>", parse_mode=ParseMode.HTML,
-    )
-
-    query_timezone = query.lower()
-    if len(query_timezone) == 2:
-        result = generate_time(query_timezone, ["countryCode"])
-    else:
-        result = generate_time(query_timezone, ["zoneName", "countryName"])
+    result = generate_time(query)
 
     if not result:
-        send_message.edit_text(
+        await message.reply_text(
             f"Timezone info not available for <b>{query}</b>\n"
             '<b>All Timezones:</b> <a href="https://en.wikipedia.org/wiki/List_of_tz_database_time_zones">List here</a>',
             parse_mode=ParseMode.HTML,
@@ -88,7 +67,7 @@ def gettime(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return
 
-    send_message.edit_text(
+    await message.reply_text(
         result, parse_mode=ParseMode.HTML, disable_web_page_preview=True,
     )
 
@@ -1,13 +1,12 @@
 from Hina.config import app
 import html
+import tempfile
 import time
 from datetime import datetime
-from io import BytesIO
 
 from telegram import Update
 from telegram.constants import ParseMode
-from telegram.constants import ParseMode
-from telegram.error import BadRequest, TelegramError, TelegramError
+from telegram.error import BadRequest
 from telegram.ext import (
     ContextTypes,
     CommandHandler,
@@ -33,6 +32,7 @@ from Hina.config import (
     app
 )
 from Hina.modules.helper_funcs.chat_status import (
+    get_bot_member,
     is_user_admin,
     support_plus,
     user_admin,
@@ -41,7 +41,9 @@ from Hina.modules.helper_funcs.extraction import (
     extract_user,
     extract_user_and_text,
 )
-from Hina.modules.helper_funcs.misc import send_to_list
+from Hina.modules.helper_funcs.misc import LIST_SPOOL_SIZE, send_to_list
+from Hina.modules.helper_funcs.send_scheduler import Lane, scheduler
+from Hina.modules.helper_funcs.spamwatch_client import SpamWatchError, sw
 
 GBAN_ENFORCE_GROUP = 6
 
@@ -75,81 +77,81 @@ UNGBAN_ERRORS = {
 
 
 @support_plus
-def gban(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def gban(update: Update, context: ContextTypes.DEFAULT_TYPE):
     bot, args = context.bot, context.args
     message = update.effective_message
     user = update.effective_user
     chat = update.effective_chat
     log_message = ""
 
-    user_id, reason = extract_user_and_text(message, args)
+    user_id, reason = await extract_user_and_text(message, args)
 
     if not user_id:
-        message.reply_text(
+        await message.reply_text(
             "You don't seem to be referring to a user or the ID specified is incorrect..",
         )
         return
 
     if int(user_id) in DEV_USERS:
-        message.reply_text(
+        await message.reply_text(
             "That user is part of the Association\nI can't act against our own.",
         )
         return
 
     if int(user_id) in DRAGONS:
-        message.reply_text(
+        await message.reply_text(
             "I spy, with my little eye... a disaster! Why are you guys turning on each other?",
         )
         return
 
     if int(user_id) in DEMONS:
-        message.reply_text(
+        await message.reply_text(
             "OOOH someone's trying to gban a Demon Disaster! *grabs popcorn*",
         )
         return
 
     if int(user_id) in TIGERS:
-        message.reply_text("That's a Tiger! They cannot be banned!")
+        await message.reply_text("That's a Tiger! They cannot be banned!")
         return
 
     if int(user_id) in WOLVES:
-        message.reply_text("That's a Wolf! They cannot be banned!")
+        await message.reply_text("That's a Wolf! They cannot be banned!")
         return
 
     if user_id == bot.id:
-        message.reply_text("You uhh...want me to punch myself?")
+        await message.reply_text("You uhh...want me to punch myself?")
         return
 
     if user_id in [777000, 1087968824]:
-        message.reply_text("Fool! You can't attack Telegram's native tech!")
+        await message.reply_text("Fool! You can't attack Telegram's native tech!")
         return
 
     try:
-        user_chat = bot.get_chat(user_id)
+        user_chat = await bot.get_chat(user_id)
     except BadRequest as excp:
         if excp.message == "User not found":
-            message.reply_text("I can't seem to find this user.")
+            await message.reply_text("I can't seem to find this user.")
             return ""
         else:
             return
 
     if user_chat.type != "private":
-        message.reply_text("That's not a user!")
+        await message.reply_text("That's not a user!")
         return
 
     if sql.is_user_gbanned(user_id):
 
         if not reason:
-            message.reply_text(
+            await message.reply_text(
                 "This user is already gbanned; I'd change the reason, but you haven't given me one...",
             )
             return
 
-        old_reason = sql.update_gban_reason(
+        old_reason = await sql.update_gban_reason(
             user_id, user_chat.username or user_chat.first_name, reason,
         )
         if old_reason:
-            message.reply_text(
+            await message.reply_text(
                 "This user is already gbanned, for the following reason:\n"
                 "<code>{}</code>\n"
                 "I've gone and updated it with your new reason!".format(
@@ -159,13 +161,13 @@ def gban(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
 
         else:
-            message.reply_text(
+            await message.reply_text(
                 "This user is already gbanned, but had no reason set; I've gone and updated it!",
             )
 
         return
 
-    message.reply_text("On it!")
+    await message.reply_text("On it!")
 
     start_time = time.time()
     datetime_fmt = "%Y-%m-%dT%H:%M"
@@ -193,62 +195,57 @@ def gban(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     if EVENT_LOGS:
         try:
-            log = bot.send_message(EVENT_LOGS, log_message, parse_mode=ParseMode.HTML)
+            log = await bot.send_message(EVENT_LOGS, log_message, parse_mode=ParseMode.HTML)
         except BadRequest as excp:
-            log = bot.send_message(
+            log = await bot.send_message(
                 EVENT_LOGS,
                 log_message
                 + "\n\nFormatting has been disabled due to an unexpected error.",
             )
 
     else:
-        send_to_list(bot, DRAGONS + DEMONS, log_message, html=True)
+        await send_to_list(bot, DRAGONS | DEMONS, log_message, html=True)
 
-    sql.gban_user(user_id, user_chat.username or user_chat.first_name, reason)
+    await sql.gban_user(user_id, user_chat.username or user_chat.first_name, reason)
 
-    chats = get_user_com_chats(user_id)
+    # Chats that opted out of gbans are skipped
+    chats = [int(chat) for chat in await get_user_com_chats(user_id) if sql.does_chat_gban(chat)]
+    results = await scheduler.map(
+        bot.ban_chat_member,
+        [(chat_id, (chat_id, user_id)) for chat_id in chats],
+        lane=Lane.MODERATION,
+        per_chat=False,
+    )
     gbanned_chats = 0
 
-    for chat in chats:
-        chat_id = int(chat)
-
-        # Check if this group has disabled gbans
-        if not sql.does_chat_gban(chat_id):
-            continue
-
-        try:
-            bot.kick_chat_member(chat_id, user_id)
+    for result in results:
+        if not isinstance(result, Exception):
             gbanned_chats += 1
-
-        except BadRequest as excp:
-            if excp.message in GBAN_ERRORS:
-                pass
+        elif isinstance(result, BadRequest) and result.message not in GBAN_ERRORS:
+            excp = result
+            await message.reply_text(f"Could not gban due to: {excp.message}")
+            if EVENT_LOGS:
+                await bot.send_message(
+                    EVENT_LOGS,
+                    f"Could not gban due to {excp.message}",
+                    parse_mode=ParseMode.HTML,
+                )
             else:
-                message.reply_text(f"Could not gban due to: {excp.message}")
-                if EVENT_LOGS:
-                    bot.send_message(
-                        EVENT_LOGS,
-                        f"Could not gban due to {excp.message}",
-                        parse_mode=ParseMode.HTML,
-                    )
-                else:
-                    send_to_list(
-                        bot, DRAGONS + DEMONS, f"Could not gban due to: {excp.message}",
-                    )
-                sql.ungban_user(user_id)
-                return
-        except TelegramError:
-            pass
+                await send_to_list(
+                    bot, DRAGONS | DEMONS, f"Could not gban due to: {excp.message}",
+                )
+            await sql.ungban_user(user_id)
+            return
 
     if EVENT_LOGS:
-        log.edit_text(
+        await log.edit_text(
             log_message + f"\n<b>Chats affected:</b> <code>{gbanned_chats}</code>",
             parse_mode=ParseMode.HTML,
         )
     else:
-        send_to_list(
+        await send_to_list(
             bot,
-            DRAGONS + DEMONS,
+            DRAGONS | DEMONS,
             f"Gban complete! (User banned in <code>{gbanned_chats}</code> chats)",
             html=True,
         )
@@ -258,16 +255,16 @@ def gban(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     if gban_time > 60:
         gban_time = round((gban_time / 60), 2)
-        message.reply_text("Done! Gbanned.", parse_mode=ParseMode.HTML)
+        await message.reply_text("Done! Gbanned.", parse_mode=ParseMode.HTML)
     else:
-        message.reply_text("Done! Gbanned.", parse_mode=ParseMode.HTML)
+        await message.reply_text("Done! Gbanned.", parse_mode=ParseMode.HTML)
 
     try:
-        bot.send_message(
+        await bot.send_message(
             user_id,
             "#EVENT"
             "You have been marked as Malicious and as such have been banned from any future groups we manage."
-            f"\n<b>Reason:</b> <code>{html.escape(user.reason)}</code>"
+            f"\n<b>Reason:</b> <code>{html.escape(reason or 'None')}</code>"
             f"</b>Appeal Chat:</b> @{SUPPORT_CHAT}",
             parse_mode=ParseMode.HTML,
         )
@@ -276,31 +273,31 @@ def gban(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 @support_plus
-def ungban(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def ungban(update: Update, context: ContextTypes.DEFAULT_TYPE):
     bot, args = context.bot, context.args
     message = update.effective_message
     user = update.effective_user
     chat = update.effective_chat
     log_message = ""
 
-    user_id = extract_user(message, args)
+    user_id = await extract_user(message, args)
 
     if not user_id:
-        message.reply_text(
+        await message.reply_text(
             "You don't seem to be referring to a user or the ID specified is incorrect..",
         )
         return
 
-    user_chat = bot.get_chat(user_id)
+    user_chat = await bot.get_chat(user_id)
     if user_chat.type != "private":
-        message.reply_text("That's not a user!")
+        await message.reply_text("That's not a user!")
         return
 
     if not sql.is_user_gbanned(user_id):
-        message.reply_text("This user is not gbanned!")
+        await message.reply_text("This user is not gbanned!")
         return
 
-    message.reply_text(f"I'll give {user_chat.first_name} a second chance, globally.")
+    await message.reply_text(f"I'll give {user_chat.first_name} a second chance, globally.")
 
     start_time = time.time()
     datetime_fmt = "%Y-%m-%dT%H:%M"
@@ -322,110 +319,103 @@ def ungban(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     if EVENT_LOGS:
         try:
-            log = bot.send_message(EVENT_LOGS, log_message, parse_mode=ParseMode.HTML)
+            log = await bot.send_message(EVENT_LOGS, log_message, parse_mode=ParseMode.HTML)
         except BadRequest as excp:
-            log = bot.send_message(
+            log = await bot.send_message(
                 EVENT_LOGS,
                 log_message
                 + "\n\nFormatting has been disabled due to an unexpected error.",
             )
     else:
-        send_to_list(bot, DRAGONS + DEMONS, log_message, html=True)
-
-    chats = get_user_com_chats(user_id)
+        await send_to_list(bot, DRAGONS | DEMONS, log_message, html=True)
+
+    chats = [int(chat) for chat in await get_user_com_chats(user_id) if sql.does_chat_gban(chat)]
+    # only_if_banned leaves members that were never kicked alone, no need to look them up first
+    results = await scheduler.map(
+        bot.unban_chat_member,
+        [(chat_id, (chat_id, user_id)) for chat_id in chats],
+        lane=Lane.MODERATION,
+        per_chat=False,
+        only_if_banned=True,
+    )
     ungbanned_chats = 0
 
-    for chat in chats:
-        chat_id = int(chat)
-
-        # Check if this group has disabled gbans
-        if not sql.does_chat_gban(chat_id):
-            continue
-
-        try:
-            member = bot.get_chat_member(chat_id, user_id)
-            if member.status == "kicked":
-                bot.unban_chat_member(chat_id, user_id)
-                ungbanned_chats += 1
-
-        except BadRequest as excp:
-            if excp.message in UNGBAN_ERRORS:
-                pass
+    for result in results:
+        if not isinstance(result, Exception):
+            ungbanned_chats += 1
+        elif isinstance(result, BadRequest) and result.message not in UNGBAN_ERRORS:
+            excp = result
+            await message.reply_text(f"Could not un-gban due to: {excp.message}")
+            if EVENT_LOGS:
+                await bot.send_message(
+                    EVENT_LOGS,
+                    f"Could not un-gban due to: {excp.message}",
+                    parse_mode=ParseMode.HTML,
+                )
             else:
-                message.reply_text(f"Could not un-gban due to: {excp.message}")
-                if EVENT_LOGS:
-                    bot.send_message(
-                        EVENT_LOGS,
-                        f"Could not un-gban due to: {excp.message}",
-                        parse_mode=ParseMode.HTML,
-                    )
-                else:
-                    bot.send_message(
-                        OWNER_ID, f"Could not un-gban due to: {excp.message}",
-                    )
-                return
-        except TelegramError:
-            pass
-
-    sql.ungban_user(user_id)
+                await bot.send_message(
+                    OWNER_ID, f"Could not un-gban due to: {excp.message}",
+                )
+            return
+
+    await sql.ungban_user(user_id)
 
     if EVENT_LOGS:
-        log.edit_text(
+        await log.edit_text(
             log_message + f"\n<b>Chats affected:</b> {ungbanned_chats}",
             parse_mode=ParseMode.HTML,
         )
     else:
-        send_to_list(bot, DRAGONS + DEMONS, "un-gban complete!")
+        await send_to_list(bot, DRAGONS | DEMONS, "un-gban complete!")
 
     end_time = time.time()
     ungban_time = round((end_time - start_time), 2)
 
     if ungban_time > 60:
         ungban_time = round((ungban_time / 60), 2)
-        message.reply_text(f"Person has been un-gbanned. Took {ungban_time} min")
+        await message.reply_text(f"Person has been un-gbanned. Took {ungban_time} min")
     else:
-        message.reply_text(f"Person has been un-gbanned. Took {ungban_time} sec")
+        await message.reply_text(f"Person has been un-gbanned. Took {ungban_time} sec")
 
 
 @support_plus
-def gbanlist(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    banned_users = sql.get_gban_list()
-
-    if not banned_users:
-        update.effective_message.reply_text(
+async def gbanlist(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if not sql.num_gbanned_users():
+        await update.effective_message.reply_text(
             "There aren't any gbanned users! You're kinder than I expected...",
         )
         return
 
-    banfile = "Screw these guys.\n"
-    for user in banned_users:
-        banfile += f"[x] {user['name']} - {user['user_id']}\n"
-        if user["reason"]:
-            banfile += f"Reason: {user['reason']}\n"
-
-    with BytesIO(str.encode(banfile)) as output:
-        output.name = "gbanlist.txt"
-        update.effective_message.reply_document(
+    # Written as the rows stream in, only spills to disk once it gets large
+    with tempfile.SpooledTemporaryFile(max_size=LIST_SPOOL_SIZE) as output:
+        output.write(b"Screw these guys.\n")
+        async for user_id, name, reason in sql.iter_gban_list():
+            line = f"[x] {name} - {user_id}\n"
+            if reason:
+                line += f"Reason: {reason}\n"
+            output.write(line.encode())
+        output.seek(0)
+        await update.effective_message.reply_document(
             document=output,
             filename="gbanlist.txt",
             caption="Here is the list of currently gbanned users.",
         )
 
 
-def check_and_ban(update, user_id, should_message=True):
+async def check_and_ban(update, user_id, should_message=True):
 
-    if user_id in TIGERS or user_id in WOLVES:
+    if user_id in TIGERS or user_id in WOLVES or not sw.configured:
         sw_ban = None
     else:
         try:
-            sw_ban = sw.get_ban(int(user_id))
-        except:
+            sw_ban = await sw.get_ban(int(user_id))
+        except SpamWatchError:
             sw_ban = None
 
     if sw_ban:
-        update.effective_chat.kick_member(user_id)
+        await update.effective_chat.ban_member(user_id)
         if should_message:
-            update.effective_message.reply_text(
+            await update.effective_message.reply_text(
                 f"<b>Alert</b>: this user is globally banned.\n"
                 f"<code>*bans them from here*</code>.\n"
                 f"<b>Appeal chat</b>: {SPAMWATCH_SUPPORT_CHAT}\n"
@@ -436,7 +426,7 @@ def check_and_ban(update, user_id, should_message=True):
         return
 
     if sql.is_user_gbanned(user_id):
-        update.effective_chat.kick_member(user_id)
+        await update.effective_chat.ban_member(user_id)
         if should_message:
             text = (
                 f"<b>Alert</b>: this user is globally banned.\n"
@@ -444,39 +434,36 @@ def check_and_ban(update, user_id, should_message=True):
                 f"<b>Appeal chat</b>: @{SUPPORT_CHAT}\n"
                 f"<b>User ID</b>: <code>{user_id}</code>"
             )
-            user = sql.get_gbanned_user(user_id)
-            if user.reason:
+            user = await sql.get_gbanned_user(user_id)
+            if user and user.reason:
                 text += f"\n<b>Ban Reason:</b> <code>{html.escape(user.reason)}</code>"
-            update.effective_message.reply_text(text, parse_mode=ParseMode.HTML)
+            await update.effective_message.reply_text(text, parse_mode=ParseMode.HTML)
 
 
-def enforce_gban(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def enforce_gban(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Not using @restrict handler to avoid spamming - just ignore if cant gban.
     bot = context.bot
-    try:
-        restrict_permission = update.effective_chat.get_member(
-            bot.id,
-        ).can_restrict_members
-    except TelegramError:
+    if not sql.does_chat_gban(update.effective_chat.id):
         return
-    if sql.does_chat_gban(update.effective_chat.id) and restrict_permission:
+    bot_member = await get_bot_member(update.effective_chat.id, bot.id)
+    if getattr(bot_member, "can_restrict_members", False):
         user = update.effective_user
         chat = update.effective_chat
         msg = update.effective_message
 
-        if user and not is_user_admin(chat, user.id):
-            check_and_ban(update, user.id)
+        if user and not await is_user_admin(chat, user.id):
+            await check_and_ban(update, user.id)
             return
 
         if msg.new_chat_members:
             new_members = update.effective_message.new_chat_members
             for mem in new_members:
-                check_and_ban(update, mem.id)
+                await check_and_ban(update, mem.id)
 
         if msg.reply_to_message:
             user = msg.reply_to_message.from_user
-            if user and not is_user_admin(chat, user.id):
-                check_and_ban(update, user.id, should_message=False)
+            if user and not await is_user_admin(chat, user.id):
+                await check_and_ban(update, user.id, should_message=False)
 
 
 @user_admin
@@ -1,10 +1,31 @@
 from Hina.config import app
+import asyncio
+
 from emoji import EMOJI_DATA as UNICODE_EMOJI
 from googletrans import LANGUAGES, Translator
 from telegram import Update
 from telegram.constants import ParseMode
 from telegram.ext import ContextTypes, CommandHandler
 from Hina.modules.disable import DisableAbleCommandHandler
+from Hina.modules.helper_funcs import response_cache
+
+
+def _translate(text, source_lang, dest_lang):
+    translator = Translator()
+    if source_lang is None:
+        source_lang = translator.detect(text).lang
+    return [source_lang, translator.translate(text, src=source_lang, dest=dest_lang).text]
+
+
+async def translate(text, source_lang, dest_lang):
+    """Return [source language, translation], reusing earlier translations of the same text."""
+    return await response_cache.cached(
+        "translate",
+        (text, source_lang, dest_lang),
+        lambda: asyncio.to_thread(_translate, text, source_lang, dest_lang),
+        fold_case=False,
+    )
+
 
 async def totranslate(update: Update, context: ContextTypes.DEFAULT_TYPE):
     message = update.effective_message
@@ -58,20 +79,11 @@ async def totranslate(update: Update, context: ContextTypes.DEFAULT_TYPE):
             if emoji in text:
                 text = text.replace(emoji, "")
 
-        translator = Translator()
-        if source_lang is None:
-            detection = translator.detect(text)
-            trans_str = translator.translate(text, dest=dest_lang).text
-            await message.reply_text(
-                f"Translated from `{detection.lang}` to `{dest_lang}`:\n`{trans_str}`",
-                parse_mode=ParseMode.MARKDOWN,
-            )
-        else:
-            trans_str = translator.translate(text, src=source_lang, dest=dest_lang).text
-            await message.reply_text(
-                f"Translated from `{source_lang}` to `{dest_lang}`:\n`{trans_str}`",
-                parse_mode=ParseMode.MARKDOWN,
-            )
+        source_lang, trans_str = await translate(text, source_lang, dest_lang)
+        await message.reply_text(
+            f"Translated from `{source_lang}` to `{dest_lang}`:\n`{trans_str}`",
+            parse_mode=ParseMode.MARKDOWN,
+        )
 
     except IndexError:
         await update.effective_message.reply_text(
@@ -0,0 +1,200 @@
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+from telegram import Bot
+from telegram.error import Forbidden
+
+from Hina.config import LOGGER
+from Hina.modules.helper_funcs.send_scheduler import Lane, scheduler
+from Hina.modules.sql import broadcast_sql as sql
+from Hina.modules.sql import users_sql
+
+# Recipients read from the database and queued per round; progress is saved after each
+PAGE_SIZE = 200
+
+
+class JobProgress:
+    """Live counters of a broadcast running in this process."""
+
+    __slots__ = (
+        "job_id", "phases", "phase", "cursor", "delivered", "failed", "blocked",
+        "started_at", "cancelled", "task",
+    )
+
+    def __init__(self, job: sql.BroadcastJobs) -> None:
+        self.job_id = job.job_id
+        self.phases: List[str] = [
+            phase for phase, enabled in ((sql.PHASE_GROUPS, job.to_groups), (sql.PHASE_USERS, job.to_users))
+            if enabled
+        ]
+        self.phase = job.phase
+        self.cursor = job.cursor
+        self.delivered = job.delivered
+        self.failed = job.failed
+        self.blocked = job.blocked
+        self.started_at = time.time()
+        self.cancelled = False
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def sent(self) -> int:
+        return self.delivered + self.failed + self.blocked
+
+    def record(self, future: asyncio.Future) -> None:
+        if future.cancelled():
+            return
+        excp = future.exception()
+        if excp is None:
+            self.delivered += 1
+        elif isinstance(excp, Forbidden):
+            # Blocked by the user, or removed from the group
+            self.blocked += 1
+        else:
+            self.failed += 1
+
+    def report(self, status: str) -> str:
+        return (
+            f"Broadcast #{self.job_id} {status}.\n"
+            f"Delivered: {self.delivered}\n"
+            f"Failed: {self.failed}\n"
+            f"Blocked: {self.blocked}"
+        )
+
+
+_jobs: Dict[int, JobProgress] = {}
+
+
+async def _fetch_page(phase: str, cursor: Optional[str]) -> list:
+    if phase == sql.PHASE_GROUPS:
+        return await users_sql.get_chat_ids_after(cursor, PAGE_SIZE)
+    return await users_sql.get_user_ids_after(cursor, PAGE_SIZE)
+
+
+def _completed_prefix(ids: list, futures: List[asyncio.Future]) -> Optional[str]:
+    """Last id before the first send of the page that didn't complete."""
+    last = None
+    for target, future in zip(ids, futures):
+        if not future.done() or future.cancelled():
+            break
+        last = str(target)
+    return last
+
+
+async def _checkpoint(progress: JobProgress) -> None:
+    await sql.save_checkpoint(
+        progress.job_id, progress.phase, progress.cursor,
+        progress.delivered, progress.failed, progress.blocked,
+    )
+
+
+async def _run(bot: Bot, job: sql.BroadcastJobs, progress: JobProgress) -> None:
+    ids, futures = [], []
+    try:
+        for phase in progress.phases[progress.phases.index(progress.phase):]:
+            if phase != progress.phase:
+                progress.phase, progress.cursor = phase, None
+            while True:
+                ids = await _fetch_page(phase, progress.cursor)
+                if not ids:
+                    break
+                futures = []
+                for target in ids:
+                    future = scheduler.submit(
+                        bot.send_message,
+                        int(target),
+                        job.text,
+                        target=int(target),
+                        lane=Lane.BULK,
+                        parse_mode="MARKDOWN",
+                        disable_web_page_preview=True,
+                    )
+                    future.add_done_callback(progress.record)
+                    futures.append(future)
+                await asyncio.gather(*futures, return_exceptions=True)
+                progress.cursor = str(ids[-1])
+                ids, futures = [], []
+                await _checkpoint(progress)
+        status, outcome = sql.DONE, "finished"
+    except asyncio.CancelledError:
+        # Sends are mostly served in order, so only the unfinished tail of the page is lost
+        progress.cursor = _completed_prefix(ids, futures) or progress.cursor
+        if not progress.cancelled:
+            # Shutting down; the job stays running and resumes from its checkpoint
+            await _checkpoint(progress)
+            raise
+        status, outcome = sql.CANCELLED, "cancelled"
+    except Exception:
+        LOGGER.exception("Broadcast %s stopped", progress.job_id)
+        status, outcome = sql.CANCELLED, "stopped by an error"
+    finally:
+        _jobs.pop(progress.job_id, None)
+
+    await _checkpoint(progress)
+    await sql.finish_job(progress.job_id, status)
+    try:
+        await scheduler.call(
+            bot.send_message,
+            int(job.report_chat),
+            progress.report(outcome),
+            target=int(job.report_chat),
+            lane=Lane.INTERACTIVE,
+        )
+    except Exception:
+        LOGGER.warning("Could not deliver the report of broadcast %s", progress.job_id)
+
+
+def _launch(bot: Bot, job: sql.BroadcastJobs) -> JobProgress:
+    progress = JobProgress(job)
+    progress.task = asyncio.create_task(_run(bot, job, progress))
+    _jobs[job.job_id] = progress
+    return progress
+
+
+async def start_job(bot: Bot, text: str, to_groups: bool, to_users: bool, owner_id: int, report_chat) -> int:
+    """Record a new broadcast and start sending it in the background; returns its id."""
+    job = await sql.create_job(text, to_groups, to_users, owner_id, report_chat)
+    _launch(bot, job)
+    return job.job_id
+
+
+def get_progress(job_id: int) -> Optional[JobProgress]:
+    return _jobs.get(job_id)
+
+
+def running_jobs() -> List[JobProgress]:
+    return list(_jobs.values())
+
+
+def cancel_job(job_id: int) -> bool:
+    """Stop a running broadcast; its final report is sent once it has wound down."""
+    progress = _jobs.get(job_id)
+    if progress is None or progress.task is None:
+        return False
+    progress.cancelled = True
+    progress.task.cancel()
+    return True
+
+
+async def resume_jobs(bot: Bot) -> int:
+    """Restart broadcasts that were running at the last shutdown (call from the running event loop)"""
+    resumed = 0
+    for job in await sql.get_running_jobs():
+        if job.job_id not in _jobs:
+            _launch(bot, job)
+            resumed += 1
+    if resumed:
+        LOGGER.info("Resumed %s broadcast(s)", resumed)
+    return resumed
+
+
+async def stop_jobs() -> None:
+    """Stop all broadcasts without cancelling them, so they resume on the next start."""
+    tasks = [progress.task for progress in _jobs.values() if progress.task is not None]
+    for task in tasks:
+        task.cancel()
+    for task in tasks:
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
@@ -1,11 +1,9 @@
 import asyncio
-from time import perf_counter
+from time import monotonic
 from functools import wraps
-from cachetools import TTLCache
-from threading import RLock
-from typing import Optional, Set, Callable, Awaitable, Any, TypeVar, cast, List
+from typing import Dict, Optional, Set, Callable, Awaitable, Any, TypeVar, cast, List
 
-from telegram import Chat, ChatMember, Update
+from telegram import Chat, ChatMember, ChatMemberUpdated, Update
 from telegram.constants import ParseMode, ChatMemberStatus, ChatType
 from telegram.ext import ContextTypes
 from telegram.helpers import mention_html
@@ -25,24 +23,128 @@ from Hina.modules.helper_funcs.misc import LOGGER
 # Type variable for generic function type
 F = TypeVar('F', bound=Callable[..., Awaitable[Any]])
 
-# stores admins in memory for 10 min
-ADMIN_CACHE = TTLCache(maxsize=512, ttl=60 * 10, timer=perf_counter)
-THREAD_LOCK = RLock()
+# Admin ids per chat. There is no size limit: entries are small sets kept
+# current by chat_member updates, /admincache and a background refresh.
+ADMIN_CACHE: Dict[int, Set[int]] = {}
+# chat_id -> monotonic time of the last full fetch
+ADMIN_CACHE_FETCHED: Dict[int, float] = {}
+ADMIN_CACHE_TTL = 60 * 10
+# entries older than this are refreshed in the background while still served
+ADMIN_CACHE_REFRESH_AHEAD = 60 * 8
+# chat_id -> in-flight get_chat_administrators call, shared by concurrent misses
+_ADMIN_FETCHES: Dict[int, "asyncio.Task[Set[int]]"] = {}
+
+ADMIN_STATUSES = (ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.OWNER)
+
+# The bot's own ChatMember per chat, kept current by my_chat_member updates and
+# re-fetched lazily once older than BOT_MEMBER_TTL.
+BOT_MEMBER_CACHE: Dict[int, ChatMember] = {}
+BOT_MEMBER_FETCHED: Dict[int, float] = {}
+BOT_MEMBER_TTL = 60 * 60
+_BOT_MEMBER_FETCHES: Dict[int, "asyncio.Task[Optional[ChatMember]]"] = {}
 
 # Telegram's special IDs
 ANONYMOUS_ADMINS = {1087968824, 136817688, 777000}
 
-async def refresh_admin_cache(chat_id: int) -> Set[int]:
-    """Refresh admin cache for a chat"""
+async def _fetch_admins(chat_id: int) -> Set[int]:
     try:
         admins = await app.bot.get_chat_administrators(chat_id)
         admin_list = {admin.user.id for admin in admins}
-        with THREAD_LOCK:
-            ADMIN_CACHE[chat_id] = admin_list
+        ADMIN_CACHE[chat_id] = admin_list
+        ADMIN_CACHE_FETCHED[chat_id] = monotonic()
         return admin_list
     except Exception as e:
         LOGGER.error(f"Error refreshing admin cache for chat {chat_id}: {e}")
-        return set()
+        return ADMIN_CACHE.get(chat_id, set())
+    finally:
+        _ADMIN_FETCHES.pop(chat_id, None)
+
+def _start_fetch(chat_id: int) -> "asyncio.Task[Set[int]]":
+    task = _ADMIN_FETCHES.get(chat_id)
+    if task is None:
+        task = _ADMIN_FETCHES[chat_id] = asyncio.create_task(_fetch_admins(chat_id))
+    return task
+
+async def refresh_admin_cache(chat_id: int) -> Set[int]:
+    """Refresh admin cache for a chat (concurrent callers share one API call)"""
+    return await asyncio.shield(_start_fetch(chat_id))
+
+async def get_chat_admins(chat_id: int) -> Set[int]:
+    """Get the admin ids of a chat, fetching only on a miss or after expiry"""
+    admin_list = ADMIN_CACHE.get(chat_id)
+    if admin_list is None:
+        return await refresh_admin_cache(chat_id)
+
+    age = monotonic() - ADMIN_CACHE_FETCHED.get(chat_id, 0)
+    if age > ADMIN_CACHE_TTL:
+        return await refresh_admin_cache(chat_id)
+    if age > ADMIN_CACHE_REFRESH_AHEAD:
+        _start_fetch(chat_id)
+    return admin_list
+
+def update_admin_cache(chat_id: int, user_id: int, status: str) -> None:
+    """Apply a single member status change to a cached chat"""
+    admin_list = ADMIN_CACHE.get(chat_id)
+    if admin_list is None:
+        return
+    if status in ADMIN_STATUSES:
+        admin_list.add(user_id)
+    else:
+        admin_list.discard(user_id)
+
+def drop_admin_cache(chat_id: int) -> None:
+    ADMIN_CACHE.pop(chat_id, None)
+    ADMIN_CACHE_FETCHED.pop(chat_id, None)
+
+async def admin_cache_member_update(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """ChatMemberUpdated callback: keep ADMIN_CACHE in sync on promote/demote/leave"""
+    member_update: ChatMemberUpdated = update.chat_member or update.my_chat_member
+    if not member_update:
+        return
+    update_admin_cache(
+        member_update.chat.id,
+        member_update.new_chat_member.user.id,
+        member_update.new_chat_member.status,
+    )
+
+
+async def _fetch_bot_member(chat_id: int, bot_id: int) -> Optional[ChatMember]:
+    try:
+        member = await app.bot.get_chat_member(chat_id, bot_id)
+        BOT_MEMBER_CACHE[chat_id] = member
+        BOT_MEMBER_FETCHED[chat_id] = monotonic()
+        return member
+    except Exception as e:
+        LOGGER.error(f"Error fetching bot member for chat {chat_id}: {e}")
+        return BOT_MEMBER_CACHE.get(chat_id)
+    finally:
+        _BOT_MEMBER_FETCHES.pop(chat_id, None)
+
+async def get_bot_member(chat_id: int, bot_id: int) -> Optional[ChatMember]:
+    """Get the bot's own ChatMember in a chat (None if it can't be fetched)"""
+    member = BOT_MEMBER_CACHE.get(chat_id)
+    if member is not None and monotonic() - BOT_MEMBER_FETCHED.get(chat_id, 0) < BOT_MEMBER_TTL:
+        return member
+    task = _BOT_MEMBER_FETCHES.get(chat_id)
+    if task is None:
+        task = _BOT_MEMBER_FETCHES[chat_id] = asyncio.create_task(_fetch_bot_member(chat_id, bot_id))
+    return await asyncio.shield(task)
+
+async def bot_member_cache_update(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """my_chat_member callback: store the bot's new rights, forget chats it left"""
+    member_update = update.my_chat_member
+    if not member_update:
+        return
+    chat_id = member_update.chat.id
+    new_member = member_update.new_chat_member
+    if new_member.status in (ChatMemberStatus.LEFT, ChatMemberStatus.BANNED):
+        BOT_MEMBER_CACHE.pop(chat_id, None)
+        BOT_MEMBER_FETCHED.pop(chat_id, None)
+        drop_admin_cache(chat_id)
+        return
+    BOT_MEMBER_CACHE[chat_id] = new_member
+    BOT_MEMBER_FETCHED[chat_id] = monotonic()
+    update_admin_cache(chat_id, new_member.user.id, new_member.status)
 
 
 def is_whitelist_plus(chat: Chat, user_id: int, member: ChatMember = None) -> bool:
@@ -70,41 +172,25 @@ async def is_user_admin(chat: Chat, user_id: int, member: Optional[ChatMember] =
     
     if not member:
         try:
-            with THREAD_LOCK:
-                admin_list = ADMIN_CACHE.get(chat.id, set())
-            
-            if user_id in admin_list:
-                return True
-            
-            admin_list = await refresh_admin_cache(chat.id)
-            return user_id in admin_list
-            
+            return user_id in await get_chat_admins(chat.id)
         except Exception as e:
             LOGGER.error(f"Error checking admin status: {e}")
             return False
             
-    return member.status in (ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.OWNER)
+    return member.status in ADMIN_STATUSES
 
 async def bot_admin(chat: Chat, bot_id: int) -> bool:
     """Check if bot is admin"""
     if chat.type == ChatType.PRIVATE:
         return True
     
-    try:
-        bot_member = await chat.get_member(bot_id)
-        return bot_member.status in (ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.OWNER)
-    except Exception as e:
-        LOGGER.error(f"Error checking bot admin status: {e}")
-        return False
+    bot_member = await get_bot_member(chat.id, bot_id)
+    return bot_member is not None and bot_member.status in ADMIN_STATUSES
 
 async def can_delete(chat: Chat, bot_id: int) -> bool:
     """Check if bot can delete messages"""
-    try:
-        bot_member = await chat.get_member(bot_id)
-        return bot_member.can_delete_messages
-    except Exception as e:
-        LOGGER.error(f"Error checking delete permissions: {e}")
-        return False
+    bot_member = await get_bot_member(chat.id, bot_id)
+    return bool(getattr(bot_member, "can_delete_messages", False))
 
 async def is_user_ban_protected(chat: Chat, user_id: int, member: Optional[ChatMember] = None) -> bool:
     """Check if user is ban protected"""
@@ -118,9 +204,9 @@ async def is_user_ban_protected(chat: Chat, user_id: int, member: Optional[ChatM
         return True
     
     if not member:
-        member = await chat.get_member(user_id)
+        return user_id in await get_chat_admins(chat.id)
         
-    return member.status in (ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.OWNER)
+    return member.status in ADMIN_STATUSES
 
 async def is_user_in_chat(chat: Chat, user_id: int) -> bool:
     """Check if user is in chat"""
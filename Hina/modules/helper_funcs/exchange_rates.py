@@ -0,0 +1,139 @@
+import asyncio
+import json
+import os
+import time
+from typing import Dict, Optional
+
+from Hina.config import LOGGER
+from Hina.modules.helper_funcs import http_client
+
+# Full table of rates against one base currency, no API key needed; upstream refreshes it daily
+RATES_URL = "https://open.er-api.com/v6/latest/USD"
+RATES_FILE = "exchange_rates.json"
+REFRESH_INTERVAL = 60 * 60
+RETRY_INTERVAL = 5 * 60
+
+
+class RateTable:
+    """Exchange rates of every currency against `base`, as published at `updated_at`."""
+
+    __slots__ = ("base", "rates", "updated_at", "fetched_at")
+
+    def __init__(self, base: str, rates: Dict[str, float], updated_at: float, fetched_at: float) -> None:
+        self.base = base
+        self.rates = rates
+        self.updated_at = updated_at
+        self.fetched_at = fetched_at
+
+    def __contains__(self, currency: str) -> bool:
+        return currency in self.rates
+
+    def convert(self, amount: float, orig_cur: str, new_cur: str) -> float:
+        """Convert through the base currency, so any pair in the table is a cross rate."""
+        return amount * self.rates[new_cur] / self.rates[orig_cur]
+
+    def to_dict(self) -> dict:
+        return {
+            "base": self.base,
+            "rates": self.rates,
+            "updated_at": self.updated_at,
+            "fetched_at": self.fetched_at,
+        }
+
+
+RATES: Optional[RateTable] = None
+# Time of the last failed refresh, cleared on success
+LAST_ERROR_AT: Optional[float] = None
+
+_REFRESH_LOCK = asyncio.Lock()
+_refresh_task: Optional[asyncio.Task] = None
+
+
+def _load_file() -> None:
+    global RATES
+    if not os.path.exists(RATES_FILE):
+        return
+    try:
+        with open(RATES_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        RATES = RateTable(data["base"], data["rates"], data["updated_at"], data["fetched_at"])
+    except (OSError, ValueError, KeyError) as excp:
+        LOGGER.warning("Could not read %s: %s", RATES_FILE, excp)
+
+
+def _save_file(table: RateTable) -> None:
+    tmp_path = f"{RATES_FILE}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(table.to_dict(), f)
+        os.replace(tmp_path, RATES_FILE)
+    except OSError as excp:
+        LOGGER.warning("Could not write %s: %s", RATES_FILE, excp)
+
+
+async def refresh_rates(if_missing: bool = False) -> bool:
+    """Download a new table; on failure the last good one stays in use."""
+    global RATES, LAST_ERROR_AT
+    async with _REFRESH_LOCK:
+        # Callers that queued behind a running refresh don't need another download
+        if if_missing and RATES is not None:
+            return True
+        try:
+            data = await http_client.get_json(RATES_URL)
+            if data.get("result") != "success":
+                raise ValueError(data.get("error-type", "unexpected response"))
+            table = RateTable(
+                data["base_code"],
+                {cur: float(rate) for cur, rate in data["rates"].items()},
+                float(data["time_last_update_unix"]),
+                time.time(),
+            )
+        except (http_client.HTTPError, ValueError, KeyError) as excp:
+            LAST_ERROR_AT = time.time()
+            LOGGER.warning("Exchange rate refresh failed: %s", excp)
+            return False
+        RATES = table
+        LAST_ERROR_AT = None
+    _save_file(table)
+    return True
+
+
+async def get_rates() -> Optional[RateTable]:
+    """Return the current table, fetching one first if none was ever loaded."""
+    if RATES is None:
+        _load_file()
+    if RATES is None:
+        await refresh_rates(if_missing=True)
+    return RATES
+
+
+async def _refresh_loop():
+    while True:
+        if RATES is None or time.time() - RATES.fetched_at >= REFRESH_INTERVAL:
+            await refresh_rates()
+        if LAST_ERROR_AT is not None or RATES is None:
+            delay = RETRY_INTERVAL
+        else:
+            delay = max(REFRESH_INTERVAL - (time.time() - RATES.fetched_at), 1)
+        await asyncio.sleep(delay)
+
+
+def start_rate_refresh() -> None:
+    """Start the background refresher (call from the running event loop)"""
+    global _refresh_task
+    if _refresh_task is not None and not _refresh_task.done():
+        return
+    if RATES is None:
+        _load_file()
+    _refresh_task = asyncio.create_task(_refresh_loop())
+
+
+async def stop_rate_refresh() -> None:
+    global _refresh_task
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        try:
+            await _refresh_task
+        except asyncio.CancelledError:
+            pass
+        _refresh_task = None
@@ -1,40 +1,66 @@
-from typing import Tuple, Optional, Any, Dict
+from typing import List, Optional, Tuple
 
-from telegram import Message
-from telegram.ext import ContextTypes
-from telegram.constants import MessageEntityType
+from telegram import Message, MessageEntity
 
+from Hina.modules.sql.users_sql import get_userid_by_name
 
-async def extract_user_and_text(message: Message, entities: Dict) -> Tuple[Optional[int], Optional[str]]:
+
+def _id_from_reply(message: Message) -> Tuple[Optional[int], Optional[str]]:
+    """The replied-to sender, and whatever follows the command as text."""
+    prev_message = message.reply_to_message
+    if not prev_message or not prev_message.from_user:
+        return None, None
+    parts = message.text.split(None, 1)
+    return prev_message.from_user.id, parts[1] if len(parts) > 1 else ""
+
+
+async def extract_user_and_text(message: Message, args: List[str]) -> Tuple[Optional[int], Optional[str]]:
     """
-    Extracts the user ID and text from a message, prioritizing a replied message if available.
-    
+    Extracts the user a command targets and the text after it.
+
+    The user is taken from a text mention, an @username known to the bot or a
+    numeric id right after the command, or else from the replied message.
+
     :param message: The Message object.
-    :param entities: A dictionary of message entities.
-    :return: A tuple containing the extracted user ID and text.
+    :param args: The command arguments, i.e. context.args.
+    :return: A tuple of the user ID (None if there is none) and the remaining text.
     """
+    parts = message.text.split(None, 1)
+    if len(parts) < 2:
+        return _id_from_reply(message)
+
+    text_offset = len(message.text) - len(parts[1])
+    mentions = message.parse_entities([MessageEntity.TEXT_MENTION])
+    for entity in mentions:
+        if entity.offset == text_offset:
+            return entity.user.id, message.text[entity.offset + entity.length:].strip()
+
+    rest = message.text.split(None, 2)
+    text = rest[2] if len(rest) > 2 else ""
+    if args and args[0].startswith("@"):
+        users = await get_userid_by_name(args[0][1:])
+        if not users:
+            return None, None
+        return users[0].user_id, text
+    if args and args[0].lstrip("-").isdigit():
+        return int(args[0]), text
+
     if message.reply_to_message:
-        user_id = message.reply_to_message.from_user.id
-        text = message.reply_to_message.text or message.reply_to_message.caption
-    else:
-        user_id = None
-        text = None
-        
-        # Check for user mentions
-        for ent, ent_text in entities.items():
-            if ent.type == MessageEntityType.TEXT_MENTION:
-                user_id = ent.user.id
-            elif ent.type == MessageEntityType.MENTION:
-                try:
-                    user_id = int(ent_text)
-                except (ValueError, TypeError):
-                    pass
-            
-            if user_id:
-                text = message.text[ent.offset + ent.length:].strip()
-                break
-        
-        if not user_id:
-            text = message.text
-
-    return user_id, text
+        return _id_from_reply(message)
+    return None, None
+
+
+async def extract_user(message: Message, args: List[str]) -> Optional[int]:
+    """The user a command targets, see extract_user_and_text."""
+    return (await extract_user_and_text(message, args))[0]
+
+
+def extract_text(message: Message) -> Optional[str]:
+    """
+    Returns the text a message carries: its text, its caption or a sticker's emoji.
+    """
+    return (
+        message.text
+        or message.caption
+        or (message.sticker.emoji if message.sticker else None)
+    )
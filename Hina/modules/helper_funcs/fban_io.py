@@ -0,0 +1,136 @@
+import csv
+import io
+import json
+from typing import Awaitable, BinaryIO, Callable, Dict, Optional
+
+from Hina.modules.sql import feds_sql as sql
+
+FIELDS = ("user_id", "first_name", "last_name", "user_name", "reason", "time")
+FORMATS = ("csv", "jsonl")
+# Bans written per transaction on import
+IMPORT_CHUNK_SIZE = 2000
+# Rows an export writes per call to the output
+EXPORT_FLUSH_ROWS = 500
+
+
+class FbanImportError(Exception):
+    """The file could not be read as a ban list."""
+
+
+def detect_format(filename: Optional[str]) -> str:
+    """'csv' or 'jsonl' from a file name, defaulting to jsonl."""
+    if filename and filename.lower().endswith(".csv"):
+        return "csv"
+    return "jsonl"
+
+
+async def export_bans(fed_id, output: BinaryIO, fmt: str = "jsonl") -> int:
+    """Write every ban of fed_id to a binary file as it is read; returns how many."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}")
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == "csv" else None
+    if writer:
+        writer.writerow(FIELDS)
+
+    count = 0
+    async for row in sql.iter_fed_bans(fed_id):
+        if writer:
+            writer.writerow(row)
+        else:
+            record = dict(zip(FIELDS, row))
+            # bans_feds keeps ids as strings
+            record["user_id"] = int(record["user_id"])
+            buffer.write(json.dumps(record, ensure_ascii=False))
+            buffer.write("\n")
+        count += 1
+        if count % EXPORT_FLUSH_ROWS == 0:
+            output.write(buffer.getvalue().encode())
+            buffer.seek(0)
+            buffer.truncate()
+    output.write(buffer.getvalue().encode())
+    return count
+
+
+def _rows(source: BinaryIO, fmt: str):
+    text = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            for line_no, record in enumerate(csv.DictReader(text), start=2):
+                yield line_no, record
+        else:
+            for line_no, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as excp:
+                    raise FbanImportError(f"Line {line_no} is not JSON: {excp}")
+                if not isinstance(record, dict):
+                    raise FbanImportError(f"Line {line_no} is not an object")
+                yield line_no, record
+    finally:
+        # Don't let the wrapper close the caller's file
+        text.detach()
+
+
+def _parse(record: Dict) -> Optional[dict]:
+    try:
+        user_id = int(str(record.get("user_id", "")).strip())
+    except ValueError:
+        return None
+    try:
+        ban_time = int(record.get("time") or 0)
+    except (TypeError, ValueError):
+        ban_time = 0
+    return {
+        "user_id": user_id,
+        "first_name": record.get("first_name") or "Unknown",
+        "last_name": record.get("last_name") or None,
+        "user_name": record.get("user_name") or None,
+        "reason": record.get("reason") or "",
+        "time": ban_time,
+    }
+
+
+async def import_bans(
+    fed_id,
+    source: BinaryIO,
+    fmt: str = "jsonl",
+    progress: Optional[Callable[[int, int], Awaitable[None]]] = None,
+) -> Dict[str, int]:
+    """Read bans from a binary file into fed_id, one transaction per chunk.
+
+    Rows without a usable user_id are skipped. progress(imported, skipped) is
+    awaited after each chunk. Raises FbanImportError on malformed files or
+    when a chunk can't be written; earlier chunks stay imported.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}")
+    imported = skipped = 0
+    chunk = []
+
+    async def flush():
+        nonlocal imported
+        saved = await sql.bulk_fban_users(fed_id, chunk)
+        if saved is False:
+            raise FbanImportError(f"Saving bans failed after {imported} were imported")
+        imported += saved
+        chunk.clear()
+        if progress is not None:
+            await progress(imported, skipped)
+
+    try:
+        for _, record in _rows(source, fmt):
+            row = _parse(record)
+            if row is None:
+                skipped += 1
+                continue
+            chunk.append(row)
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                await flush()
+    except (UnicodeDecodeError, csv.Error) as excp:
+        raise FbanImportError(f"Unreadable file: {excp}")
+    if chunk:
+        await flush()
+    return {"imported": imported, "skipped": skipped}
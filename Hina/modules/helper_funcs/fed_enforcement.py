@@ -0,0 +1,160 @@
+import asyncio
+import itertools
+import time
+from typing import Dict, List, Optional
+
+from telegram import Bot
+from telegram.error import TelegramError
+
+from Hina.config import LOGGER
+from Hina.modules.helper_funcs.send_scheduler import Lane, scheduler
+from Hina.modules.sql import feds_sql as sql
+
+# Ban calls in flight per job, so one big fed doesn't crowd out the others
+MAX_IN_FLIGHT = 20
+# Seconds between edits of the progress message
+PROGRESS_INTERVAL = 5
+
+
+class FedBanJob:
+    """Enforcement of one fban or unfban across every chat it reaches."""
+
+    __slots__ = (
+        "job_id", "fed_id", "user_id", "unban", "total", "done", "failed", "skipped",
+        "started_at", "task",
+    )
+
+    def __init__(self, job_id: int, fed_id: str, user_id: int, unban: bool, total: int) -> None:
+        self.job_id = job_id
+        self.fed_id = fed_id
+        self.user_id = user_id
+        self.unban = unban
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.skipped = 0
+        self.started_at = time.time()
+        self.task: Optional[asyncio.Task] = None
+
+    def progress(self) -> str:
+        action = "Unbanning" if self.unban else "Banning"
+        return (
+            f"{action} {self.user_id} from fed {self.fed_id}: {self.done}/{self.total} chats "
+            f"({self.failed} failed, {self.skipped} skipped)"
+        )
+
+
+_ids = itertools.count(1)
+_jobs: Dict[int, FedBanJob] = {}
+
+
+async def _enforce(bot: Bot, job: FedBanJob, chat_id: str, limit: asyncio.Semaphore) -> None:
+    async with limit:
+        try:
+            if job.unban:
+                # Chats still covered by another fed's ban keep the user out
+                if sql.is_user_fbanned_in_chat(chat_id, job.user_id):
+                    job.skipped += 1
+                    return
+                await scheduler.call(
+                    bot.unban_chat_member, int(chat_id), job.user_id, only_if_banned=True,
+                    target=int(chat_id), lane=Lane.MODERATION, per_chat=False,
+                )
+            else:
+                await scheduler.call(
+                    bot.ban_chat_member, int(chat_id), job.user_id,
+                    target=int(chat_id), lane=Lane.MODERATION, per_chat=False,
+                )
+        except TelegramError as excp:
+            job.failed += 1
+            LOGGER.debug("Fed %s: could not enforce on %s in %s: %s", job.fed_id, job.user_id, chat_id, excp)
+        except Exception:
+            job.failed += 1
+            LOGGER.exception("Fed %s: enforcing on %s in %s failed", job.fed_id, job.user_id, chat_id)
+        finally:
+            job.done += 1
+
+
+async def _report(bot: Bot, job: FedBanJob, chat_id, message_id: int, text: str) -> None:
+    try:
+        await bot.edit_message_text(text, chat_id, message_id)
+    except TelegramError:
+        pass
+
+
+async def _run(bot: Bot, job: FedBanJob, chats: List[str], report_chat=None) -> None:
+    limit = asyncio.Semaphore(MAX_IN_FLIGHT)
+    status = None
+    if report_chat is not None:
+        try:
+            status = await bot.send_message(report_chat, job.progress())
+        except TelegramError:
+            status = None
+
+    work = asyncio.gather(*(_enforce(bot, job, chat_id, limit) for chat_id in chats))
+    try:
+        while True:
+            try:
+                await asyncio.wait_for(asyncio.shield(work), PROGRESS_INTERVAL)
+                break
+            except asyncio.TimeoutError:
+                if status is not None:
+                    await _report(bot, job, report_chat, status.message_id, job.progress())
+    except asyncio.CancelledError:
+        work.cancel()
+        raise
+    finally:
+        _jobs.pop(job.job_id, None)
+
+    elapsed = round(time.time() - job.started_at, 1)
+    summary = f"{job.progress()}, done in {elapsed}s"
+    LOGGER.info(summary)
+    if status is not None:
+        await _report(bot, job, report_chat, status.message_id, summary)
+
+
+def _launch(bot: Bot, fed_id: str, user_id: int, unban: bool, report_chat) -> FedBanJob:
+    chats = sql.get_affected_chats(fed_id)
+    job = FedBanJob(next(_ids), str(fed_id), int(user_id), unban, len(chats))
+    job.task = asyncio.create_task(_run(bot, job, chats, report_chat))
+    _jobs[job.job_id] = job
+    return job
+
+
+async def start_fban(
+    bot: Bot, fed_id, user_id, first_name, last_name, user_name, reason, report_chat=None,
+) -> Optional[FedBanJob]:
+    """Record an fban and enforce it in the background across every fed it reaches.
+
+    Progress is posted to report_chat when given; returns None if the ban could not be saved.
+    """
+    saved = await sql.fban_user(fed_id, user_id, first_name, last_name, user_name, reason, int(time.time()))
+    if not saved:
+        return None
+    return _launch(bot, fed_id, user_id, False, report_chat)
+
+
+async def start_unfban(bot: Bot, fed_id, user_id, report_chat=None) -> Optional[FedBanJob]:
+    """Lift an fban and unban the user wherever no other fed still bans them."""
+    if not await sql.un_fban_user(fed_id, user_id):
+        return None
+    return _launch(bot, fed_id, user_id, True, report_chat)
+
+
+def get_job(job_id: int) -> Optional[FedBanJob]:
+    return _jobs.get(job_id)
+
+
+def running_jobs() -> List[FedBanJob]:
+    return list(_jobs.values())
+
+
+async def stop_jobs() -> None:
+    tasks = [job.task for job in _jobs.values() if job.task is not None]
+    for task in tasks:
+        task.cancel()
+    for task in tasks:
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
@@ -4,6 +4,7 @@ from typing import Callable, Awaitable, Any, TypeVar, cast
 
 from Hina.config import DEV_USERS, DRAGONS, DEMONS
 from Hina.modules.helper_funcs.chat_status import bot_admin
+from Hina.modules.sql.chat_features_sql import Feature, has_feature
 
 # Type variable for generic function type
 F = TypeVar('F', bound=Callable[..., Awaitable[Any]])
@@ -51,5 +52,22 @@ class CustomFilters:
             or message.video
         )
 
+class ChatFeature(filters.MessageFilter):
+    """Passes only in chats where the given feature is active.
+
+    Checked synchronously in check_update against the in-memory feature bitmap,
+    so handlers of unused features never run in quiet chats.
+    """
+
+    __slots__ = ("feature",)
+
+    def __init__(self, feature: Feature):
+        super().__init__(name=f"ChatFeature({feature.name})")
+        self.feature = feature
+
+    def filter(self, message: Message) -> bool:
+        return has_feature(message.chat_id, self.feature)
+
+
 # Example usage (as a filter):
 # my_filter = filters.create(CustomFilters.support_filter)
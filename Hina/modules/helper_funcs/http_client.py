@@ -0,0 +1,135 @@
+import asyncio
+import random
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from Hina.config import LOGGER
+
+# Pool-wide limits; keep-alive connections are reused across all modules
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 20
+KEEPALIVE_EXPIRY = 30.0
+# At most this many requests in flight to a single host, so one slow API can't take the whole pool
+PER_HOST_LIMIT = 8
+
+DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+DEFAULT_RETRIES = 2
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+USER_AGENT = "Mozilla/5.0 (compatible; HinaBot)"
+
+# Raised for transport failures and by raise_for_status(); lets callers skip importing httpx
+HTTPError = httpx.HTTPError
+
+_client: Optional[httpx.AsyncClient] = None
+_host_limits: Dict[str, asyncio.Semaphore] = {}
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=DEFAULT_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_EXPIRY,
+            ),
+            headers={"User-Agent": USER_AGENT},
+            follow_redirects=True,
+        )
+    return _client
+
+
+def _host_limit(url: str) -> asyncio.Semaphore:
+    host = urlsplit(url).netloc.lower()
+    limit = _host_limits.get(host)
+    if limit is None:
+        limit = _host_limits[host] = asyncio.Semaphore(PER_HOST_LIMIT)
+    return limit
+
+
+def _backoff(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), BACKOFF_MAX)
+    delay = min(BACKOFF_BASE * (2 ** attempt), BACKOFF_MAX)
+    return delay + random.uniform(0, delay / 2)
+
+
+async def request(
+    method: str,
+    url: str,
+    *,
+    retries: int = DEFAULT_RETRIES,
+    **kwargs: Any,
+) -> httpx.Response:
+    """Send a request through the shared pool.
+
+    Transport errors and retryable statuses (429, 5xx) are retried with
+    exponential backoff; the last response is returned as is, the last
+    transport error is raised.
+    """
+    client = get_client()
+    attempt = 0
+    while True:
+        try:
+            async with _host_limit(url):
+                response = await client.request(method, url, **kwargs)
+        except httpx.TransportError as excp:
+            if attempt >= retries:
+                raise
+            delay = _backoff(attempt)
+            LOGGER.debug("%s %s failed (%s), retrying in %.1fs", method, url, excp, delay)
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                return response
+            delay = _backoff(attempt, response)
+            LOGGER.debug("%s %s returned %s, retrying in %.1fs", method, url, response.status_code, delay)
+        attempt += 1
+        await asyncio.sleep(delay)
+
+
+async def get(url: str, **kwargs: Any) -> httpx.Response:
+    return await request("GET", url, **kwargs)
+
+
+async def post(url: str, **kwargs: Any) -> httpx.Response:
+    return await request("POST", url, **kwargs)
+
+
+async def get_json(url: str, **kwargs: Any) -> Any:
+    response = await get(url, **kwargs)
+    response.raise_for_status()
+    return response.json()
+
+
+async def post_json(url: str, **kwargs: Any) -> Any:
+    response = await post(url, **kwargs)
+    response.raise_for_status()
+    return response.json()
+
+
+async def get_text(url: str, **kwargs: Any) -> str:
+    response = await get(url, **kwargs)
+    response.raise_for_status()
+    return response.text
+
+
+async def get_bytes(url: str, **kwargs: Any) -> bytes:
+    response = await get(url, **kwargs)
+    response.raise_for_status()
+    return response.content
+
+
+async def close() -> None:
+    """Close the shared client; call on shutdown."""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
@@ -0,0 +1,164 @@
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import Callable, Dict, Optional, Tuple
+
+from PIL import Image
+
+from Hina.config import LOGGER
+from Hina.modules.helper_funcs.response_cache import coalesce
+
+# Worker processes doing the actual resize/encode
+POOL_WORKERS = max(2, min(4, (os.cpu_count() or 2) - 1))
+# Jobs allowed to wait for a worker before new ones are turned away
+MAX_QUEUED = 32
+PER_USER_LIMIT = 2
+# Converted images kept by source, measured in encoded bytes
+CACHE_BUDGET = 32 * 1024 * 1024
+STICKER_SIZE = 512
+
+
+class PipelineBusy(Exception):
+    """Raised when the queue is full or the user already has too many conversions running."""
+
+
+# --- Conversions, run inside the worker processes ---
+
+def sticker_png(data: bytes) -> bytes:
+    """Fit an image into a STICKER_SIZE square canvas, keeping its aspect ratio and transparency."""
+    with Image.open(BytesIO(data)) as img:
+        img = img.convert("RGBA")
+        width, height = img.size
+        if width > height:
+            new_width = STICKER_SIZE
+            new_height = max(1, int(height * (STICKER_SIZE / width)))
+        else:
+            new_height = STICKER_SIZE
+            new_width = max(1, int(width * (STICKER_SIZE / height)))
+        img = img.resize((new_width, new_height), Image.LANCZOS)
+
+        canvas = Image.new("RGBA", (STICKER_SIZE, STICKER_SIZE), (0, 0, 0, 0))
+        canvas.paste(img, ((STICKER_SIZE - new_width) // 2, (STICKER_SIZE - new_height) // 2))
+        out = BytesIO()
+        canvas.save(out, "PNG")
+        return out.getvalue()
+
+
+def plain_png(data: bytes) -> bytes:
+    """Re-encode an image (e.g. a webp sticker) as PNG without resizing it."""
+    with Image.open(BytesIO(data)) as img:
+        out = BytesIO()
+        img.save(out, "PNG")
+        return out.getvalue()
+
+
+# --- Scheduling, run in the bot process ---
+
+_pool: Optional[ProcessPoolExecutor] = None
+_workers: Optional[asyncio.Semaphore] = None
+_queued = 0
+_user_jobs: Dict[int, int] = {}
+
+# (conversion, source id) -> encoded result, in least-recently-used order
+_results: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+_results_size = 0
+_inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=POOL_WORKERS)
+    return _pool
+
+
+def _get_workers() -> asyncio.Semaphore:
+    global _workers
+    if _workers is None:
+        _workers = asyncio.Semaphore(POOL_WORKERS)
+    return _workers
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """Forget a pool whose worker died, unless another job already replaced it."""
+    global _pool
+    if _pool is pool:
+        _pool = None
+    pool.shutdown(wait=False)
+
+
+def _remember(key: Tuple[str, str], result: bytes) -> None:
+    global _results_size
+    if len(result) > CACHE_BUDGET // 4:
+        return
+    _results[key] = result
+    _results_size += len(result)
+    while _results_size > CACHE_BUDGET:
+        _, old = _results.popitem(last=False)
+        _results_size -= len(old)
+
+
+async def _run(func: Callable[[bytes], bytes], data: bytes) -> bytes:
+    global _queued
+    if _queued >= MAX_QUEUED + POOL_WORKERS:
+        raise PipelineBusy("Too many images are being processed right now, try again shortly.")
+    _queued += 1
+    try:
+        async with _get_workers():
+            loop = asyncio.get_running_loop()
+            # Taken after the wait, a pool that broke meanwhile has been replaced
+            pool = _get_pool()
+            try:
+                return await loop.run_in_executor(pool, func, data)
+            except BrokenProcessPool:
+                # A worker died (OOM, decoder crash); the pool never recovers on its own
+                LOGGER.warning("Image worker pool broke, starting a new one")
+                _discard_pool(pool)
+            return await loop.run_in_executor(_get_pool(), func, data)
+    finally:
+        _queued -= 1
+
+
+async def convert(
+    func: Callable[[bytes], bytes],
+    data: bytes,
+    user_id: int,
+    source_id: Optional[str] = None,
+) -> bytes:
+    """Run one of the conversions above in the pool and return the encoded image.
+
+    Results are cached by source_id (a Telegram file_unique_id), or by a hash of
+    the input when there is none; identical concurrent requests share one job.
+    """
+    key = (func.__name__, source_id or hashlib.sha256(data).hexdigest())
+    result = _results.get(key)
+    if result is not None:
+        _results.move_to_end(key)
+        return result
+
+    async def job() -> bytes:
+        if _user_jobs.get(user_id, 0) >= PER_USER_LIMIT:
+            raise PipelineBusy("You already have images being processed, wait for them to finish.")
+        _user_jobs[user_id] = _user_jobs.get(user_id, 0) + 1
+        try:
+            result = await _run(func, data)
+        finally:
+            _user_jobs[user_id] -= 1
+            if not _user_jobs[user_id]:
+                del _user_jobs[user_id]
+        _remember(key, result)
+        return result
+
+    return await coalesce(_inflight, key, job)
+
+
+def shutdown() -> None:
+    global _pool, _workers
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+    _pool = None
+    _workers = None
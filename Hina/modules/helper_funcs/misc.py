@@ -2,12 +2,14 @@ from typing import Dict, List, Optional, Any, Union, Callable, Awaitable
 import logging
 
 from Hina.config import NO_LOAD
+from Hina.modules.helper_funcs.send_scheduler import Lane, scheduler
 from telegram import Bot, InlineKeyboardButton, Update
 from telegram.constants import ParseMode
-from telegram.error import TelegramError
 from telegram.ext import ContextTypes
 
 MAX_MESSAGE_LENGTH = 4096
+# Long lists (/gbanlist, /groups) are built in memory up to this size, then in a temporary file
+LIST_SPOOL_SIZE = 1024 * 1024
 LOGGER = logging.getLogger(__name__)
 
 
@@ -88,16 +90,14 @@ async def send_to_list(
 ) -> None:
     if html and markdown:
         raise Exception("Can only send with either markdown or HTML!")
-    for user_id in set(send_to):
-        try:
-            if markdown:
-                await bot.send_message(user_id, message, parse_mode=ParseMode.MARKDOWN)
-            elif html:
-                await bot.send_message(user_id, message, parse_mode=ParseMode.HTML)
-            else:
-                await bot.send_message(user_id, message)
-        except TelegramError:
-            pass
+    parse_mode = ParseMode.MARKDOWN if markdown else ParseMode.HTML if html else None
+    # Failed sends come back as exceptions and are ignored, as before
+    await scheduler.map(
+        bot.send_message,
+        [(user_id, (user_id, message)) for user_id in set(send_to)],
+        lane=Lane.MODERATION,
+        parse_mode=parse_mode,
+    )
 
 
 def build_keyboard(buttons):
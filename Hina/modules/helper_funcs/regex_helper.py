@@ -1,38 +1,248 @@
+import asyncio
+import multiprocessing
+from functools import lru_cache
+from typing import Any, Dict, Optional, Union
+
 import regex
-from typing import Optional, Match, Pattern, Union
 
-def regex_searcher(regex_string: str, string: str) -> Union[bool, Optional[Match[str]]]:
+# Worker processes evaluating user supplied patterns
+SANDBOX_WORKERS = 2
+# Jobs allowed to wait for a free worker before new ones are refused
+MAX_QUEUED = 20
+# Seconds a pattern may run; the regex engine gives up at this point by itself
+REGEX_TIMEOUT = 3.0
+# Extra seconds before a worker that did not give up is killed and replaced
+KILL_GRACE = 1.0
+# Results longer than this are never sent back to the bot process
+MAX_OUTPUT = 4096
+COMPILE_CACHE_SIZE = 256
+
+# Nested quantifiers that blow up the backtracking engine, e.g. (a+)+ or (a{2}){2}
+LOOP_PATTERNS = (
+    r"\((.{1,}[\+\*]){1,}\)[\+\*].",
+    r"[\(\[].{1,}\{\d(,)?\}[\)\]]\{\d(,)?\}",
+    r"\(.{1,}\)\{.{1,}(,)?\}\(.*\)(\+|\* |\{.*\})",
+)
+
+
+class SandboxError(Exception):
+    """The pattern could not be evaluated."""
+
+
+class SandboxTimeout(SandboxError):
+    """The pattern ran past its time limit."""
+
+
+class SandboxBusy(SandboxError):
+    """Too many patterns are already waiting for a worker."""
+
+
+class OutputTooLong(SandboxError):
+    """The result is larger than the output cap."""
+
+
+# --- Jobs, run inside the worker processes ---
+
+@lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def _compile(pattern: str, flags: int):
+    return regex.compile(pattern, flags)
+
+
+def _search(pattern: str, string: str, flags: int, timeout: float) -> Optional[str]:
+    found = _compile(pattern, flags).search(string, timeout=timeout)
+    return found.group(0) if found else None
+
+
+def _match(pattern: str, string: str, flags: int, timeout: float) -> Optional[str]:
+    found = _compile(pattern, flags).match(string, timeout=timeout)
+    return found.group(0) if found else None
+
+
+def _sub(pattern: str, repl: str, string: str, count: int, flags: int, timeout: float) -> str:
+    return _compile(pattern, flags).sub(repl, string, count=count, timeout=timeout)
+
+
+def _loop_check(pattern: str, timeout: float) -> bool:
+    return any(
+        _compile(loop_pattern, 0).search(pattern, timeout=timeout)
+        for loop_pattern in LOOP_PATTERNS
+    )
+
+
+_JOBS = {"search": _search, "match": _match, "sub": _sub, "loop_check": _loop_check}
+
+
+def _worker_main(conn) -> None:
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+        name, args = job
+        try:
+            result = _JOBS[name](*args)
+        except TimeoutError:
+            reply = ("timeout", None)
+        except regex.error as excp:
+            reply = ("error", str(excp))
+        except Exception as excp:
+            reply = ("error", f"{type(excp).__name__}: {excp}")
+        else:
+            if isinstance(result, str) and len(result) > MAX_OUTPUT:
+                reply = ("too_long", len(result))
+            else:
+                reply = ("ok", result)
+        conn.send(reply)
+
+
+# --- Pool, run in the bot process ---
+
+class _Worker:
+    __slots__ = ("process", "conn")
+
+    def __init__(self) -> None:
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def kill(self) -> None:
+        # No join: the next Process.start() reaps it, and joining here would block the loop
+        self.process.kill()
+        self.conn.close()
+
+
+class RegexSandbox:
+    """Small pool of worker processes that can be killed when a pattern runs away."""
+
+    def __init__(self, size: int = SANDBOX_WORKERS) -> None:
+        self.size = size
+        self._idle: Optional[asyncio.Queue] = None
+        self._waiting = 0
+        self.stats: Dict[str, int] = {"jobs": 0, "timeouts": 0, "kills": 0, "refused": 0}
+
+    def _retire(self, worker: _Worker) -> None:
+        """Kill a worker; its slot is refilled by the next job that takes it."""
+        worker.kill()
+        self.stats["kills"] += 1
+
+    async def run(self, name: str, *args: Any, timeout: float = REGEX_TIMEOUT) -> Any:
+        if self._idle is None:
+            # Empty slots; workers are started by the first jobs that need them
+            self._idle = asyncio.Queue()
+            for _ in range(self.size):
+                self._idle.put_nowait(None)
+        if self._idle.empty() and self._waiting >= MAX_QUEUED:
+            self.stats["refused"] += 1
+            raise SandboxBusy("Too many regexes are running right now, try again shortly.")
+
+        self._waiting += 1
+        try:
+            worker = await self._idle.get()
+        finally:
+            self._waiting -= 1
+
+        if worker is None:
+            try:
+                # Starting a process blocks, so it happens off the event loop
+                worker = await asyncio.to_thread(_Worker)
+            except BaseException:
+                self._idle.put_nowait(None)
+                raise
+
+        self.stats["jobs"] += 1
+        try:
+            worker.conn.send((name, args + (timeout,)))
+            ready = await asyncio.to_thread(worker.conn.poll, timeout + KILL_GRACE)
+            if not ready:
+                self._retire(worker)
+                worker = None
+                self.stats["timeouts"] += 1
+                raise SandboxTimeout("Regex timed out")
+            status, value = worker.conn.recv()
+        except asyncio.CancelledError:
+            # The reply would be read by the next job, so this worker can't be reused
+            self._retire(worker)
+            worker = None
+            raise
+        except (EOFError, OSError) as excp:
+            self._retire(worker)
+            worker = None
+            raise SandboxError(f"Regex worker died: {excp}")
+        finally:
+            self._idle.put_nowait(worker)
+
+        if status == "ok":
+            return value
+        if status == "timeout":
+            self.stats["timeouts"] += 1
+            raise SandboxTimeout("Regex timed out")
+        if status == "too_long":
+            raise OutputTooLong(f"Result is {value} characters long")
+        raise SandboxError(value)
+
+    def shutdown(self) -> None:
+        if self._idle is None:
+            return
+        while not self._idle.empty():
+            worker = self._idle.get_nowait()
+            if worker is None:
+                continue
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+            worker.process.join(1)
+            if worker.process.is_alive():
+                worker.kill()
+                worker.process.join(1)
+        self._idle = None
+
+
+sandbox = RegexSandbox()
+
+
+async def regex_searcher(regex_string: str, string: str, flags: int = 0) -> Union[bool, Optional[str]]:
     """
-    Perform a regex search with timeout and error handling.
-    
+    Perform a regex search in the sandbox.
+
     Args:
         regex_string: The regex pattern to search for
         string: The string to search in
-        
+        flags: regex flags
+
     Returns:
-        The match object if found, False if timeout or error occurs
+        The matched text if found, None if not, False if timeout or error occurs
     """
     try:
-        search: Optional[Match[str]] = regex.search(regex_string, string, timeout=6)
-        return search
-    except TimeoutError:
-        return False
-    except regex.RegexError:
-        return False
-    except Exception:
+        return await sandbox.run("search", regex_string, string, flags)
+    except SandboxError:
         return False
 
-def infinite_loop_check(
-    regex_string: str,
-    string: str,
-) -> Union[bool, Optional[Match[str]]]:
+
+async def regex_match(regex_string: str, string: str, flags: int = 0) -> Optional[str]:
+    """Text matched at the start of string, or None; raises SandboxError."""
+    return await sandbox.run("match", regex_string, string, flags)
+
+
+async def regex_sub(
+    regex_string: str, repl: str, string: str, count: int = 0, flags: int = 0,
+) -> str:
+    """regex.sub in the sandbox; raises SandboxError, OutputTooLong past MAX_OUTPUT."""
+    return await sandbox.run("sub", regex_string, repl, string, count, flags)
+
+
+async def infinite_loop_check(regex_string: str) -> bool:
     """
-    Perform a regex search with a timeout to avoid infinite loops.
+    Check a user pattern for nested quantifiers that could hang the engine.
+    Patterns that can't even be checked count as looping; SandboxBusy is raised
+    as is, since it says nothing about the pattern.
     """
     try:
-        search: Optional[Match[str]] = regex.search(regex_string, string, timeout=5)
-        return search
-    except TimeoutError:
-        return False
-    except Exception:
-        return False
+        return await sandbox.run("loop_check", regex_string)
+    except SandboxBusy:
+        raise
+    except SandboxError:
+        return True
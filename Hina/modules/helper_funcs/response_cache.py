@@ -0,0 +1,215 @@
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from Hina.config import LOGGER, RESPONSE_CACHE_FILE
+
+# Seconds a response stays fresh, per upstream source
+SOURCE_TTLS = {
+    "anilist": 6 * 60 * 60,
+    "airing": 10 * 60,
+    "jikan": 60 * 60,
+    "ud": 24 * 60 * 60,
+    "wiki": 24 * 60 * 60,
+    "translate": 7 * 24 * 60 * 60,
+}
+DEFAULT_TTL = 60 * 60
+# Rough budget for cached payloads, measured as their JSON size
+MEMORY_BUDGET = 8 * 1024 * 1024
+# Single entries bigger than this are served but never stored
+MAX_ENTRY_SIZE = 512 * 1024
+
+_STAT_FIELDS = ("hits", "misses", "coalesced", "expired", "evicted")
+
+
+def normalize_key(source: str, *parts: Any, fold_case: bool = True) -> str:
+    """Build a cache key that ignores whitespace, and by default case, differences in string arguments."""
+    normalized = []
+    for part in parts:
+        if isinstance(part, str):
+            part = " ".join(part.split())
+            if fold_case:
+                part = part.casefold()
+        normalized.append(part)
+    return f"{source}:{json.dumps(normalized, sort_keys=True, default=str)}"
+
+
+async def coalesce(
+    inflight: Dict[Hashable, asyncio.Future],
+    key: Hashable,
+    fetch: Callable[[], Awaitable[Any]],
+) -> Any:
+    """Call fetch() for key unless a call for it is already running, then wait on that one.
+
+    Exceptions are passed to every waiter. The key is dropped from inflight as
+    soon as fetch() settles; caching the result is up to fetch() itself.
+    """
+    pending = inflight.get(key)
+    if pending is not None:
+        return await asyncio.shield(pending)
+
+    future = asyncio.get_running_loop().create_future()
+    inflight[key] = future
+    try:
+        value = await fetch()
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as excp:
+        future.set_exception(excp)
+        # Mark retrieved so a fetch nobody else waited on doesn't log "never retrieved"
+        future.exception()
+        raise
+    else:
+        future.set_result(value)
+        return value
+    finally:
+        inflight.pop(key, None)
+
+
+class ResponseCache:
+    """LRU response cache with per-source TTLs and in-flight request coalescing."""
+
+    def __init__(self, budget: int = MEMORY_BUDGET, path: Optional[str] = None) -> None:
+        self.budget = budget
+        self.path = path
+        self.size = 0
+        # key -> (expires_at, size, value), in least-recently-used order
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _count(self, source: str, field: str) -> None:
+        counters = self.stats.get(source)
+        if counters is None:
+            counters = self.stats[source] = dict.fromkeys(_STAT_FIELDS, 0)
+        counters[field] += 1
+
+    def _drop(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.size -= size
+
+    def _store(self, key: str, value: Any, ttl: float) -> None:
+        try:
+            size = len(json.dumps(value, default=str))
+        except (TypeError, ValueError):
+            return
+        if size > MAX_ENTRY_SIZE:
+            return
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (time.time() + ttl, size, value)
+        self.size += size
+        while self.size > self.budget and self._entries:
+            old_key = next(iter(self._entries))
+            self._drop(old_key)
+            self._count(old_key.split(":", 1)[0], "evicted")
+
+    async def get(
+        self,
+        source: str,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+    ) -> Any:
+        """Return the cached response for key, calling fetch() once on a miss.
+
+        Concurrent misses for the same key wait on the first caller's fetch.
+        Exceptions are passed to every waiter and are never cached.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.time():
+                self._entries.move_to_end(key)
+                self._count(source, "hits")
+                return entry[2]
+            self._drop(key)
+            self._count(source, "expired")
+
+        if key in self._inflight:
+            self._count(source, "coalesced")
+        else:
+            self._count(source, "misses")
+
+        async def fetch_and_store() -> Any:
+            value = await fetch()
+            self._store(key, value, ttl if ttl is not None else SOURCE_TTLS.get(source, DEFAULT_TTL))
+            return value
+
+        return await coalesce(self._inflight, key, fetch_and_store)
+
+    def clear(self, source: Optional[str] = None) -> int:
+        """Drop every entry, or only those of one source; returns how many were dropped."""
+        keys = [
+            key for key in self._entries
+            if source is None or key.startswith(f"{source}:")
+        ]
+        for key in keys:
+            self._drop(key)
+        return len(keys)
+
+    def load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as excp:
+            LOGGER.warning("Could not read response cache %s: %s", self.path, excp)
+            return
+        now = time.time()
+        for key, expires_at, value in saved:
+            if expires_at > now:
+                self._store(key, value, expires_at - now)
+        LOGGER.info("Loaded %s cached responses from %s", len(self._entries), self.path)
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        now = time.time()
+        saved = [
+            [key, expires_at, value]
+            for key, (expires_at, _, value) in self._entries.items()
+            if expires_at > now
+        ]
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(saved, f, default=str)
+            os.replace(tmp_path, self.path)
+        except OSError as excp:
+            LOGGER.warning("Could not write response cache %s: %s", self.path, excp)
+
+
+_cache: Optional[ResponseCache] = None
+
+
+def get_cache() -> ResponseCache:
+    """Return the shared cache, restoring it from RESPONSE_CACHE_FILE on first use."""
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache(path=RESPONSE_CACHE_FILE)
+        _cache.load()
+    return _cache
+
+
+async def cached(
+    source: str,
+    key_parts: Tuple[Any, ...],
+    fetch: Callable[[], Awaitable[Any]],
+    ttl: Optional[float] = None,
+    fold_case: bool = True,
+) -> Any:
+    key = normalize_key(source, *key_parts, fold_case=fold_case)
+    return await get_cache().get(source, key, fetch, ttl)
+
+
+def save() -> None:
+    if _cache is not None:
+        _cache.save()
@@ -0,0 +1,188 @@
+import asyncio
+import itertools
+import time
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from telegram.error import RetryAfter
+
+from Hina.config import LOGGER
+
+# Telegram's documented limits: ~30 messages/s overall, 20/min into one group, ~1/s into one private chat
+GLOBAL_RATE = 30.0
+GROUP_RATE = 20 / 60
+PRIVATE_RATE = 1.0
+WORKERS = 8
+MAX_ATTEMPTS = 3
+# Idle per-chat buckets are dropped after this long
+BUCKET_IDLE = 10 * 60
+
+
+class Lane(IntEnum):
+    """Priority lanes; lower values are served first."""
+
+    INTERACTIVE = 0
+    MODERATION = 1
+    BULK = 2
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated", "paused_until")
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def reserve(self) -> float:
+        """Take a token, returning how long to wait before it may be used."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.paused_until - now)
+
+    def pause(self, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class SendScheduler:
+    """Runs outbound Bot API calls through rate limit buckets, by priority lane."""
+
+    def __init__(self, workers: int = WORKERS) -> None:
+        self.workers = workers
+        self.global_bucket = TokenBucket(GLOBAL_RATE, GLOBAL_RATE)
+        self._chat_buckets: Dict[int, TokenBucket] = {}
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._seq = itertools.count()
+        self.stats: Dict[str, int] = {"calls": 0, "retries": 0, "failed": 0}
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self._chat_buckets) > 10000:
+                self._prune()
+            rate = GROUP_RATE if chat_id < 0 else PRIVATE_RATE
+            # Groups may take a short burst, the bucket then refills at 20/min
+            bucket = self._chat_buckets[chat_id] = TokenBucket(rate, 3 if chat_id < 0 else 1)
+        return bucket
+
+    def _prune(self) -> None:
+        idle_since = time.monotonic() - BUCKET_IDLE
+        for chat_id in [
+            cid for cid, bucket in self._chat_buckets.items()
+            if bucket.updated < idle_since and bucket.tokens >= bucket.capacity
+        ]:
+            del self._chat_buckets[chat_id]
+
+    def _start(self) -> None:
+        self._queue = asyncio.PriorityQueue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, job = await self._queue.get()
+            try:
+                await self._execute(*job)
+            finally:
+                self._queue.task_done()
+
+    async def _execute(self, func, args, kwargs, target, per_chat, future: asyncio.Future) -> None:
+        if future.cancelled():
+            return
+        for attempt in range(MAX_ATTEMPTS):
+            chat_bucket = self._chat_bucket(target) if target is not None and per_chat else None
+            wait = max(
+                self.global_bucket.reserve(),
+                chat_bucket.reserve() if chat_bucket else 0.0,
+            )
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self.stats["calls"] += 1
+            try:
+                result = await func(*args, **kwargs)
+            except RetryAfter as excp:
+                delay = excp.retry_after
+                delay = delay.total_seconds() if hasattr(delay, "total_seconds") else float(delay)
+                self.stats["retries"] += 1
+                LOGGER.info("Flood wait of %ss on %s", delay, target)
+                (chat_bucket or self.global_bucket).pause(delay)
+                if attempt + 1 < MAX_ATTEMPTS:
+                    continue
+                self.stats["failed"] += 1
+                if not future.done():
+                    future.set_exception(excp)
+            except Exception as excp:
+                self.stats["failed"] += 1
+                if not future.done():
+                    future.set_exception(excp)
+            else:
+                if not future.done():
+                    future.set_result(result)
+            return
+
+    def submit(
+        self,
+        func: Callable[..., Awaitable[Any]],
+        *args: Any,
+        target: Optional[int] = None,
+        lane: Lane = Lane.BULK,
+        per_chat: bool = True,
+        **kwargs: Any,
+    ) -> asyncio.Future:
+        """Queue func(*args, **kwargs) and return a future for its result.
+
+        `target` is the chat the call acts on; with per_chat, the call also
+        waits for that chat's bucket, which is what Telegram throttles messages by.
+        """
+        if self._queue is None:
+            self._start()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(
+            (int(lane), next(self._seq), (func, args, kwargs, target, per_chat, future))
+        )
+        return future
+
+    async def call(self, func: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        return await self.submit(func, *args, **kwargs)
+
+    async def map(
+        self,
+        func: Callable[..., Awaitable[Any]],
+        calls: List[Tuple[int, tuple]],
+        lane: Lane = Lane.BULK,
+        per_chat: bool = True,
+        **kwargs: Any,
+    ) -> List[Any]:
+        """Run func once per (target, args) pair; results or exceptions, in order."""
+        futures = [
+            self.submit(func, *args, target=target, lane=lane, per_chat=per_chat, **kwargs)
+            for target, args in calls
+        ]
+        return await asyncio.gather(*futures, return_exceptions=True)
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, _, job = self._queue.get_nowait()
+                job[-1].cancel()
+        self._queue = None
+
+
+scheduler = SendScheduler()
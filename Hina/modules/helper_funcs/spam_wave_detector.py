@@ -0,0 +1,218 @@
+import random
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# MinHash signature length, split into BANDS bands of SIGNATURE_SIZE // BANDS values.
+# Two texts share a band with probability 1 - (1 - J^2)^8 for Jaccard similarity J:
+# about 0.28 at J=0.2, 0.9 at J=0.5 and 0.99 at J=0.7.
+SIGNATURE_SIZE = 16
+BANDS = 8
+ROWS = SIGNATURE_SIZE // BANDS
+# A band hit only joins a wave if this share of the signature matches the wave's
+# first one, so loosely related texts can't chain waves together
+MIN_SIMILARITY = 0.5
+# Texts with fewer tokens are too generic to fingerprint ("hi", "thanks")
+MIN_TOKENS = 6
+# Only the start of long texts is fingerprinted, spam variants share it
+MAX_TOKENS = 64
+# Upper bound on band entries kept, BANDS per fingerprinted message
+MAX_ENTRIES = 200_000
+# Chats remembered per cluster; only need to reach the flag threshold
+MAX_CLUSTER_CHATS = 64
+MAX_CLUSTER_USERS = 32
+
+_MASK = (1 << 64) - 1
+_BIN_BITS = (SIGNATURE_SIZE - 1).bit_length()
+_VALUE_BITS = 64 - _BIN_BITS
+_VALUE_MASK = (1 << _VALUE_BITS) - 1
+# Odd multiplier spreading hash() bits before the top ones pick the bin; tuple hashes have weak low bits
+_MIX = 0x9E3779B97F4A7C15
+# Above any real bin value; borrowed values are stored above it too
+_EMPTY = 1 << _VALUE_BITS
+_rng = random.Random(0x5EED)
+_SEEDS: Tuple[int, ...] = tuple(_rng.getrandbits(_VALUE_BITS) for _ in range(SIGNATURE_SIZE))
+# Order in which an empty bin looks for a filled one to borrow from, different per bin
+_PROBES: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(other for other in _rng.sample(range(SIGNATURE_SIZE), SIGNATURE_SIZE) if other != index)
+    for index in range(SIGNATURE_SIZE)
+)
+del _rng
+_TOKEN_RE = re.compile(r"\w+")
+# Links and numbers vary between copies of the same spam
+_NOISE_RE = re.compile(r"https?://\S+|t\.me/\S+|@\w+|\d+")
+
+
+class Wave:
+    """Near-duplicate texts seen across chats within the window."""
+
+    __slots__ = (
+        "wave_id", "sample", "signature", "first_seen", "last_seen", "chats", "users", "messages",
+        "flagged_at", "refs",
+    )
+
+    def __init__(self, wave_id: int, sample: str, signature: Tuple[int, ...], now: float) -> None:
+        self.wave_id = wave_id
+        self.sample = sample
+        self.signature = signature
+        self.first_seen = now
+        self.last_seen = now
+        # chat_id -> last time seen there, oldest first
+        self.chats: "OrderedDict[int, float]" = OrderedDict()
+        self.users: "OrderedDict[int, None]" = OrderedDict()
+        self.messages = 0
+        self.flagged_at: Optional[float] = None
+        # Band entries pointing here; the wave is dropped with its last one
+        self.refs = 0
+
+    @property
+    def flagged(self) -> bool:
+        return self.flagged_at is not None
+
+    def __repr__(self):
+        return f"<Wave {self.wave_id} in {len(self.chats)} chats>"
+
+
+def _shingles(text: str) -> List[int]:
+    # Cut long texts before the regexes run; a token rarely takes 16 characters
+    tokens = _TOKEN_RE.findall(_NOISE_RE.sub(" ", text[:MAX_TOKENS * 16].lower()))[:MAX_TOKENS]
+    if len(tokens) < MIN_TOKENS:
+        return []
+    # Word bigrams, hashed; hash() is salted per process, which is fine for an in-memory index
+    return list({(hash((a, b)) * _MIX) & _MASK for a, b in zip(tokens, tokens[1:])})
+
+
+def signature(text: str) -> Optional[Tuple[int, ...]]:
+    """MinHash signature of text, or None if it is too short to fingerprint.
+
+    One-permutation hashing: each shingle hash goes to one of SIGNATURE_SIZE bins
+    by its top bits and only the minimum per bin is kept, so a text is hashed
+    once instead of once per signature value.
+    """
+    hashes = _shingles(text)
+    if not hashes:
+        return None
+    bins = [_EMPTY] * SIGNATURE_SIZE
+    for h in hashes:
+        index = h >> _VALUE_BITS
+        value = h & _VALUE_MASK
+        if value < bins[index]:
+            bins[index] = value
+    if _EMPTY in bins:
+        # Densify: an empty bin borrows a filled one, each bin probing in its own order
+        filled = bins[:]
+        for index in range(SIGNATURE_SIZE):
+            if filled[index] == _EMPTY:
+                for other in _PROBES[index]:
+                    if filled[other] != _EMPTY:
+                        bins[index] = _EMPTY + (filled[other] ^ _SEEDS[index])
+                        break
+    return tuple(bins)
+
+
+def band_keys(sig: Sequence[int]) -> List[int]:
+    return [hash((band,) + tuple(sig[band * ROWS:(band + 1) * ROWS])) for band in range(BANDS)]
+
+
+def similarity(sig: Sequence[int], other: Sequence[int]) -> float:
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    return sum(a == b for a, b in zip(sig, other)) / SIGNATURE_SIZE
+
+
+class SpamWaveDetector:
+    """Time-windowed LSH index of recent group texts, grouping near-duplicates into waves.
+
+    A wave is flagged once it has been seen in `chat_threshold` distinct chats
+    within `window` seconds.
+    """
+
+    def __init__(self, chat_threshold: int = 5, window: float = 600, max_entries: int = MAX_ENTRIES) -> None:
+        self.chat_threshold = chat_threshold
+        self.window = window
+        self.max_entries = max_entries
+        # band key -> (wave id, last time seen), least recently seen first
+        self._bands: "OrderedDict[int, Tuple[int, float]]" = OrderedDict()
+        self._waves: Dict[int, Wave] = {}
+        self._next_id = 1
+        self.stats: Dict[str, int] = {"seen": 0, "skipped": 0, "waves": 0, "flagged": 0}
+
+    def __len__(self) -> int:
+        return len(self._bands)
+
+    def _expire(self, now: float) -> None:
+        bands = self._bands
+        cutoff = now - self.window
+        while bands:
+            key, (wave_id, seen) = next(iter(bands.items()))
+            if seen >= cutoff and len(bands) <= self.max_entries:
+                break
+            del bands[key]
+            wave = self._waves.get(wave_id)
+            if wave is not None:
+                wave.refs -= 1
+                if wave.refs <= 0:
+                    del self._waves[wave_id]
+
+    def observe(self, text: str, chat_id: int, user_id: Optional[int] = None, now: Optional[float] = None) -> Optional[Wave]:
+        """Record a group text; returns its wave once that wave is flagged, else None."""
+        now = time.time() if now is None else now
+        sig = signature(text)
+        if sig is None:
+            self.stats["skipped"] += 1
+            return None
+        self.stats["seen"] += 1
+        self._expire(now)
+
+        keys = band_keys(sig)
+        wave = None
+        for key in keys:
+            entry = self._bands.get(key)
+            if entry is not None:
+                candidate = self._waves.get(entry[0])
+                if candidate is not None and similarity(sig, candidate.signature) >= MIN_SIMILARITY:
+                    wave = candidate
+                    break
+        if wave is None:
+            wave = Wave(self._next_id, text[:200], sig, now)
+            self._next_id += 1
+            self._waves[wave.wave_id] = wave
+            self.stats["waves"] += 1
+
+        for key in keys:
+            entry = self._bands.get(key)
+            if entry is not None:
+                if entry[0] == wave.wave_id:
+                    self._bands.move_to_end(key)
+                    self._bands[key] = (wave.wave_id, now)
+                    continue
+                # The key now belongs to this wave
+                old = self._waves.get(entry[0])
+                if old is not None:
+                    old.refs -= 1
+                    if old.refs <= 0:
+                        del self._waves[old.wave_id]
+                del self._bands[key]
+            self._bands[key] = (wave.wave_id, now)
+            wave.refs += 1
+
+        wave.last_seen = now
+        wave.messages += 1
+        wave.chats[chat_id] = now
+        wave.chats.move_to_end(chat_id)
+        cutoff = now - self.window
+        while wave.chats and (len(wave.chats) > MAX_CLUSTER_CHATS or next(iter(wave.chats.values())) < cutoff):
+            wave.chats.popitem(last=False)
+        if user_id is not None:
+            wave.users[user_id] = None
+            wave.users.move_to_end(user_id)
+            if len(wave.users) > MAX_CLUSTER_USERS:
+                wave.users.popitem(last=False)
+
+        if wave.flagged_at is None and len(wave.chats) >= self.chat_threshold:
+            wave.flagged_at = now
+            self.stats["flagged"] += 1
+        return wave if wave.flagged else None
+
+    def flagged_waves(self) -> List[Wave]:
+        return [wave for wave in self._waves.values() if wave.flagged]
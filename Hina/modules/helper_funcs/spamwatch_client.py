@@ -0,0 +1,174 @@
+import asyncio
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from Hina.config import LOGGER, SPAMWATCH_API, SPAMWATCH_API_URL, SPAMWATCH_MIRROR
+from Hina.modules.helper_funcs import http_client
+from Hina.modules.helper_funcs.response_cache import coalesce
+
+DEFAULT_URL = "https://api.spamwat.ch"
+# Bans rarely get lifted, clean users may get banned any time
+BAN_TTL = 6 * 60 * 60
+CLEAR_TTL = 15 * 60
+CACHE_SIZE = 50000
+MIRROR_INTERVAL = 30 * 60
+MIRROR_RETRY_INTERVAL = 5 * 60
+
+
+class SpamWatchError(Exception):
+    """The SpamWatch API could not be reached or refused the request."""
+
+
+class SpamWatchBan:
+    """A ban record, with the same fields as the spamwatch library's Ban."""
+
+    __slots__ = ("id", "reason", "date", "admin", "message")
+
+    def __init__(self, data: dict) -> None:
+        self.id = int(data["id"])
+        self.reason = data.get("reason") or ""
+        self.date = data.get("date")
+        self.admin = data.get("admin")
+        self.message = data.get("message")
+
+    def __repr__(self):
+        return f"<SpamWatchBan {self.id} ({self.reason})>"
+
+
+class SpamWatchClient:
+    """Async SpamWatch client with a TTL cache of verdicts and an optional local ban-list mirror.
+
+    `url` can point at any server speaking the SpamWatch API, e.g. a local
+    stand-in during development.
+    """
+
+    def __init__(self, token: Optional[str], url: Optional[str] = None, mirror: bool = False) -> None:
+        self.token = token
+        self.url = (url or DEFAULT_URL).rstrip("/")
+        self.mirror = mirror
+        # user_id -> (expires_at, ban or None), in least-recently-used order
+        self._verdicts: "OrderedDict[int, Tuple[float, Optional[SpamWatchBan]]]" = OrderedDict()
+        self._inflight: Dict[int, asyncio.Future] = {}
+        # Sorted ids of every banned user, 8 bytes each; None until the first sync
+        self._banned: Optional[array] = None
+        self.mirror_synced_at: Optional[float] = None
+        self._mirror_task: Optional[asyncio.Task] = None
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "coalesced": 0, "mirror": 0}
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.token)
+
+    async def _request(self, path: str):
+        try:
+            response = await http_client.get(
+                f"{self.url}{path}", headers={"Authorization": f"Bearer {self.token}"},
+            )
+        except http_client.HTTPError as excp:
+            raise SpamWatchError(str(excp)) from excp
+        if response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            raise SpamWatchError(f"{path} returned {response.status_code}")
+        return response
+
+    def _remember(self, user_id: int, ban: Optional[SpamWatchBan]) -> None:
+        ttl = BAN_TTL if ban else CLEAR_TTL
+        self._verdicts[user_id] = (time.time() + ttl, ban)
+        self._verdicts.move_to_end(user_id)
+        while len(self._verdicts) > CACHE_SIZE:
+            self._verdicts.popitem(last=False)
+
+    def in_mirror(self, user_id: int) -> Optional[bool]:
+        """Whether the mirrored ban list has user_id, or None if there is no mirror yet."""
+        banned = self._banned
+        if banned is None:
+            return None
+        index = bisect_left(banned, user_id)
+        return index < len(banned) and banned[index] == user_id
+
+    async def _fetch_ban(self, user_id: int) -> Optional[SpamWatchBan]:
+        response = await self._request(f"/banlist/{user_id}")
+        return SpamWatchBan(response.json()) if response is not None else None
+
+    async def get_ban(self, user_id: int) -> Optional[SpamWatchBan]:
+        """Return the ban of user_id, or None if they aren't banned; raises SpamWatchError."""
+        user_id = int(user_id)
+        # Users missing from the mirror are clean, no need to ask
+        if self.in_mirror(user_id) is False:
+            self.stats["mirror"] += 1
+            return None
+
+        entry = self._verdicts.get(user_id)
+        if entry is not None and entry[0] > time.time():
+            self._verdicts.move_to_end(user_id)
+            self.stats["hits"] += 1
+            return entry[1]
+
+        if user_id in self._inflight:
+            self.stats["coalesced"] += 1
+        else:
+            self.stats["misses"] += 1
+
+        async def fetch_and_remember() -> Optional[SpamWatchBan]:
+            ban = await self._fetch_ban(user_id)
+            self._remember(user_id, ban)
+            return ban
+
+        return await coalesce(self._inflight, user_id, fetch_and_remember)
+
+    async def is_banned(self, user_id: int) -> bool:
+        """Cheaper than get_ban when a mirror is synced, as no ban details are fetched."""
+        mirrored = self.in_mirror(int(user_id))
+        if mirrored is not None:
+            self.stats["mirror"] += 1
+            return mirrored
+        return await self.get_ban(user_id) is not None
+
+    async def sync_banlist(self) -> int:
+        """Replace the mirror with the full list of banned ids; returns how many there are."""
+        response = await self._request("/banlist/all")
+        if response is None:
+            raise SpamWatchError("/banlist/all is not available")
+        banned = array("q", sorted({int(line) for line in response.text.split() if line.isdigit()}))
+        self._banned = banned
+        self.mirror_synced_at = time.time()
+        # Cached "not banned" verdicts may be outdated by the new list
+        for user_id in [uid for uid, (_, ban) in self._verdicts.items() if ban is None]:
+            if self.in_mirror(user_id):
+                del self._verdicts[user_id]
+        return len(banned)
+
+    async def _mirror_loop(self):
+        while True:
+            try:
+                count = await self.sync_banlist()
+                LOGGER.info("Mirrored %s SpamWatch bans", count)
+                delay = MIRROR_INTERVAL
+            except SpamWatchError as excp:
+                LOGGER.warning("SpamWatch ban list sync failed: %s", excp)
+                delay = MIRROR_RETRY_INTERVAL
+            await asyncio.sleep(delay)
+
+    def start_mirror(self) -> None:
+        """Start periodic ban list syncs when mirroring is enabled (call from the running event loop)"""
+        if not self.mirror or not self.configured:
+            return
+        if self._mirror_task is not None and not self._mirror_task.done():
+            return
+        self._mirror_task = asyncio.create_task(self._mirror_loop())
+
+    async def stop_mirror(self) -> None:
+        if self._mirror_task is not None:
+            self._mirror_task.cancel()
+            try:
+                await self._mirror_task
+            except asyncio.CancelledError:
+                pass
+            self._mirror_task = None
+
+
+sw = SpamWatchClient(SPAMWATCH_API, SPAMWATCH_API_URL, SPAMWATCH_MIRROR)
@@ -0,0 +1,120 @@
+import re
+import unicodedata
+from functools import lru_cache
+from typing import FrozenSet, List, Optional, Tuple
+
+from telegram import Message, MessageEntity, Update
+from telegram.ext import ContextTypes
+
+from Hina.modules.helper_funcs.extraction import extract_text
+
+# Runs before every other message handler group
+TEXT_VIEW_GROUP = -1
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=4096)
+def _char_script(char: str) -> str:
+    """Script of a letter as alphabet_detector names it, e.g. LATIN or ARABIC"""
+    return unicodedata.name(char, "UNKNOWN").split(" ")[0]
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+class TextView:
+    """Normalized view of the text of one update, computed once and shared by all filters.
+
+    Only the text is read up front; tokens, scripts and entities are built on first
+    use, so an update whose verdicts are all cached never tokenizes.
+    """
+
+    __slots__ = ("text", "_message", "_lowered", "_tokens", "_words", "_scripts", "_entities")
+
+    def __init__(self, message: Optional[Message]) -> None:
+        text = extract_text(message) if message else None
+        self.text: str = text or ""
+        self._message = message
+        self._lowered: Optional[str] = None
+        self._tokens: Optional[Tuple[Tuple[int, int], ...]] = None
+        self._words: Optional[FrozenSet[str]] = None
+        self._scripts: Optional[FrozenSet[str]] = None
+        self._entities: Optional[List[Tuple[MessageEntity, str]]] = None
+
+    @property
+    def lowered(self) -> str:
+        if self._lowered is None:
+            self._lowered = self.text.lower()
+        return self._lowered
+
+    @property
+    def tokens(self) -> Tuple[Tuple[int, int], ...]:
+        """(start, end) offsets of every \\w+ run in `lowered`"""
+        if self._tokens is None:
+            self._tokens = tuple(match.span() for match in _TOKEN_RE.finditer(self.lowered))
+        return self._tokens
+
+    @property
+    def words(self) -> FrozenSet[str]:
+        if self._words is None:
+            lowered = self.lowered
+            self._words = frozenset(lowered[start:end] for start, end in self.tokens)
+        return self._words
+
+    @property
+    def scripts(self) -> FrozenSet[str]:
+        if self._scripts is None:
+            self._scripts = frozenset(_char_script(char) for char in set(self.text) if char.isalpha())
+        return self._scripts
+
+    @property
+    def entities(self) -> List[Tuple[MessageEntity, str]]:
+        if self._entities is None:
+            message = self._message
+            self._entities = []
+            if message is not None:
+                parsed = message.parse_entities() if message.text else message.parse_caption_entities()
+                self._entities = list(parsed.items())
+        return self._entities
+
+    def __bool__(self) -> bool:
+        return bool(self.text)
+
+    def contains(self, keyword: str) -> bool:
+        """Case-insensitive search for keyword delimited by non-word characters.
+
+        Same semantics as ``( |^|[^\\w])keyword( |$|[^\\w])`` with re.IGNORECASE,
+        without compiling a pattern per keyword.
+        """
+        needle = keyword.lower()
+        if not needle:
+            return False
+        if _TOKEN_RE.fullmatch(needle):
+            return needle in self.words
+
+        text = self.lowered
+        start = text.find(needle)
+        while start != -1:
+            end = start + len(needle)
+            if (start == 0 or not _is_word_char(text[start - 1])) and (
+                end == len(text) or not _is_word_char(text[end])
+            ):
+                return True
+            start = text.find(needle, start + 1)
+        return False
+
+
+def get_text_view(update: Update, context: ContextTypes.DEFAULT_TYPE) -> TextView:
+    """Return the text view of the current update, building it on first use."""
+    view = getattr(context, "text_view", None)
+    if view is None:
+        view = TextView(update.effective_message)
+        context.text_view = view
+    return view
+
+
+async def prepare_text_view(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Pre-processing stage: extracts the message text once before the filter modules run."""
+    get_text_view(update, context)
@@ -0,0 +1,130 @@
+import bisect
+import difflib
+import os
+import zoneinfo
+from importlib import resources
+from typing import Dict, List, Optional, Tuple
+
+from Hina.config import LOGGER
+
+
+class ZoneEntry:
+    """An IANA zone together with the country it belongs to, if any."""
+
+    __slots__ = ("zone_name", "country_code", "country_name", "tz")
+
+    def __init__(self, zone_name: str, country_code: str, country_name: str) -> None:
+        self.zone_name = zone_name
+        self.country_code = country_code
+        self.country_name = country_name
+        self.tz = zoneinfo.ZoneInfo(zone_name)
+
+
+class TimezoneIndex:
+    """Lookup table from lowercased country codes, country names, zone names and cities to zones."""
+
+    def __init__(self, names: Dict[str, List[ZoneEntry]]) -> None:
+        self.names = names
+        self.keys: List[str] = sorted(names)
+
+    def _prefixed(self, query: str) -> List[str]:
+        start = bisect.bisect_left(self.keys, query)
+        end = bisect.bisect_left(self.keys, query + "\uffff")
+        return self.keys[start:end]
+
+    def search(self, query: str) -> List[ZoneEntry]:
+        """Return the zones matching query, trying exact, prefix, substring and fuzzy matches in turn."""
+        query = " ".join(query.replace("_", " ").split()).lower()
+        if not query:
+            return []
+        entries = self.names.get(query)
+        if entries:
+            return entries
+        # Two letters only ever mean a country code
+        if len(query) == 2:
+            return []
+
+        keys = self._prefixed(query) or [key for key in self.keys if query in key]
+        if not keys:
+            keys = difflib.get_close_matches(query, self.keys, n=1, cutoff=0.8)
+        seen = set()
+        matches = []
+        for key in sorted(keys, key=len):
+            for entry in self.names[key]:
+                if entry.zone_name not in seen:
+                    seen.add(entry.zone_name)
+                    matches.append(entry)
+        return matches
+
+
+def _read_tab(name: str) -> List[List[str]]:
+    """Rows of a tab separated tzdata table, from the system database or the tzdata package."""
+    text = None
+    for directory in zoneinfo.TZPATH:
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+            break
+    if text is None:
+        try:
+            text = resources.files("tzdata.zoneinfo").joinpath(name).read_text(encoding="utf-8")
+        except (ModuleNotFoundError, FileNotFoundError):
+            LOGGER.warning("No %s found, /time will only match zone names", name)
+            return []
+    return [
+        line.split("\t")
+        for line in text.splitlines()
+        if line and not line.startswith("#")
+    ]
+
+
+def _zone_countries() -> List[Tuple[str, str]]:
+    """(zone name, country code) pairs, with each country's main zone listed first"""
+    pairs = [(row[2], row[0]) for row in _read_tab("zone.tab")]
+    if not pairs:
+        for row in _read_tab("zone1970.tab"):
+            pairs += [(row[2], code) for code in row[0].split(",")]
+    return pairs
+
+
+def build_index() -> TimezoneIndex:
+    countries = {row[0]: row[1] for row in _read_tab("iso3166.tab")}
+    available = zoneinfo.available_timezones()
+    names: Dict[str, List[ZoneEntry]] = {}
+
+    def add(name: str, entry: ZoneEntry) -> None:
+        entries = names.setdefault(" ".join(name.replace("_", " ").split()).lower(), [])
+        if entry not in entries:
+            entries.append(entry)
+
+    in_country = set()
+    for zone_name, code in _zone_countries():
+        if zone_name not in available:
+            continue
+        in_country.add(zone_name)
+        entry = ZoneEntry(zone_name, code, countries.get(code, code))
+        add(code, entry)
+        add(entry.country_name, entry)
+        add(zone_name, entry)
+        add(zone_name.rsplit("/", 1)[-1], entry)
+
+    for zone_name in sorted(available - in_country):
+        if zone_name.startswith(("posix/", "right/")) or zone_name in ("Factory", "localtime"):
+            continue
+        entry = ZoneEntry(zone_name, "", "")
+        add(zone_name, entry)
+        add(zone_name.rsplit("/", 1)[-1], entry)
+
+    return TimezoneIndex(names)
+
+
+_index: Optional[TimezoneIndex] = None
+
+
+def get_index() -> TimezoneIndex:
+    """Return the index, building it on first use."""
+    global _index
+    if _index is None:
+        _index = build_index()
+    return _index
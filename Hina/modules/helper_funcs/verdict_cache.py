@@ -0,0 +1,69 @@
+from typing import Dict, Optional, Tuple
+
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from Hina.modules.helper_funcs.text_view import get_text_view
+from Hina.modules.sql.chat_config_sql import get_config_version
+
+# Upper bound on cached verdict sets; the oldest are dropped first
+VERDICT_CACHE_SIZE = 20000
+
+# A verdict that hasn't been evaluated yet; None is a valid verdict ("nothing matched")
+UNKNOWN = object()
+
+
+class Verdicts:
+    """What each filter module decided about one piece of content in one chat.
+
+    Only content-derived decisions are kept (which trigger matched), never the
+    action taken, which still depends on the sender and the chat's mode.
+    """
+
+    __slots__ = ("blacklist", "sticker", "filter", "warn", "rtl")
+
+    def __init__(self) -> None:
+        self.blacklist = UNKNOWN
+        self.sticker = UNKNOWN
+        self.filter = UNKNOWN
+        self.warn = UNKNOWN
+        self.rtl = UNKNOWN
+
+
+# (chat_id, chat config version, content hash) -> verdicts, oldest first.
+# Setters bump the version, so entries of a changed chat are never hit again and age out.
+_verdicts: Dict[Tuple[int, int, int], Verdicts] = {}
+stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+
+def content_hash(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    """Hash of everything the filter modules match on: the text and the sticker set."""
+    message = update.effective_message
+    text = get_text_view(update, context).text
+    if message is not None and message.sticker is not None:
+        return hash((text, message.sticker.set_name))
+    return hash(text)
+
+
+def get_verdicts(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Verdicts:
+    """Return the shared verdicts of the current update's content, looked up on first use."""
+    verdicts: Optional[Verdicts] = getattr(context, "verdicts", None)
+    if verdicts is not None:
+        return verdicts
+
+    chat_id = update.effective_chat.id
+    key = (chat_id, get_config_version(chat_id), content_hash(update, context))
+    verdicts = _verdicts.get(key)
+    if verdicts is None:
+        stats["misses"] += 1
+        verdicts = _verdicts[key] = Verdicts()
+        if len(_verdicts) > VERDICT_CACHE_SIZE:
+            del _verdicts[next(iter(_verdicts))]
+    else:
+        stats["hits"] += 1
+    context.verdicts = verdicts
+    return verdicts
+
+
+def cache_size() -> int:
+    return len(_verdicts)
@@ -13,12 +13,13 @@ from telegram.ext import (
 )
 from telegram.helpers import mention_html
 
-from alphabet_detector import AlphabetDetector
-
 import Hina.modules.sql.locks_sql as sql
+from Hina.modules.helper_funcs.filters import ChatFeature
+from Hina.modules.sql.chat_features_sql import Feature
 from Hina.modules.disable import DisableAbleCommandHandler
 from Hina.modules.helper_funcs.chat_status import (
     can_delete,
+    get_bot_member,
     is_user_admin,
     user_not_admin,
     is_bot_admin,
@@ -26,10 +27,11 @@ from Hina.modules.helper_funcs.chat_status import (
 )
 from Hina.modules.log_channel import loggable
 from Hina.modules.connection import connected
+from Hina.modules.sql.chat_config_sql import get_chat_config
 from Hina.modules.sql.approve_sql import is_approved
 from Hina.modules.helper_funcs.alternate import send_message, typing_action
-
-ad = AlphabetDetector()
+from Hina.modules.helper_funcs.text_view import get_text_view
+from Hina.modules.helper_funcs.verdict_cache import UNKNOWN, get_verdicts
 
 LOCK_TYPES = {
     "audio": filters.AUDIO,
@@ -327,7 +329,7 @@ async def unlock(update: Update, context: ContextTypes.DEFAULT_TYPE) -> str:
                     chat_name = update.effective_message.chat.title
                     text = f"Unlocked {ltype} for everyone!"
 
-                can_change_info = (await chat.get_member(context.bot.id)).can_change_info
+                can_change_info = getattr(await get_bot_member(chat.id, context.bot.id), "can_change_info", False)
                 if not can_change_info:
                     await send_message(
                         update.effective_message,
@@ -375,61 +377,52 @@ async def del_lockables(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user = update.effective_user
     if is_approved(chat.id, user.id):
         return
+    locked = (await get_chat_config(chat.id)).locks
+    if not locked:
+        return
+    # every lock action needs delete rights; read them once from the bot member cache
+    if not await can_delete(chat, context.bot.id):
+        return
     for lockable, filter in LOCK_TYPES.items():
+        if lockable not in locked:
+            continue
         if lockable == "rtl":
-            if sql.is_locked(chat.id, lockable) and await can_delete(chat, context.bot.id):
-                if message.caption:
-                    check = ad.detect_alphabet(f"{message.caption}")
-                    if "ARABIC" in check:
-                        try:
-                            await message.delete()
-                        except BadRequest as excp:
-                            if excp.message == "Message to delete not found":
-                                pass
-                            else:
-                                LOGGER.exception("ERROR in lockables")
-                        break
-                if message.text:
-                    check = ad.detect_alphabet(f"{message.text}")
-                    if "ARABIC" in check:
-                        try:
-                            await message.delete()
-                        except BadRequest as excp:
-                            if excp.message == "Message to delete not found":
-                                pass
-                            else:
-                                LOGGER.exception("ERROR in lockables")
-                        break
+            verdicts = get_verdicts(update, context)
+            if verdicts.rtl is UNKNOWN:
+                verdicts.rtl = "ARABIC" in get_text_view(update, context).scripts
+            if verdicts.rtl:
+                try:
+                    await message.delete()
+                except BadRequest as excp:
+                    if excp.message == "Message to delete not found":
+                        pass
+                    else:
+                        LOGGER.exception("ERROR in lockables")
+                break
             continue
         if lockable == "button":
-            if sql.is_locked(chat.id, lockable) and await can_delete(chat, context.bot.id):
-                if message.reply_markup and message.reply_markup.inline_keyboard:
-                    try:
-                        await message.delete()
-                    except BadRequest as excp:
-                        if excp.message == "Message to delete not found":
-                            pass
-                        else:
-                            LOGGER.exception("ERROR in lockables")
-                    break
+            if message.reply_markup and message.reply_markup.inline_keyboard:
+                try:
+                    await message.delete()
+                except BadRequest as excp:
+                    if excp.message == "Message to delete not found":
+                        pass
+                    else:
+                        LOGGER.exception("ERROR in lockables")
+                break
             continue
         if lockable == "inline":
-            if sql.is_locked(chat.id, lockable) and await can_delete(chat, context.bot.id):
-                if message and message.via_bot:
-                    try:
-                        await message.delete()
-                    except BadRequest as excp:
-                        if excp.message == "Message to delete not found":
-                            pass
-                        else:
-                            LOGGER.exception("ERROR in lockables")
-                    break
+            if message and message.via_bot:
+                try:
+                    await message.delete()
+                except BadRequest as excp:
+                    if excp.message == "Message to delete not found":
+                        pass
+                    else:
+                        LOGGER.exception("ERROR in lockables")
+                break
             continue
-        if (
-            await filter(update)
-            and sql.is_locked(chat.id, lockable)
-            and await can_delete(chat, context.bot.id)
-        ):
+        if await filter(update):
             if lockable == "bots":
                 new_members = update.effective_message.new_chat_members
                 for new_mem in new_members:
@@ -595,6 +588,6 @@ app.add_handler(LOCKTYPES_HANDLER)
 app.add_handler(LOCKED_HANDLER)
 
 app.add_handler(
-    MessageHandler(filters.ALL & filters.ChatType.GROUPS, del_lockables),
+    MessageHandler(filters.ALL & filters.ChatType.GROUPS & ChatFeature(Feature.LOCKS), del_lockables),
     group=PERM_GROUP,
 )
@@ -1,13 +1,12 @@
 from Hina.config import app
-import requests
 from Hina.modules.disable import DisableAbleCommandHandler
+from Hina.modules.helper_funcs import http_client
 from telegram import Update
 from telegram.constants import ParseMode
-from telegram.constants import ParseMode
 from telegram.ext import ContextTypes
 
 
-def paste(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def paste(update: Update, context: ContextTypes.DEFAULT_TYPE):
     args = context.args
     message = update.effective_message
 
@@ -18,12 +17,11 @@ def paste(update: Update, context: ContextTypes.DEFAULT_TYPE):
         data = message.text.split(None, 1)[1]
 
     else:
-        message.reply_text("What am I supposed to do with this?")
+        await message.reply_text("What am I supposed to do with this?")
         return
 
     key = (
-        requests.post("https://nekobin.com/api/documents", json={"content": data})
-        .json()
+        (await http_client.post_json("https://nekobin.com/api/documents", json={"content": data}))
         .get("result")
         .get("key")
     )
@@ -32,7 +30,7 @@ def paste(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     reply_text = f"Nekofied to *Nekobin* : {url}"
 
-    message.reply_text(
+    await message.reply_text(
         reply_text, parse_mode=ParseMode.MARKDOWN, disable_web_page_preview=True,
     )
 
@@ -1,14 +1,14 @@
 from Hina.config import app
+import asyncio
 import time
 from typing import List
 
-import requests
 from telegram import Update
 from telegram.constants import ParseMode
-from telegram.constants import ParseMode
 from telegram.ext import ContextTypes
 
 from Hina.config import StartTime, app
+from Hina.modules.helper_funcs import http_client
 from Hina.modules.helper_funcs.chat_status import sudo_plus
 from Hina.modules.disable import DisableAbleCommandHandler
 
@@ -48,40 +48,42 @@ def get_readable_time(seconds: int) -> str:
     return ping_time
 
 
-def ping_func(to_ping: List[str]) -> List[str]:
-    ping_result = []
-
-    for each_ping in to_ping:
+async def ping_site(each_ping: str) -> str:
+    start_time = time.time()
+    site_to_ping = sites_list[each_ping]
+    try:
+        r = await http_client.get(site_to_ping, retries=0)
+        status = r.status_code
+    except http_client.HTTPError:
+        status = "unreachable"
+    end_time = time.time()
+    ping_time = str(round((end_time - start_time), 2)) + "s"
 
-        start_time = time.time()
-        site_to_ping = sites_list[each_ping]
-        r = requests.get(site_to_ping)
-        end_time = time.time()
-        ping_time = str(round((end_time - start_time), 2)) + "s"
+    pinged_site = f"<b>{each_ping}</b>"
 
-        pinged_site = f"<b>{each_ping}</b>"
+    if each_ping == "Kaizoku" or each_ping == "Kayo":
+        pinged_site = f'<a href="{sites_list[each_ping]}">{each_ping}</a>'
+        ping_time = f"<code>{ping_time} (Status: {status})</code>"
 
-        if each_ping == "Kaizoku" or each_ping == "Kayo":
-            pinged_site = f'<a href="{sites_list[each_ping]}">{each_ping}</a>'
-            ping_time = f"<code>{ping_time} (Status: {r.status_code})</code>"
+    return f"{pinged_site}: <code>{ping_time}</code>"
 
-        ping_text = f"{pinged_site}: <code>{ping_time}</code>"
-        ping_result.append(ping_text)
 
-    return ping_result
+async def ping_func(to_ping: List[str]) -> List[str]:
+    # sites are pinged concurrently, so the slowest one bounds the total time
+    return list(await asyncio.gather(*(ping_site(each_ping) for each_ping in to_ping)))
 
 
 @sudo_plus
-def ping(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def ping(update: Update, context: ContextTypes.DEFAULT_TYPE):
     msg = update.effective_message
 
     start_time = time.time()
-    message = msg.reply_text("Pinging...")
+    message = await msg.reply_text("Pinging...")
     end_time = time.time()
     telegram_ping = str(round((end_time - start_time) * 1000, 3)) + " ms"
     uptime = get_readable_time((time.time() - StartTime))
 
-    message.edit_text(
+    await message.edit_text(
         "PONG!!\n"
         "<b>Time Taken:</b> <code>{}</code>\n"
         "<b>Service uptime:</b> <code>{}</code>".format(telegram_ping, uptime),
@@ -90,9 +92,9 @@ def ping(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 @sudo_plus
-def pingall(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def pingall(update: Update, context: ContextTypes.DEFAULT_TYPE):
     to_ping = ["Kaizoku", "Kayo", "Telegram", "Jikan"]
-    pinged_list = ping_func(to_ping)
+    pinged_list = await ping_func(to_ping)
     pinged_list.insert(2, "")
     uptime = get_readable_time((time.time() - StartTime))
 
@@ -100,7 +102,7 @@ def pingall(update: Update, context: ContextTypes.DEFAULT_TYPE):
     reply_msg += "\n".join(pinged_list)
     reply_msg += "\n<b>Service uptime:</b> <code>{}</code>".format(uptime)
 
-    update.effective_message.reply_text(
+    await update.effective_message.reply_text(
         reply_msg, parse_mode=ParseMode.HTML, disable_web_page_preview=True,
     )
 
@@ -6,6 +6,7 @@ from Hina.config import LOGGER, DRAGONS, TIGERS, WOLVES
 from Hina.modules.helper_funcs.chat_status import user_admin, user_not_admin
 from Hina.modules.log_channel import loggable
 from Hina.modules.sql import reporting_sql as sql
+from Hina.modules.sql.chat_config_sql import get_chat_config
 
 from telegram import (
     Chat,
@@ -65,7 +66,7 @@ async def report_setting(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 )
         else:
             await msg.reply_text(
-                f"This group's current setting is: `{sql.chat_should_report(chat.id)}`",
+                f"This group's current setting is: `{(await get_chat_config(chat.id)).should_report}`",
                 parse_mode=ParseMode.MARKDOWN,
             )
 
@@ -78,7 +79,9 @@ async def report(update: Update, context: ContextTypes.DEFAULT_TYPE) -> str:
     chat = update.effective_chat
     user = update.effective_user
 
-    if not (chat and message.reply_to_message and sql.chat_should_report(chat.id)):
+    if not (chat and message.reply_to_message):
+        return ""
+    if not (await get_chat_config(chat.id)).should_report:
         return ""
 
     reported_user = message.reply_to_message.from_user
@@ -1,7 +1,5 @@
 from Hina.config import app
-import re
 import regex
-import sre_constants
 from typing import Optional
 
 from telegram import Update
@@ -10,7 +8,15 @@ from telegram.ext import ContextTypes, filters
 from telegram.helpers import escape_markdown
 
 from Hina.modules.disable import DisableAbleMessageHandler
-from Hina.modules.helper_funcs.regex_helper import infinite_loop_check
+from Hina.modules.helper_funcs.regex_helper import (
+    OutputTooLong,
+    SandboxBusy,
+    SandboxError,
+    SandboxTimeout,
+    infinite_loop_check,
+    regex_match,
+    regex_sub,
+)
 from Hina.config import LOGGER
 
 DELIMITERS = ("/", ":", "|", "_")
@@ -86,55 +92,47 @@ async def sed(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     try:
         # Check for whole message match
-        try:
-            check = regex.match(repl, to_fix, flags=regex.IGNORECASE, timeout=5)
-            if check and check.group(0).lower() == to_fix.lower():
-                await update.effective_message.reply_to_message.reply_text(
-                    f"Hey everyone, {update.effective_user.first_name} is trying to "
-                    "make me say stuff I don't wanna say!"
-                )
-                return
-        except TimeoutError:
-            await update.effective_message.reply_text("Regex timed out")
+        check = await regex_match(repl, to_fix, regex.IGNORECASE)
+        if check and check.lower() == to_fix.lower():
+            await update.effective_message.reply_to_message.reply_text(
+                f"Hey everyone, {update.effective_user.first_name} is trying to "
+                "make me say stuff I don't wanna say!"
+            )
             return
 
         # Check for infinite loops
-        if infinite_loop_check(repl):
+        if await infinite_loop_check(repl):
             await update.effective_message.reply_text("I'm afraid I can't run that regex.")
             return
 
         # Apply replacement
         flags_re = regex.IGNORECASE if "i" in flags else 0
         count = 0 if "g" in flags else 1
-        
-        try:
-            text = regex.sub(
-                repl, 
-                repl_with, 
-                to_fix, 
-                count=count, 
-                flags=flags_re, 
-                timeout=3
-            ).strip()
-        except TimeoutError:
-            await update.effective_message.reply_text("Replacement timed out")
-            return
-        except sre_constants.error as e:
-            LOGGER.warning(f"Sed error: {e} - Input: {update.effective_message.text}")
-            await update.effective_message.reply_text("Invalid regex pattern.")
-            return
 
-        # Send result
-        if text and len(text) < MessageLimit.MAX_TEXT_LENGTH:
-            await update.effective_message.reply_to_message.reply_text(text)
-        elif text:
-            await update.effective_message.reply_text(
-                "The result of the sed command was too long for Telegram!"
-            )
-            
-    except Exception as e:
-        LOGGER.error(f"Sed error: {e}")
-        await update.effective_message.reply_text("An error occurred processing your sed command.")
+        text = (await regex_sub(repl, repl_with, to_fix, count, flags_re)).strip()
+    except SandboxTimeout:
+        await update.effective_message.reply_text("Regex timed out")
+        return
+    except SandboxBusy as e:
+        await update.effective_message.reply_text(str(e))
+        return
+    except OutputTooLong:
+        await update.effective_message.reply_text(
+            "The result of the sed command was too long for Telegram!"
+        )
+        return
+    except SandboxError as e:
+        LOGGER.warning(f"Sed error: {e} - Input: {update.effective_message.text}")
+        await update.effective_message.reply_text("Invalid regex pattern.")
+        return
+
+    # Send result
+    if text and len(text) < MessageLimit.MAX_TEXT_LENGTH:
+        await update.effective_message.reply_to_message.reply_text(text)
+    elif text:
+        await update.effective_message.reply_text(
+            "The result of the sed command was too long for Telegram!"
+        )
 
 __help__ = """
 • `s/<text1>/<text2>(/<flag>)`*:* Reply to a message to replace text using sed syntax.
@@ -0,0 +1,111 @@
+from Hina.config import app, LOGGER
+import asyncio
+import html
+from collections import OrderedDict
+
+from telegram import Update
+from telegram.constants import ParseMode
+from telegram.error import BadRequest
+from telegram.ext import CommandHandler, ContextTypes, MessageHandler, filters
+
+from Hina.config import DEV_USERS, EVENT_LOGS, SPAM_WAVE_CHATS, SPAM_WAVE_DELETE, SPAM_WAVE_WINDOW
+from Hina.modules.helper_funcs.chat_status import dev_plus, is_user_admin, is_whitelist_plus
+from Hina.modules.helper_funcs.send_scheduler import Lane, scheduler
+from Hina.modules.helper_funcs.spam_wave_detector import SpamWaveDetector, Wave
+from Hina.modules.helper_funcs.text_view import get_text_view
+from Hina.modules.sql.approve_sql import is_approved
+
+SPAM_WAVE_GROUP = 14
+# Waves already reported to EVENT_LOGS, oldest first
+MAX_REPORTED = 1000
+
+detector = SpamWaveDetector(SPAM_WAVE_CHATS, SPAM_WAVE_WINDOW)
+_reported: "OrderedDict[int, None]" = OrderedDict()
+
+
+def _wave_report(wave: Wave) -> str:
+    users = ", ".join(f"<code>{user_id}</code>" for user_id in wave.users) or "unknown"
+    return (
+        f"#SPAMWAVE\n"
+        f"<b>Wave:</b> <code>{wave.wave_id}</code>\n"
+        f"<b>Chats:</b> {len(wave.chats)} in {int(wave.last_seen - wave.first_seen)}s\n"
+        f"<b>Messages:</b> {wave.messages}\n"
+        f"<b>Senders:</b> {users}\n"
+        f"<b>Sample:</b>\n<code>{html.escape(wave.sample)}</code>"
+    )
+
+
+def _log_send_failure(future: asyncio.Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        LOGGER.error("Could not report spam wave to EVENT_LOGS: %s", future.exception())
+
+
+def _report(bot, wave: Wave) -> None:
+    _reported[wave.wave_id] = None
+    if len(_reported) > MAX_REPORTED:
+        _reported.popitem(last=False)
+    LOGGER.info("Spam wave %s seen in %s chats", wave.wave_id, len(wave.chats))
+    if EVENT_LOGS:
+        future = scheduler.submit(
+            bot.send_message,
+            EVENT_LOGS,
+            _wave_report(wave),
+            target=int(EVENT_LOGS),
+            lane=Lane.MODERATION,
+            parse_mode=ParseMode.HTML,
+        )
+        future.add_done_callback(_log_send_failure)
+
+
+async def check_spam_wave(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    chat = update.effective_chat
+    user = update.effective_user
+    message = update.effective_message
+    if not user or is_whitelist_plus(chat, user.id):
+        return
+    view = get_text_view(update, context)
+    if not view:
+        return
+
+    wave = detector.observe(view.text, chat.id, user.id)
+    if wave is None:
+        return
+    if wave.wave_id not in _reported:
+        _report(context.bot, wave)
+
+    if not SPAM_WAVE_DELETE or is_approved(chat.id, user.id) or await is_user_admin(chat, user.id):
+        return
+    try:
+        await message.delete()
+    except BadRequest:
+        pass
+
+
+@dev_plus
+async def spam_waves(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    stats = detector.stats
+    text = (
+        f"<b>Spam waves</b>: {len(detector)} index entries, "
+        f"{stats['seen']} messages fingerprinted, {stats['skipped']} too short, "
+        f"{stats['waves']} waves, {stats['flagged']} flagged "
+        f"(≥{detector.chat_threshold} chats in {int(detector.window)}s)\n"
+    )
+    waves = sorted(detector.flagged_waves(), key=lambda wave: len(wave.chats), reverse=True)[:10]
+    for wave in waves:
+        sample = html.escape(wave.sample[:80])
+        text += f"\n<code>{wave.wave_id}</code>: {len(wave.chats)} chats, {wave.messages} messages - {sample}"
+    await update.effective_message.reply_text(text, parse_mode=ParseMode.HTML)
+
+
+__mod_name__ = "Spam Waves"
+
+SPAM_WAVE_HANDLER = MessageHandler(
+    ((filters.TEXT & ~filters.COMMAND) | filters.CAPTION) & filters.ChatType.GROUPS,
+    check_spam_wave,
+)
+SPAM_WAVES_STATS_HANDLER = CommandHandler("spamwaves", spam_waves, filters=filters.User(DEV_USERS))
+
+app.add_handler(SPAM_WAVE_HANDLER, group=SPAM_WAVE_GROUP)
+app.add_handler(SPAM_WAVES_STATS_HANDLER)
+
+__handlers__ = [(SPAM_WAVE_HANDLER, SPAM_WAVE_GROUP), SPAM_WAVES_STATS_HANDLER]
@@ -20,15 +20,9 @@ from telegram.helpers import mention_html
 
 from Hina.config import DB_URI, LOG_CHANNEL, app
 
-try:
-    import spamwatch
-    SPAMWATCH_AVAILABLE = True
-except ImportError:
-    SPAMWATCH_AVAILABLE = False
-    logging.warning("SpamWatch module not installed!")
-
 from Hina.modules.helper_funcs.chat_status import user_admin
 from Hina.modules.helper_funcs.extraction import extract_user
+from Hina.modules.helper_funcs.spamwatch_client import SpamWatchClient, sw
 
 try:
     from Hina.modules.disable import DisableAbleCommandHandler
@@ -68,19 +62,11 @@ async def create_tables(async_engine):
         LOGGER.error(f"Failed to initialize SpamWatch database tables: {e}", exc_info=True)
         raise
 
-# Initialize SpamWatch Client with the provided token
-SPAMWATCH_TOKEN = "6kkCqbMbiwJzPCkAT359mn0Cum1V09XZ83kLCc90wiAxsT7~hxR5dgccCerMWth6"
-spamwatch_client: Optional[spamwatch.Client] = None
+# Shared with global_bans and userinfo, so all of them hit the same verdict cache
+spamwatch_client: Optional[SpamWatchClient] = sw if sw.configured else None
 
-if SPAMWATCH_TOKEN and SPAMWATCH_AVAILABLE:
-    try:
-        spamwatch_client = spamwatch.Client(SPAMWATCH_TOKEN)
-        LOGGER.info("Connected to SpamWatch.")
-    except Exception as e:
-        spamwatch_client = None
-        LOGGER.error(f"Failed to load SpamWatch client: {e}", exc_info=True)
-else:
-    LOGGER.warning("SpamWatch is not configured or not available!")
+if not spamwatch_client:
+    LOGGER.warning("SpamWatch is not configured!")
 
 SPAMWATCH_SETTING_LOCK = asyncio.Lock()
 SPAMWATCH_DISABLED_CHATS: Set[str] = set()
@@ -176,7 +162,7 @@ async def spamwatch_ban(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
         
     try:
-        ban = spamwatch_client.get_ban(user.id)
+        ban = await spamwatch_client.get_ban(user.id)
         if ban:
             await update.effective_chat.ban_member(user.id)
             if get_spamwatch_log_setting(str(update.effective_chat.id)):
@@ -203,7 +189,7 @@ async def spamwatch_ban_alert(update: Update, context: ContextTypes.DEFAULT_TYPE
     
     for user in update.effective_message.new_chat_members:
         try:
-            ban = spamwatch_client.get_ban(user.id)
+            ban = await spamwatch_client.get_ban(user.id)
             if ban:
                 await update.effective_chat.ban_member(user.id)
                 if get_spamwatch_log_setting(str(update.effective_chat.id)):
@@ -234,7 +220,7 @@ async def spamwatch_check(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
         
     try:
-        ban = spamwatch_client.get_ban(user_id)
+        ban = await spamwatch_client.get_ban(user_id)
         if ban:
             await update.effective_message.reply_text(
                 f"⚠️ User is banned in SpamWatch.\n"
@@ -284,12 +270,8 @@ async def spamwatch_log_toggle(update: Update, context: ContextTypes.DEFAULT_TYP
 async def setup_module(application: Application):
     """A single function to initialize and set up the module."""
     LOGGER.info("Starting SpamWatch module setup.")
-    if not SPAMWATCH_AVAILABLE:
-        LOGGER.warning("SpamWatch module is not available. Skipping setup.")
-        return False
-        
-    if not SPAMWATCH_TOKEN:
-        LOGGER.warning("SPAMWATCH_TOKEN is not configured. Skipping setup.")
+    if not spamwatch_client:
+        LOGGER.warning("SPAMWATCH_API is not configured. Skipping setup.")
         return False
         
     try:
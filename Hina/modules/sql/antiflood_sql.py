@@ -1,6 +1,10 @@
 import asyncio
-from typing import Dict, Tuple, Optional, Union
+import time
+from collections import deque
+from typing import Deque, Dict, Tuple, Optional, Union
 
+from .chat_config_sql import invalidate_chat_config
+from .chat_features_sql import Feature, load_feature, set_feature
 from .db_connection import BASE, async_session, async_engine  # Add async_engine import
 from sqlalchemy import String, Column, Integer, UnicodeText
 from sqlalchemy.future import select
@@ -9,6 +13,7 @@ from sqlalchemy import update, delete
 DEF_COUNT = 1
 DEF_LIMIT = 0
 DEF_OBJ = (None, DEF_COUNT, DEF_LIMIT)
+DEF_SETTING = (1, "0")
 
 class FloodControl(BASE):
     __tablename__ = "antiflood"
@@ -37,12 +42,43 @@ class FloodSettings(BASE):
     def __repr__(self):
         return f"<{self.chat_id} will execute {self.flood_type} for flood>"
 
+class FloodTimer(BASE):
+    __tablename__ = "antiflood_timer"
+    chat_id = Column(String(14), primary_key=True)
+    count = Column(Integer, default=0)
+    seconds = Column(Integer, default=0)
+
+    def __init__(self, chat_id, count=0, seconds=0):
+        self.chat_id = str(chat_id)
+        self.count = count
+        self.seconds = seconds
+
+    def __repr__(self):
+        return f"<timed flood control for {self.chat_id}: {self.count} in {self.seconds}s>"
+
 # Async locks
 INSERTION_FLOOD_LOCK = asyncio.Lock()
 INSERTION_FLOOD_SETTINGS_LOCK = asyncio.Lock()
 
 # In-memory cache
 CHAT_FLOOD: Dict[str, Tuple[Optional[int], int, int]] = {}
+# chat_id -> (flood_type, value), mirrors FloodSettings
+CHAT_FLOOD_SETTINGS: Dict[str, Tuple[int, str]] = {}
+# chat_id -> (messages, seconds), mirrors FloodTimer
+CHAT_FLOOD_TIMER: Dict[str, Tuple[int, int]] = {}
+# (chat_id, user_id) -> timestamps of the user's latest messages (at most `messages` of them)
+FLOOD_WINDOWS: Dict[Tuple[str, int], Deque[float]] = {}
+
+# Windows untouched for longer than this are dropped by the idle sweep
+WINDOW_IDLE_SECONDS = 600
+SWEEP_INTERVAL = 60
+_last_sweep = 0.0
+
+def _flood_active(chat_id: Union[int, str]) -> bool:
+    return bool(CHAT_FLOOD.get(str(chat_id), DEF_OBJ)[2]) or str(chat_id) in CHAT_FLOOD_TIMER
+
+def _sync_feature(chat_id: Union[int, str]) -> None:
+    set_feature(chat_id, Feature.FLOOD, _flood_active(chat_id))
 
 async def create_tables():
     """Initialize database tables using engine connection"""
@@ -66,6 +102,8 @@ async def set_flood(chat_id: Union[int, str], amount: int) -> None:
                 flood.limit = amount
                 CHAT_FLOOD[str(chat_id)] = (None, DEF_COUNT, amount)
                 session.add(flood)
+    invalidate_chat_config(chat_id)
+    _sync_feature(chat_id)
 
 async def update_flood(chat_id: Union[int, str], user_id: int) -> bool:
     if str(chat_id) not in CHAT_FLOOD:
@@ -89,6 +127,67 @@ async def update_flood(chat_id: Union[int, str], user_id: int) -> bool:
     CHAT_FLOOD[str(chat_id)] = (user_id, count, limit)
     return False
 
+def _sweep_idle_windows(now: float) -> None:
+    global _last_sweep
+    _last_sweep = now
+    stale = [key for key, window in FLOOD_WINDOWS.items() if now - window[-1] > WINDOW_IDLE_SECONDS]
+    for key in stale:
+        del FLOOD_WINDOWS[key]
+
+def update_flood_window(chat_id: Union[int, str], user_id: int) -> bool:
+    """Record a message in the sliding window; True if the user sent more than
+    the allowed messages within the configured seconds (no database access)"""
+    timer = CHAT_FLOOD_TIMER.get(str(chat_id))
+    if not timer or user_id is None:
+        return False
+    count, seconds = timer
+
+    now = time.monotonic()
+    if now - _last_sweep > SWEEP_INTERVAL:
+        _sweep_idle_windows(now)
+
+    key = (str(chat_id), user_id)
+    window = FLOOD_WINDOWS.get(key)
+    if window is None or window.maxlen != count:
+        window = FLOOD_WINDOWS[key] = deque(window or (), maxlen=count)
+    window.append(now)
+    if len(window) == count and now - window[0] <= seconds:
+        del FLOOD_WINDOWS[key]
+        return True
+    return False
+
+def reset_flood_window(chat_id: Union[int, str], user_id: int) -> None:
+    FLOOD_WINDOWS.pop((str(chat_id), user_id), None)
+
+async def set_flood_timer(chat_id: Union[int, str], count: int, seconds: int) -> None:
+    """Set timed antiflood to `count` messages in `seconds`; 0 disables it"""
+    async with INSERTION_FLOOD_LOCK:
+        async with async_session() as session:
+            async with session.begin():
+                result = await session.execute(
+                    select(FloodTimer)
+                    .where(FloodTimer.chat_id == str(chat_id))
+                )
+                timer = result.scalars().first()
+
+                if not timer:
+                    timer = FloodTimer(str(chat_id))
+
+                timer.count = count
+                timer.seconds = seconds
+                session.add(timer)
+
+                if count and seconds:
+                    CHAT_FLOOD_TIMER[str(chat_id)] = (count, seconds)
+                else:
+                    CHAT_FLOOD_TIMER.pop(str(chat_id), None)
+                for key in [k for k in FLOOD_WINDOWS if k[0] == str(chat_id)]:
+                    del FLOOD_WINDOWS[key]
+    _sync_feature(chat_id)
+
+def get_flood_timer(chat_id: Union[int, str]) -> Tuple[int, int]:
+    return CHAT_FLOOD_TIMER.get(str(chat_id), (0, 0))
+
 async def get_flood_limit(chat_id: Union[int, str]) -> int:
     return CHAT_FLOOD.get(str(chat_id), DEF_OBJ)[2]
 
@@ -118,17 +217,12 @@ async def set_flood_strength(chat_id: Union[int, str], flood_type: int, value: s
                 curr_setting.flood_type = int(flood_type)
                 curr_setting.value = str(value)
                 session.add(curr_setting)
+                CHAT_FLOOD_SETTINGS[str(chat_id)] = (int(flood_type), str(value))
+    invalidate_chat_config(chat_id)
 
-async def get_flood_setting(chat_id: Union[int, str]) -> Tuple[int, str]:
-    async with async_session() as session:
-        result = await session.execute(
-            select(FloodSettings)
-            .where(FloodSettings.chat_id == str(chat_id))
-        )
-        setting = result.scalars().first()
-        if setting:
-            return setting.flood_type, setting.value
-        return 1, "0"
+def get_flood_setting(chat_id: Union[int, str]) -> Tuple[int, str]:
+    """Get (flood_type, value) for a chat (uses cache)"""
+    return CHAT_FLOOD_SETTINGS.get(str(chat_id), DEF_SETTING)
 
 async def migrate_chat(old_chat_id: Union[int, str], new_chat_id: Union[int, str]) -> None:
     async with INSERTION_FLOOD_LOCK:
@@ -156,10 +250,31 @@ async def migrate_chat(old_chat_id: Union[int, str], new_chat_id: Union[int, str
                 if setting:
                     setting.chat_id = str(new_chat_id)
                     session.add(setting)
+                if str(old_chat_id) in CHAT_FLOOD_SETTINGS:
+                    CHAT_FLOOD_SETTINGS[str(new_chat_id)] = CHAT_FLOOD_SETTINGS.pop(str(old_chat_id))
+
+                # Migrate FloodTimer
+                result = await session.execute(
+                    select(FloodTimer)
+                    .where(FloodTimer.chat_id == str(old_chat_id))
+                )
+                timer = result.scalars().first()
+
+                if timer:
+                    timer.chat_id = str(new_chat_id)
+                    session.add(timer)
+                if str(old_chat_id) in CHAT_FLOOD_TIMER:
+                    CHAT_FLOOD_TIMER[str(new_chat_id)] = CHAT_FLOOD_TIMER.pop(str(old_chat_id))
+                for key in [k for k in FLOOD_WINDOWS if k[0] == str(old_chat_id)]:
+                    del FLOOD_WINDOWS[key]
+    # The old chat's snapshot is handed over by migrate_chat_config once every module has moved
+    invalidate_chat_config(new_chat_id)
+    _sync_feature(old_chat_id)
+    _sync_feature(new_chat_id)
 
 
 async def __load_flood_settings() -> None:
-    global CHAT_FLOOD
+    global CHAT_FLOOD, CHAT_FLOOD_SETTINGS, CHAT_FLOOD_TIMER
     async with async_session() as session:
         result = await session.execute(select(FloodControl))
         CHAT_FLOOD = {
@@ -167,6 +282,20 @@ async def __load_flood_settings() -> None:
             for chat in result.scalars()
         }
 
+        result = await session.execute(select(FloodSettings))
+        CHAT_FLOOD_SETTINGS = {
+            setting.chat_id: (setting.flood_type, setting.value)
+            for setting in result.scalars()
+        }
+
+        result = await session.execute(select(FloodTimer))
+        CHAT_FLOOD_TIMER = {
+            timer.chat_id: (timer.count, timer.seconds)
+            for timer in result.scalars()
+            if timer.count and timer.seconds
+        }
+    load_feature(Feature.FLOOD, [chat_id for chat_id in set(CHAT_FLOOD) | set(CHAT_FLOOD_TIMER) if _flood_active(chat_id)])
+
 # Improved initialization with state tracking
 _initialized = False
 _init_lock = asyncio.Lock()
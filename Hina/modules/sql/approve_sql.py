@@ -1,10 +1,11 @@
 import asyncio
-from typing import List, Optional, Union
+from typing import Dict, Iterable, List, Optional, Set, Union
 
 from .db_connection import BASE, async_session, async_engine  # Add async_engine import
 from sqlalchemy import Column, String, Integer
 from sqlalchemy.future import select
 from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 
 class Approvals(BASE):
@@ -29,6 +30,11 @@ async def create_tables():
 # Async lock replaces threading.Lock
 APPROVE_INSERTION_LOCK = asyncio.Lock()
 
+# In-memory index: chat_id -> approved user ids, mirrors the approval table
+APPROVED_USERS: Dict[str, Set[int]] = {}
+# Rows per INSERT in approve_many, well under asyncpg's 32767 bind parameters
+INSERT_BATCH_SIZE = 1000
+
 async def approve(chat_id: Union[int, str], user_id: int) -> None:
     async with APPROVE_INSERTION_LOCK:
         async with async_session() as session:
@@ -42,16 +48,34 @@ async def approve(chat_id: Union[int, str], user_id: int) -> None:
                 if not result.scalars().first():
                     approve_user = Approvals(str(chat_id), user_id)
                     session.add(approve_user)
+        APPROVED_USERS.setdefault(str(chat_id), set()).add(int(user_id))
 
 
-async def is_approved(chat_id: Union[int, str], user_id: int) -> bool:
-    async with async_session() as session:
-        result = await session.execute(
-            select(Approvals)
-            .where(Approvals.chat_id == str(chat_id))
-            .where(Approvals.user_id == user_id)
-        )
-        return bool(result.scalars().first())
+async def approve_many(chat_id: Union[int, str], user_ids: Iterable[int]) -> int:
+    """Approve several users in one transaction; returns how many were newly approved"""
+    user_ids = {int(user_id) for user_id in user_ids}
+    if not user_ids:
+        return 0
+    rows = [{"chat_id": str(chat_id), "user_id": user_id} for user_id in user_ids]
+    added = 0
+    async with APPROVE_INSERTION_LOCK:
+        async with async_session() as session:
+            async with session.begin():
+                for i in range(0, len(rows), INSERT_BATCH_SIZE):
+                    result = await session.execute(
+                        pg_insert(Approvals)
+                        .values(rows[i:i + INSERT_BATCH_SIZE])
+                        .on_conflict_do_nothing(index_elements=["chat_id", "user_id"])
+                    )
+                    added += result.rowcount
+        APPROVED_USERS.setdefault(str(chat_id), set()).update(user_ids)
+        return added
+
+
+def is_approved(chat_id: Union[int, str], user_id: int) -> bool:
+    """Check approval against the in-memory index"""
+    approved = APPROVED_USERS.get(str(chat_id))
+    return bool(approved) and int(user_id) in approved
 
 
 async def disapprove(chat_id: Union[int, str], user_id: int) -> bool:
@@ -64,10 +88,27 @@ async def disapprove(chat_id: Union[int, str], user_id: int) -> bool:
                     .where(Approvals.user_id == user_id)
                 )
                 disapprove_user = result.scalars().first()
-                if disapprove_user:
-                    await session.delete(disapprove_user)
-                    return True
-                return False
+                if not disapprove_user:
+                    return False
+                await session.delete(disapprove_user)
+        approved = APPROVED_USERS.get(str(chat_id))
+        if approved is not None:
+            approved.discard(int(user_id))
+            if not approved:
+                del APPROVED_USERS[str(chat_id)]
+        return True
+
+
+async def disapprove_all(chat_id: Union[int, str]) -> int:
+    """Remove every approval in a chat; returns how many were removed"""
+    async with APPROVE_INSERTION_LOCK:
+        async with async_session() as session:
+            async with session.begin():
+                result = await session.execute(
+                    delete(Approvals).where(Approvals.chat_id == str(chat_id))
+                )
+        APPROVED_USERS.pop(str(chat_id), None)
+        return result.rowcount
 
 
 async def list_approved(chat_id: Union[int, str]) -> List[Approvals]:
@@ -91,8 +132,22 @@ async def migrate_chat(old_chat_id: Union[int, str], new_chat_id: Union[int, str
                 for approval in result.scalars():
                     approval.chat_id = str(new_chat_id)
                     session.add(approval)
+        if str(old_chat_id) in APPROVED_USERS:
+            APPROVED_USERS.setdefault(str(new_chat_id), set()).update(
+                APPROVED_USERS.pop(str(old_chat_id))
+            )
 
 
+async def __load_approvals() -> None:
+    """Load the approval index on startup"""
+    global APPROVED_USERS
+    async with async_session() as session:
+        result = await session.execute(select(Approvals.chat_id, Approvals.user_id))
+        approvals: Dict[str, Set[int]] = {}
+        for chat_id, user_id in result.all():
+            approvals.setdefault(chat_id, set()).add(user_id)
+        APPROVED_USERS = approvals
+
 
 # Improved initialization with state tracking
 _initialized = False
@@ -105,6 +160,7 @@ async def initialize():
         if not _initialized:
             try:
                 await create_tables()
+                await __load_approvals()
                 _initialized = True
             except Exception as e:
                 print(f"Approval system initialization failed: {e}")
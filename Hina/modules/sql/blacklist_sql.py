@@ -1,5 +1,6 @@
 import asyncio
-from typing import Dict, Set, Tuple, Optional
+import re
+from typing import Dict, List, Pattern, Set, Tuple, Optional
 from datetime import datetime
 
 from sqlalchemy import func, distinct, Column, String, UnicodeText, Integer
@@ -8,6 +9,8 @@ from sqlalchemy.exc import SQLAlchemyError
 from contextlib import asynccontextmanager
 
 # Import from db_connection instead of recreating
+from .chat_config_sql import bump_config_version
+from .chat_features_sql import Feature, load_feature, set_feature
 from .db_connection import BASE, async_session, async_engine  # Add async_engine import
 
 class BlackListFilters(BASE):
@@ -47,6 +50,9 @@ class BlacklistSettings(BASE):
 # In-memory caches
 CHAT_BLACKLISTS: Dict[str, Set[str]] = {}
 CHAT_SETTINGS_BLACKLISTS: Dict[str, Dict[str, object]] = {}
+# Compiled per-chat matchers, built lazily from CHAT_BLACKLISTS.
+# A missing key means "not built yet", a None value means "nothing to match".
+CHAT_BLACKLIST_MATCHERS: Dict[str, Optional[Pattern]] = {}
 
 # Async locks
 BLACKLIST_FILTER_INSERTION_LOCK = asyncio.Lock()
@@ -70,6 +76,79 @@ async def create_tables():
     async with async_engine.begin() as conn:
         await conn.run_sync(BASE.metadata.create_all)
 
+def _build_matcher(triggers: Set[str]) -> Optional[Pattern]:
+    """Compile all triggers of a chat into a single alternation.
+
+    The lookarounds give the same word-boundary semantics as the old per-trigger
+    ``( |^|[^\\w])trigger( |$|[^\\w])`` search. Longer triggers come first so
+    the longest trigger wins when several start at the same position.
+    """
+    if not triggers:
+        return None
+    alternation = "|".join(
+        re.escape(trigger) for trigger in sorted(triggers, key=len, reverse=True)
+    )
+    return re.compile(r"(?<!\w)(" + alternation + r")(?!\w)", flags=re.IGNORECASE)
+
+
+def _sync_feature(chat_id: str) -> None:
+    set_feature(chat_id, Feature.BLACKLIST, bool(CHAT_BLACKLISTS.get(str(chat_id))))
+
+
+def _invalidate_matcher(chat_id: str) -> None:
+    """Drop the compiled matcher of a chat so it is rebuilt on next use"""
+    CHAT_BLACKLIST_MATCHERS.pop(str(chat_id), None)
+    bump_config_version(chat_id)
+
+
+def get_blacklist_matcher(chat_id: str) -> Optional[Pattern]:
+    """Get the compiled matcher for a chat, building it on first use"""
+    chat_id = str(chat_id)
+    try:
+        return CHAT_BLACKLIST_MATCHERS[chat_id]
+    except KeyError:
+        matcher = _build_matcher(CHAT_BLACKLISTS.get(chat_id, set()))
+        CHAT_BLACKLIST_MATCHERS[chat_id] = matcher
+        return matcher
+
+
+def _resolve_trigger(chat_id: str, matched: str) -> str:
+    """Map matched text back to the stored trigger it came from"""
+    triggers = CHAT_BLACKLISTS.get(chat_id, set())
+    lowered = matched.lower()
+    if lowered in triggers:
+        return lowered
+    for trigger in triggers:
+        if re.fullmatch(re.escape(trigger), matched, flags=re.IGNORECASE):
+            return trigger
+    return matched
+
+
+def find_blacklist_triggers(chat_id: str, text: str) -> List[str]:
+    """Return every trigger of a chat found in text, scanning it only once"""
+    matcher = get_blacklist_matcher(chat_id)
+    if matcher is None or not text:
+        return []
+    chat_id = str(chat_id)
+    found = []
+    for match in matcher.finditer(text):
+        trigger = _resolve_trigger(chat_id, match.group(1))
+        if trigger not in found:
+            found.append(trigger)
+    return found
+
+
+def match_blacklist(chat_id: str, text: str) -> Optional[str]:
+    """Return the first trigger of a chat found in text, or None"""
+    matcher = get_blacklist_matcher(chat_id)
+    if matcher is None or not text:
+        return None
+    match = matcher.search(text)
+    if not match:
+        return None
+    return _resolve_trigger(str(chat_id), match.group(1))
+
+
 async def add_to_blacklist(chat_id: str, trigger: str) -> bool:
     """Add a new trigger to chat's blacklist"""
     async with BLACKLIST_FILTER_INSERTION_LOCK:
@@ -79,9 +158,12 @@ async def add_to_blacklist(chat_id: str, trigger: str) -> bool:
                 session.add(blacklist_filt)
                 
                 # Update cache
+                chat_id = str(chat_id)
                 if chat_id not in CHAT_BLACKLISTS:
                     CHAT_BLACKLISTS[chat_id] = set()
                 CHAT_BLACKLISTS[chat_id].add(trigger)
+                _invalidate_matcher(chat_id)
+                _sync_feature(chat_id)
                 return True
         except Exception as e:
             print(f"Error adding to blacklist: {e}")
@@ -102,8 +184,11 @@ async def rm_from_blacklist(chat_id: str, trigger: str) -> bool:
                 if blacklist_filt:
                     await session.delete(blacklist_filt)
                     # Update cache
+                    chat_id = str(chat_id)
                     if chat_id in CHAT_BLACKLISTS and trigger in CHAT_BLACKLISTS[chat_id]:
                         CHAT_BLACKLISTS[chat_id].remove(trigger)
+                    _invalidate_matcher(chat_id)
+                    _sync_feature(chat_id)
                     return True
                 return False
         except Exception as e:
@@ -217,9 +302,18 @@ async def migrate_chat(old_chat_id: str, new_chat_id: str) -> bool:
                 # Update caches
                 if str(old_chat_id) in CHAT_BLACKLISTS:
                     CHAT_BLACKLISTS[str(new_chat_id)] = CHAT_BLACKLISTS.pop(str(old_chat_id))
+                # The compiled pattern does not depend on the chat id, so move it as is
+                if str(old_chat_id) in CHAT_BLACKLIST_MATCHERS:
+                    CHAT_BLACKLIST_MATCHERS[str(new_chat_id)] = CHAT_BLACKLIST_MATCHERS.pop(str(old_chat_id))
+                else:
+                    _invalidate_matcher(new_chat_id)
+                bump_config_version(old_chat_id)
+                bump_config_version(new_chat_id)
                 
                 if str(old_chat_id) in CHAT_SETTINGS_BLACKLISTS:
                     CHAT_SETTINGS_BLACKLISTS[str(new_chat_id)] = CHAT_SETTINGS_BLACKLISTS.pop(str(old_chat_id))
+                _sync_feature(old_chat_id)
+                _sync_feature(new_chat_id)
                 
                 return True
         except Exception as e:
@@ -248,6 +342,8 @@ async def __load_chat_blacklists():
             result = await session.execute(select(BlackListFilters))
             for filt in result.scalars().all():
                 CHAT_BLACKLISTS[filt.chat_id].add(filt.trigger)
+            CHAT_BLACKLIST_MATCHERS.clear()
+            load_feature(Feature.BLACKLIST, CHAT_BLACKLISTS)
     except Exception as e:
         print(f"Error loading chat blacklists: {e}")
 
@@ -2,6 +2,7 @@ import asyncio
 import time
 from typing import Dict, Set, List, Tuple, Union
 
+from .chat_config_sql import bump_config_version
 from .db_connection import BASE, async_session, async_engine
 from sqlalchemy import Column, Integer, String, UnicodeText, distinct, func
 from sqlalchemy.future import select
@@ -79,6 +80,7 @@ async def add_to_stickers(chat_id: Union[int, str], trigger: str) -> None:
                 if str(chat_id) not in CHAT_STICKERS:
                     CHAT_STICKERS[str(chat_id)] = set()
                 CHAT_STICKERS[str(chat_id)].add(trigger)
+                bump_config_version(chat_id)
 
 
 async def rm_from_stickers(chat_id: Union[int, str], trigger: str) -> bool:
@@ -96,6 +98,7 @@ async def rm_from_stickers(chat_id: Union[int, str], trigger: str) -> bool:
                 # Update cache
                 if str(chat_id) in CHAT_STICKERS and trigger in CHAT_STICKERS[str(chat_id)]:
                     CHAT_STICKERS[str(chat_id)].remove(trigger)
+                bump_config_version(chat_id)
                 
                 return result.rowcount > 0
 
@@ -230,6 +233,8 @@ async def migrate_chat(old_chat_id: Union[int, str], new_chat_id: Union[int, str
                     CHAT_STICKERS[str(new_chat_id)] = CHAT_STICKERS.pop(str(old_chat_id))
                 if str(old_chat_id) in CHAT_BLSTICK_BLACKLISTS:
                     CHAT_BLSTICK_BLACKLISTS[str(new_chat_id)] = CHAT_BLSTICK_BLACKLISTS.pop(str(old_chat_id))
+                bump_config_version(old_chat_id)
+                bump_config_version(new_chat_id)
 
 
 # Improved initialization with state tracking
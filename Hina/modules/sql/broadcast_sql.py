@@ -0,0 +1,129 @@
+import asyncio
+import time
+from typing import List, Optional
+
+from .db_connection import BASE, async_session, async_engine
+from sqlalchemy import BigInteger, Boolean, Column, Integer, String, UnicodeText, update
+from sqlalchemy.future import select
+
+# Job states; only running jobs are picked up again after a restart
+RUNNING = "running"
+DONE = "done"
+CANCELLED = "cancelled"
+
+# Phases, in the order a job goes through them
+PHASE_GROUPS = "groups"
+PHASE_USERS = "users"
+
+
+class BroadcastJobs(BASE):
+    __tablename__ = "broadcast_jobs"
+    job_id = Column(Integer, primary_key=True, autoincrement=True)
+    text = Column(UnicodeText, nullable=False)
+    to_groups = Column(Boolean, nullable=False, default=True)
+    to_users = Column(Boolean, nullable=False, default=True)
+    # Where progress and the final report go
+    owner_id = Column(BigInteger, nullable=False)
+    report_chat = Column(String(14), nullable=False)
+    status = Column(String(10), nullable=False, default=RUNNING)
+    # Checkpoint: everything up to `cursor` in `phase` has been sent
+    phase = Column(String(10), nullable=False, default=PHASE_GROUPS)
+    cursor = Column(String(20))
+    delivered = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    blocked = Column(Integer, nullable=False, default=0)
+    created_at = Column(Integer, nullable=False)
+    finished_at = Column(Integer)
+
+    def __init__(self, text, to_groups, to_users, owner_id, report_chat):
+        self.text = text
+        self.to_groups = to_groups
+        self.to_users = to_users
+        self.owner_id = owner_id
+        self.report_chat = str(report_chat)
+        self.status = RUNNING
+        self.phase = PHASE_GROUPS if to_groups else PHASE_USERS
+        self.cursor = None
+        self.delivered = 0
+        self.failed = 0
+        self.blocked = 0
+        self.created_at = int(time.time())
+
+    def __repr__(self):
+        return f"<Broadcast {self.job_id} ({self.status}, {self.phase} > {self.cursor})>"
+
+
+async def create_tables():
+    """Initialize database tables"""
+    async with async_engine.begin() as conn:
+        await conn.run_sync(BASE.metadata.create_all)
+
+
+async def create_job(text: str, to_groups: bool, to_users: bool, owner_id: int, report_chat) -> BroadcastJobs:
+    async with async_session() as session:
+        async with session.begin():
+            job = BroadcastJobs(text, to_groups, to_users, owner_id, report_chat)
+            session.add(job)
+        return job
+
+
+async def get_job(job_id: int) -> Optional[BroadcastJobs]:
+    async with async_session() as session:
+        result = await session.execute(
+            select(BroadcastJobs).where(BroadcastJobs.job_id == int(job_id))
+        )
+        return result.scalars().first()
+
+
+async def get_running_jobs() -> List[BroadcastJobs]:
+    async with async_session() as session:
+        result = await session.execute(
+            select(BroadcastJobs)
+            .where(BroadcastJobs.status == RUNNING)
+            .order_by(BroadcastJobs.job_id)
+        )
+        return result.scalars().all()
+
+
+async def get_recent_jobs(limit: int = 5) -> List[BroadcastJobs]:
+    async with async_session() as session:
+        result = await session.execute(
+            select(BroadcastJobs).order_by(BroadcastJobs.job_id.desc()).limit(limit)
+        )
+        return result.scalars().all()
+
+
+async def save_checkpoint(
+    job_id: int, phase: str, cursor: Optional[str], delivered: int, failed: int, blocked: int,
+) -> None:
+    """Record progress; the counters are totals, not increments."""
+    async with async_session() as session:
+        async with session.begin():
+            await session.execute(
+                update(BroadcastJobs)
+                .where(BroadcastJobs.job_id == int(job_id))
+                .values(phase=phase, cursor=cursor, delivered=delivered, failed=failed, blocked=blocked)
+            )
+
+
+async def finish_job(job_id: int, status: str) -> None:
+    async with async_session() as session:
+        async with session.begin():
+            await session.execute(
+                update(BroadcastJobs)
+                .where(BroadcastJobs.job_id == int(job_id))
+                .values(status=status, finished_at=int(time.time()))
+            )
+
+
+_initialized = False
+_init_lock = asyncio.Lock()
+
+
+async def initialize():
+    """Create the jobs table (call this from main application)"""
+    global _initialized
+    async with _init_lock:
+        if not _initialized:
+            await create_tables()
+            _initialized = True
@@ -0,0 +1,209 @@
+import asyncio
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Optional, Union
+
+from .db_connection import async_session
+from sqlalchemy import literal
+from sqlalchemy.future import select
+
+# Upper bound on cached snapshots; least recently used chats are evicted first
+CHAT_CONFIG_CACHE_SIZE = 5000
+
+LOCK_COLUMNS = (
+    "audio", "voice", "contact", "video", "document", "photo", "sticker", "gif",
+    "url", "bots", "forward", "game", "location", "rtl", "button", "egame", "inline",
+)
+RESTRICTION_COLUMNS = ("messages", "media", "other", "preview")
+
+
+class ChatConfig:
+    """Read-only snapshot of a chat's settings, loaded from every module in one query."""
+
+    __slots__ = (
+        "chat_id",
+        "version",
+        "should_welcome",
+        "custom_welcome",
+        "custom_content",
+        "welcome_type",
+        "should_goodbye",
+        "custom_leave",
+        "leave_type",
+        "clean_welcome",
+        "welcome_mutes",
+        "clean_service",
+        "should_report",
+        "warn_limit",
+        "soft_warn",
+        "locks",
+        "restrictions",
+        "flood_limit",
+        "flood_type",
+        "flood_value",
+    )
+
+    def __init__(self, chat_id: str, version: int, row) -> None:
+        from Hina.modules.helper_funcs.msg_types import Types
+        from .welcome_sql import DEFAULT_GOODBYE, DEFAULT_WELCOME
+
+        self.chat_id = chat_id
+        self.version = version
+
+        has_welcome = row.welcome_chat is not None
+        self.should_welcome = row.should_welcome if has_welcome else True
+        self.custom_welcome = row.custom_welcome if has_welcome else DEFAULT_WELCOME
+        self.custom_content = row.custom_content if has_welcome else None
+        self.welcome_type = row.welcome_type if has_welcome else Types.TEXT.value
+        self.should_goodbye = row.should_goodbye if has_welcome else True
+        self.custom_leave = row.custom_leave if has_welcome else DEFAULT_GOODBYE
+        self.leave_type = row.leave_type if has_welcome else Types.TEXT.value
+        self.clean_welcome = row.clean_welcome if has_welcome else False
+        self.welcome_mutes = row.welcomemutes or False
+        self.clean_service = bool(row.clean_service)
+
+        self.should_report = bool(row.should_report)
+
+        self.warn_limit = row.warn_limit if row.warn_limit is not None else 3
+        self.soft_warn = bool(row.soft_warn)
+
+        self.locks: FrozenSet[str] = frozenset(
+            name for name in LOCK_COLUMNS if getattr(row, f"lock_{name}")
+        )
+        self.restrictions: FrozenSet[str] = frozenset(
+            name for name in RESTRICTION_COLUMNS if getattr(row, f"restr_{name}")
+        )
+
+        self.flood_limit = row.flood_limit or 0
+        self.flood_type = row.flood_type if row.flood_type is not None else 1
+        self.flood_value = row.flood_value if row.flood_value is not None else "0"
+
+    def __repr__(self):
+        return f"<ChatConfig {self.chat_id} v{self.version}>"
+
+
+# chat_id -> snapshot, in least-recently-used order
+CHAT_CONFIGS: "OrderedDict[str, ChatConfig]" = OrderedDict()
+# chat_id -> bumped on every invalidation, so in-flight loads can tell they went stale
+CHAT_CONFIG_VERSION: Dict[str, int] = {}
+_CONFIG_LOADS: Dict[str, asyncio.Task] = {}
+
+
+def get_config_version(chat_id: Union[int, str]) -> int:
+    return CHAT_CONFIG_VERSION.get(str(chat_id), 0)
+
+
+def bump_config_version(chat_id: Union[int, str]) -> None:
+    """Mark a chat's settings as changed, e.g. its triggers, without dropping its snapshot.
+
+    Anything keyed by the version, like cached filter verdicts, goes stale with it.
+    """
+    chat_id = str(chat_id)
+    CHAT_CONFIG_VERSION[chat_id] = CHAT_CONFIG_VERSION.get(chat_id, 0) + 1
+
+
+def invalidate_chat_config(chat_id: Union[int, str]) -> None:
+    """Drop the cached snapshot of a chat; call after any write to its settings."""
+    bump_config_version(chat_id)
+    CHAT_CONFIGS.pop(str(chat_id), None)
+
+
+def migrate_chat_config(old_chat_id: Union[int, str], new_chat_id: Union[int, str]) -> None:
+    """Forget a chat that was migrated and hand its snapshot to the chat it became.
+
+    Call after every module has moved its settings; the old chat receives no more updates.
+    """
+    old_chat_id, new_chat_id = str(old_chat_id), str(new_chat_id)
+    CHAT_CONFIG_VERSION.pop(old_chat_id, None)
+    bump_config_version(new_chat_id)
+    config = CHAT_CONFIGS.pop(old_chat_id, None)
+    if config is None:
+        CHAT_CONFIGS.pop(new_chat_id, None)
+        return
+    config.chat_id = new_chat_id
+    config.version = get_config_version(new_chat_id)
+    CHAT_CONFIGS[new_chat_id] = config
+
+
+def _build_query(chat_id: str):
+    from .antiflood_sql import FloodControl, FloodSettings
+    from .locks_sql import Permissions, Restrictions
+    from .reporting_sql import ReportingChatSettings
+    from .warns_sql import WarnSettings
+    from .welcome_sql import CleanServiceSetting, Welcome, WelcomeMute
+
+    anchor = select(literal(chat_id).label("chat_id")).subquery()
+    columns = [
+        Welcome.chat_id.label("welcome_chat"),
+        Welcome.should_welcome,
+        Welcome.custom_welcome,
+        Welcome.custom_content,
+        Welcome.welcome_type,
+        Welcome.should_goodbye,
+        Welcome.custom_leave,
+        Welcome.leave_type,
+        Welcome.clean_welcome,
+        WelcomeMute.welcomemutes,
+        CleanServiceSetting.clean_service,
+        ReportingChatSettings.should_report,
+        WarnSettings.warn_limit,
+        WarnSettings.soft_warn,
+        FloodControl.limit.label("flood_limit"),
+        FloodSettings.flood_type,
+        FloodSettings.value.label("flood_value"),
+    ]
+    columns += [getattr(Permissions, name).label(f"lock_{name}") for name in LOCK_COLUMNS]
+    columns += [
+        getattr(Restrictions, name).label(f"restr_{name}") for name in RESTRICTION_COLUMNS
+    ]
+
+    query = select(*columns).select_from(anchor)
+    for model in (
+        Welcome,
+        WelcomeMute,
+        CleanServiceSetting,
+        ReportingChatSettings,
+        WarnSettings,
+        Permissions,
+        Restrictions,
+        FloodControl,
+        FloodSettings,
+    ):
+        query = query.outerjoin(model, model.chat_id == anchor.c.chat_id)
+    return query
+
+
+async def _load_chat_config(chat_id: str) -> ChatConfig:
+    version = get_config_version(chat_id)
+    async with async_session() as session:
+        result = await session.execute(_build_query(chat_id))
+        row = result.one()
+
+    config = ChatConfig(chat_id, version, row)
+    # A setter ran while we were reading; serve this result once but don't keep it
+    if get_config_version(chat_id) == version:
+        CHAT_CONFIGS[chat_id] = config
+        CHAT_CONFIGS.move_to_end(chat_id)
+        while len(CHAT_CONFIGS) > CHAT_CONFIG_CACHE_SIZE:
+            CHAT_CONFIGS.popitem(last=False)
+    return config
+
+
+async def get_chat_config(chat_id: Union[int, str]) -> ChatConfig:
+    """Return the settings snapshot of a chat, loading it on first touch."""
+    chat_id = str(chat_id)
+    config = CHAT_CONFIGS.get(chat_id)
+    if config is not None:
+        CHAT_CONFIGS.move_to_end(chat_id)
+        return config
+
+    task = _CONFIG_LOADS.get(chat_id)
+    if task is None:
+        task = asyncio.ensure_future(_load_chat_config(chat_id))
+        _CONFIG_LOADS[chat_id] = task
+        task.add_done_callback(lambda _: _CONFIG_LOADS.pop(chat_id, None))
+    return await asyncio.shield(task)
+
+
+def peek_chat_config(chat_id: Union[int, str]) -> Optional[ChatConfig]:
+    """Return the cached snapshot of a chat without loading it."""
+    return CHAT_CONFIGS.get(str(chat_id))
@@ -0,0 +1,43 @@
+from enum import IntFlag
+from typing import Dict, Iterable, Union
+
+
+class Feature(IntFlag):
+    """Opt-in per-chat features whose message handlers can be skipped when unused"""
+
+    BLACKLIST = 1
+    FILTERS = 2
+    WARN_FILTERS = 4
+    LOCKS = 8
+    FLOOD = 16
+    CLEAN_BLUE_TEXT = 32
+
+
+# chat_id -> bitmap of active features; chats with nothing active are not stored
+CHAT_FEATURES: Dict[str, int] = {}
+
+
+def has_feature(chat_id: Union[int, str], feature: Feature) -> bool:
+    return bool(CHAT_FEATURES.get(str(chat_id), 0) & feature)
+
+
+def get_features(chat_id: Union[int, str]) -> Feature:
+    return Feature(CHAT_FEATURES.get(str(chat_id), 0))
+
+
+def set_feature(chat_id: Union[int, str], feature: Feature, active: bool) -> None:
+    chat_id = str(chat_id)
+    bits = CHAT_FEATURES.get(chat_id, 0)
+    bits = bits | feature if active else bits & ~feature
+    if bits:
+        CHAT_FEATURES[chat_id] = bits
+    else:
+        CHAT_FEATURES.pop(chat_id, None)
+
+
+def load_feature(feature: Feature, active_chats: Iterable[Union[int, str]]) -> None:
+    """Replace the bit of one feature for every chat, used by the module loaders"""
+    for chat_id in list(CHAT_FEATURES):
+        set_feature(chat_id, feature, False)
+    for chat_id in active_chats:
+        set_feature(chat_id, feature, True)
@@ -6,6 +6,7 @@ from sqlalchemy import Boolean, Column, Integer, UnicodeText
 from sqlalchemy.future import select
 from sqlalchemy import update, delete
 
+from .chat_features_sql import Feature, load_feature, set_feature
 from .db_connection import BASE, async_session, async_engine
 
 class CleanerBlueTextChatSettings(BASE):
@@ -84,6 +85,7 @@ async def set_cleanbt(chat_id: Union[int, str], is_enable: bool) -> None:
                 if str(chat_id) not in CLEANER_CHATS:
                     CLEANER_CHATS[str(chat_id)] = {"setting": is_enable, "commands": set()}
                 CLEANER_CHATS[str(chat_id)]["setting"] = is_enable
+                set_feature(chat_id, Feature.CLEAN_BLUE_TEXT, is_enable)
 
 async def chat_ignore_command(chat_id: Union[int, str], command: str) -> bool:
     """Add command to chat's ignore list"""
@@ -216,6 +218,10 @@ async def __load_cleaner_data() -> None:
                     "commands": set()
                 }
             CLEANER_CHATS[ignore.chat_id]["commands"].add(ignore.command)
+    load_feature(
+        Feature.CLEAN_BLUE_TEXT,
+        [chat_id for chat_id, chat in CLEANER_CHATS.items() if chat["setting"]],
+    )
 
 async def migrate_chat(old_chat_id: Union[int, str], new_chat_id: Union[int, str]) -> None:
     """Migrate settings to new chat ID"""
@@ -240,6 +246,8 @@ async def migrate_chat(old_chat_id: Union[int, str], new_chat_id: Union[int, str
     # Update cache
     if str(old_chat_id) in CLEANER_CHATS:
         CLEANER_CHATS[str(new_chat_id)] = CLEANER_CHATS.pop(str(old_chat_id))
+        set_feature(old_chat_id, Feature.CLEAN_BLUE_TEXT, False)
+        set_feature(new_chat_id, Feature.CLEAN_BLUE_TEXT, CLEANER_CHATS[str(new_chat_id)]["setting"])
 
 # Improved initialization with state tracking
 _initialized = False
@@ -1,11 +1,17 @@
 import asyncio
+from types import SimpleNamespace
 from typing import Dict, List, Optional, Set, Tuple
 
+from telegram import Bot, InlineKeyboardMarkup
 from sqlalchemy import Column, String, UnicodeText, Boolean, Integer, distinct, func
 from sqlalchemy.future import select
 from sqlalchemy.exc import SQLAlchemyError
 
+from Hina.modules.helper_funcs.misc import build_keyboard_parser
 from Hina.modules.helper_funcs.msg_types import Types
+from Hina.modules.helper_funcs.string_handling import escape_invalid_curly_brackets
+from .chat_config_sql import bump_config_version
+from .chat_features_sql import Feature, load_feature, set_feature
 from .db_connection import BASE, async_session, async_engine  # Add async_engine import
 
 class CustomFilters(BASE):
@@ -121,6 +127,79 @@ BUTTON_LOCK = asyncio.Lock()
 
 # In-memory cache
 CHAT_FILTERS: Dict[str, List[str]] = {}
+# Full filter records per chat: chat_id -> keyword -> record, so that a
+# triggered filter can be answered without touching the database.
+CHAT_FILTER_RECORDS: Dict[str, Dict[str, Dict[str, object]]] = {}
+
+FILTER_FORMATTERS = ["first", "last", "fullname", "username", "id", "chatname", "mention"]
+
+# =============== RECORD CACHE ===============
+def _split_reply_variants(reply_text: Optional[str]) -> Tuple[str, ...]:
+    """Split a reply into its random variants and escape stray curly brackets once"""
+    if not reply_text:
+        return ()
+    variants = reply_text.split("%%%") if "%%%" in reply_text else [reply_text]
+    if not all(variants):
+        variants = [reply_text]
+    return tuple(
+        escape_invalid_curly_brackets(text, FILTER_FORMATTERS) or ""
+        for text in variants
+    )
+
+def _build_record(flt: CustomFilters, buttons: List[Tuple[str, str, bool]]) -> Dict[str, object]:
+    """Build the cached record for a filter row"""
+    return {
+        "keyword": flt.keyword,
+        "reply": flt.reply,
+        "reply_text": flt.reply_text,
+        "reply_variants": _split_reply_variants(flt.reply_text),
+        "file_type": flt.file_type,
+        "file_id": flt.file_id,
+        "is_sticker": flt.is_sticker,
+        "is_document": flt.is_document,
+        "is_image": flt.is_image,
+        "is_audio": flt.is_audio,
+        "is_voice": flt.is_voice,
+        "is_video": flt.is_video,
+        "has_markdown": flt.has_markdown,
+        "has_buttons": flt.has_buttons,
+        "buttons": list(buttons),
+        "keyboard": None,
+    }
+
+def _cache_record(chat_id: str, record: Dict[str, object]) -> None:
+    CHAT_FILTER_RECORDS.setdefault(str(chat_id), {})[record["keyword"]] = record
+    set_feature(chat_id, Feature.FILTERS, True)
+
+def _uncache_record(chat_id: str, keyword: str) -> None:
+    bump_config_version(chat_id)
+    records = CHAT_FILTER_RECORDS.get(str(chat_id))
+    if records is not None:
+        records.pop(keyword, None)
+        if not records:
+            del CHAT_FILTER_RECORDS[str(chat_id)]
+            set_feature(chat_id, Feature.FILTERS, False)
+
+def get_filter_record(chat_id: str, keyword: str) -> Optional[Dict[str, object]]:
+    """Get the cached record of a filter (no database access)"""
+    return CHAT_FILTER_RECORDS.get(str(chat_id), {}).get(keyword)
+
+async def get_filter_keyboard(bot: Bot, chat_id: str, keyword: str) -> Optional[InlineKeyboardMarkup]:
+    """Get the ready-made keyboard of a filter, building it on first use"""
+    record = get_filter_record(chat_id, keyword)
+    if record is None:
+        return None
+    if record["keyboard"] is None:
+        buttons = [
+            SimpleNamespace(name=name, url=url, same_line=same_line)
+            for name, url, same_line in record["buttons"]
+        ]
+        record["keyboard"] = InlineKeyboardMarkup(await build_keyboard_parser(bot, chat_id, buttons))
+    return record["keyboard"]
+
+def get_chat_triggers(chat_id: str) -> List[str]:
+    """Get the keywords of a chat, longest first (uses cache)"""
+    return CHAT_FILTERS.get(str(chat_id), [])
 
 # =============== CORE FILTER FUNCTIONS ===============
 async def get_all_filters() -> List[CustomFilters]:
@@ -194,6 +273,8 @@ async def add_filter(
                 CHAT_FILTERS[str(chat_id)].sort(key=lambda x: (-len(x), x))
 
             session.add(new_filter)
+            _cache_record(chat_id, _build_record(new_filter, []))
+            bump_config_version(chat_id)
 
             # Add buttons if any
             for btn_name, btn_url, same_line in buttons:
@@ -217,6 +298,7 @@ async def remove_filter(chat_id: str, keyword: str) -> bool:
                 # Remove from cache
                 if str(chat_id) in CHAT_FILTERS and keyword in CHAT_FILTERS[str(chat_id)]:
                     CHAT_FILTERS[str(chat_id)].remove(keyword)
+                _uncache_record(chat_id, keyword)
 
                 # Delete associated buttons
                 async with BUTTON_LOCK:
@@ -281,6 +363,12 @@ async def add_note_button_to_db(
             )
             session.add(new_btn)
 
+            record = get_filter_record(chat_id, keyword)
+            if record is not None:
+                record["buttons"].append((btn_name, btn_url, same_line))
+                record["has_buttons"] = True
+                record["keyboard"] = None
+
 async def get_buttons(chat_id: str, keyword: str) -> List[Buttons]:
     """Get all buttons for a filter"""
     try:
@@ -299,7 +387,7 @@ async def get_buttons(chat_id: str, keyword: str) -> List[Buttons]:
 # =============== CACHE MANAGEMENT ===============
 async def __load_chat_filters() -> None:
     """Load all filters into memory cache"""
-    global CHAT_FILTERS
+    global CHAT_FILTERS, CHAT_FILTER_RECORDS
     try:
         async with async_session() as session:
             # Get all distinct chat_ids
@@ -311,17 +399,29 @@ async def __load_chat_filters() -> None:
             # Initialize cache structure
             CHAT_FILTERS = {cid: [] for cid in chat_ids}
             
+            # Load all buttons, grouped per filter
+            result = await session.execute(select(Buttons).order_by(Buttons.id))
+            buttons: Dict[Tuple[str, str], List[Tuple[str, str, bool]]] = {}
+            for btn in result.scalars().all():
+                buttons.setdefault((btn.chat_id, btn.keyword), []).append(
+                    (btn.name, btn.url, btn.same_line)
+                )
+
             # Load all filters
+            CHAT_FILTER_RECORDS = {}
             result = await session.execute(select(CustomFilters))
             for flt in result.scalars().all():
                 CHAT_FILTERS[flt.chat_id].append(flt.keyword)
+                _cache_record(flt.chat_id, _build_record(flt, buttons.get((flt.chat_id, flt.keyword), [])))
             
             # Sort each chat's filters by length (longest first)
             for chat_id in CHAT_FILTERS:
                 CHAT_FILTERS[chat_id].sort(key=lambda x: (-len(x), x))
+            load_feature(Feature.FILTERS, CHAT_FILTER_RECORDS)
     except Exception as e:
         print(f"Error loading chat filters: {e}")
         CHAT_FILTERS = {}
+        CHAT_FILTER_RECORDS = {}
 
 # =============== MIGRATION ===============
 async def migrate_chat(old_chat_id: str, new_chat_id: str) -> None:
@@ -348,6 +448,16 @@ async def migrate_chat(old_chat_id: str, new_chat_id: str) -> None:
             # Update cache
             if str(old_chat_id) in CHAT_FILTERS:
                 CHAT_FILTERS[str(new_chat_id)] = CHAT_FILTERS.pop(str(old_chat_id))
+            if str(old_chat_id) in CHAT_FILTER_RECORDS:
+                records = CHAT_FILTER_RECORDS.pop(str(old_chat_id))
+                # Keyboards may embed the old chat id through {rules} buttons
+                for record in records.values():
+                    record["keyboard"] = None
+                CHAT_FILTER_RECORDS[str(new_chat_id)] = records
+                set_feature(old_chat_id, Feature.FILTERS, False)
+                set_feature(new_chat_id, Feature.FILTERS, True)
+            bump_config_version(old_chat_id)
+            bump_config_version(new_chat_id)
 
 # =============== STATISTICS ===============
 async def num_filters() -> int:
@@ -1,9 +1,11 @@
 # Hina/modules/sql/db_connection.py
 import asyncio
 from contextlib import asynccontextmanager
+from typing import AsyncIterator
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncAttrs
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy import text
+from sqlalchemy.future import select
 from Hina.config import DB_URI
 import logging
 
@@ -69,6 +71,32 @@ async def session_scope():
     finally:
         await session.close()
 
+# Keyset pagination, for callers that walk a whole table a slice at a time.
+# Each page is its own short query ordered by the first column, so nothing holds
+# a connection (or an open transaction) while the caller works through a page.
+ITER_PAGE_SIZE = 1000
+
+async def keyset_page(columns, after=None, limit: int = ITER_PAGE_SIZE, *criteria) -> list:
+    """Rows of columns whose first column sorts after `after`, at most limit of them"""
+    key = columns[0]
+    query = select(*columns).where(*criteria).order_by(key).limit(limit)
+    if after is not None:
+        query = query.where(key > after)
+    async with async_session() as session:
+        result = await session.execute(query)
+        return [tuple(row) for row in result]
+
+async def iter_keyset(columns, page_size: int = ITER_PAGE_SIZE, *criteria) -> AsyncIterator[tuple]:
+    """Yield every row of columns matching criteria, one keyset page per query"""
+    after = None
+    while True:
+        rows = await keyset_page(columns, after, page_size, *criteria)
+        for row in rows:
+            yield row
+        if len(rows) < page_size:
+            return
+        after = rows[-1][0]
+
 async def initialize_db():
     """Initialize tables with proper error handling"""
     try:
@@ -1,13 +1,18 @@
 import ast
 import asyncio
+import logging
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
 
-from .db_connection import BASE, async_session
-from sqlalchemy import Boolean, Column, Integer, String, UnicodeText
+from .db_connection import BASE, ITER_PAGE_SIZE, async_engine, async_session, iter_keyset
+from sqlalchemy import BigInteger, Boolean, Column, ForeignKey, Integer, String, UnicodeText
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from telegram.error import BadRequest, TelegramError
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import update, delete
 
+LOGGER = logging.getLogger(__name__)
+
 
 class Federations(BASE):
     __tablename__ = "feds"
@@ -16,9 +21,10 @@ class Federations(BASE):
     fed_id = Column(UnicodeText, primary_key=True)
     fed_rules = Column(UnicodeText)
     fed_log = Column(UnicodeText)
+    # Legacy stringified {"owner": ..., "members": "[...]"}; moved to feds_admins on load
     fed_users = Column(UnicodeText)
 
-    def __init__(self, owner_id, fed_name, fed_id, fed_rules, fed_log, fed_users):
+    def __init__(self, owner_id, fed_name, fed_id, fed_rules, fed_log, fed_users=None):
         self.owner_id = owner_id
         self.fed_name = fed_name
         self.fed_id = fed_id
@@ -27,6 +33,23 @@ class Federations(BASE):
         self.fed_users = fed_users
 
 
+class FedAdmins(BASE):
+    __tablename__ = "feds_admins"
+    fed_id = Column(
+        UnicodeText,
+        ForeignKey("feds.fed_id", onupdate="CASCADE", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    user_id = Column(BigInteger, primary_key=True, index=True)
+
+    def __init__(self, fed_id, user_id):
+        self.fed_id = fed_id
+        self.user_id = user_id
+
+    def __repr__(self):
+        return "<Fed {} admin {}>".format(self.fed_id, self.user_id)
+
+
 class ChatF(BASE):
     __tablename__ = "chat_feds"
     chat_id = Column(String(14), primary_key=True)
@@ -84,11 +107,54 @@ class FedSubs(BASE):
         return "<Fed {} subscribes for {}>".format(self.fed_id, self.fed_subs)
 
 
+class FedRecord:
+    """In-memory federation, shared by the by-id, by-owner and by-name maps.
+
+    Item access with the old cache keys ("owner", "fname", "frules", ...) still
+    works for callers written against the dict cache.
+    """
+
+    __slots__ = ("fed_id", "owner_id", "name", "rules", "log", "admins")
+
+    def __init__(self, fed_id: str, owner_id: int, name: str, rules: str, log: Optional[str], admins=()) -> None:
+        self.fed_id = fed_id
+        self.owner_id = owner_id
+        self.name = name
+        self.rules = rules
+        self.log = log
+        self.admins: Set[int] = set(admins)
+
+    @property
+    def fusers(self) -> str:
+        return str({"owner": str(self.owner_id), "members": str(sorted(self.admins))})
+
+    _KEYS = {
+        "fid": "fed_id",
+        "owner": "owner_id",
+        "fname": "name",
+        "frules": "rules",
+        "flog": "log",
+        "fusers": "fusers",
+    }
+
+    def __getitem__(self, key: str):
+        value = getattr(self, self._KEYS[key])
+        return str(value) if key == "owner" else value
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self):
+        return "<Fed {} ({})>".format(self.name, self.fed_id)
+
+
 # Create tables if they don't exist
 async def create_tables():
-    async with async_session() as session:
-        async with session.begin():
-            await session.run_sync(BASE.metadata.create_all)
+    async with async_engine.begin() as conn:
+        await conn.run_sync(BASE.metadata.create_all)
 
 
 FEDS_LOCK = asyncio.Lock()
@@ -96,9 +162,13 @@ CHAT_FEDS_LOCK = asyncio.Lock()
 FEDS_SETTINGS_LOCK = asyncio.Lock()
 FEDS_SUBSCRIBER_LOCK = asyncio.Lock()
 
-FEDERATION_BYNAME = {}
-FEDERATION_BYOWNER = {}
-FEDERATION_BYFEDID = {}
+FEDERATION_BYNAME: Dict[str, FedRecord] = {}
+FEDERATION_BYOWNER: Dict[str, FedRecord] = {}
+FEDERATION_BYFEDID: Dict[str, FedRecord] = {}
+
+# user_id -> ids of the feds they own / are an admin of
+OWNER_FEDS: Dict[int, Set[str]] = {}
+ADMIN_FEDS: Dict[int, Set[str]] = {}
 
 FEDERATION_CHATS = {}
 FEDERATION_CHATS_BYID = {}
@@ -107,9 +177,181 @@ FEDERATION_BANNED_FULL = {}
 FEDERATION_BANNED_USERID = {}
 
 FEDERATION_NOTIFICATION = {}
+# fed_id -> feds subscribed to it / feds it subscribes to
 FEDS_SUBSCRIBER = {}
 MYFEDS_SUBSCRIBER = {}
 
+# Transitive closures of the subscription graph, each including the fed itself:
+# fed_id -> feds its bans reach / feds whose bans reach it
+FED_DOWNSTREAM: Dict[str, FrozenSet[str]] = {}
+FED_UPSTREAM: Dict[str, FrozenSet[str]] = {}
+# fed_id -> every user banned in one of FED_UPSTREAM[fed_id]
+FED_EFFECTIVE_BANS: Dict[str, Set[int]] = {}
+# Groups of feds that subscribe to each other in a loop
+FED_SUBSCRIPTION_CYCLES: List[FrozenSet[str]] = []
+
+
+def _index_fed(fed: FedRecord) -> None:
+    FEDERATION_BYFEDID[fed.fed_id] = fed
+    FEDERATION_BYOWNER[str(fed.owner_id)] = fed
+    FEDERATION_BYNAME[fed.name] = fed
+    OWNER_FEDS.setdefault(fed.owner_id, set()).add(fed.fed_id)
+    for user_id in fed.admins:
+        ADMIN_FEDS.setdefault(user_id, set()).add(fed.fed_id)
+
+
+def _discard(index: Dict[int, Set[str]], user_id: int, fed_id: str) -> None:
+    feds = index.get(user_id)
+    if feds is not None:
+        feds.discard(fed_id)
+        if not feds:
+            del index[user_id]
+
+
+def _unindex_fed(fed: FedRecord) -> None:
+    FEDERATION_BYFEDID.pop(fed.fed_id, None)
+    if FEDERATION_BYOWNER.get(str(fed.owner_id)) is fed:
+        FEDERATION_BYOWNER.pop(str(fed.owner_id))
+    if FEDERATION_BYNAME.get(fed.name) is fed:
+        FEDERATION_BYNAME.pop(fed.name)
+    _discard(OWNER_FEDS, fed.owner_id, fed.fed_id)
+    for user_id in fed.admins:
+        _discard(ADMIN_FEDS, user_id, fed.fed_id)
+
+
+def _strongly_connected(nodes: Iterable[str], graph: Dict[str, Set[str]]) -> List[List[str]]:
+    """Tarjan's algorithm, iteratively; components come out sinks first"""
+    index: Dict[str, int] = {}
+    lowlink: Dict[str, int] = {}
+    on_stack: Set[str] = set()
+    stack: List[str] = []
+    components: List[List[str]] = []
+    counter = 0
+
+    for root in nodes:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph.get(root, ())))]
+        while work:
+            node, edges = work[-1]
+            for succ in edges:
+                if succ not in index:
+                    index[succ] = lowlink[succ] = counter
+                    counter += 1
+                    stack.append(succ)
+                    on_stack.add(succ)
+                    work.append((succ, iter(graph.get(succ, ()))))
+                    break
+                if succ in on_stack:
+                    lowlink[node] = min(lowlink[node], index[succ])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+
+def _closure(nodes: Iterable[str], graph: Dict[str, Set[str]]) -> Dict[str, FrozenSet[str]]:
+    """Everything reachable from each node, the node included"""
+    reach: Dict[str, FrozenSet[str]] = {}
+    for component in _strongly_connected(nodes, graph):
+        reachable = set(component)
+        for node in component:
+            for succ in graph.get(node, ()):
+                # Successors outside the component were finished earlier
+                if succ not in reachable:
+                    reachable |= reach[succ]
+        reachable = frozenset(reachable)
+        for node in component:
+            reach[node] = reachable
+    return reach
+
+
+def _rebuild_effective_bans() -> None:
+    global FED_EFFECTIVE_BANS
+    FED_EFFECTIVE_BANS = {
+        fed_id: set().union(*(FEDERATION_BANNED_USERID.get(src, ()) for src in upstream))
+        for fed_id, upstream in FED_UPSTREAM.items()
+    }
+
+
+def _rebuild_propagation() -> None:
+    """Recompute the subscription closures and effective ban sets"""
+    global FED_DOWNSTREAM, FED_UPSTREAM, FED_SUBSCRIPTION_CYCLES
+    nodes = set(FEDERATION_BYFEDID) | set(FEDS_SUBSCRIBER) | set(MYFEDS_SUBSCRIBER)
+    for subscribers in FEDS_SUBSCRIBER.values():
+        nodes |= subscribers
+    FED_DOWNSTREAM = _closure(nodes, FEDS_SUBSCRIBER)
+    FED_UPSTREAM = _closure(nodes, MYFEDS_SUBSCRIBER)
+    FED_SUBSCRIPTION_CYCLES = [
+        frozenset(component)
+        for component in _strongly_connected(nodes, FEDS_SUBSCRIBER)
+        if len(component) > 1 or component[0] in FEDS_SUBSCRIBER.get(component[0], ())
+    ]
+    if FED_SUBSCRIPTION_CYCLES:
+        LOGGER.info("Federation subscription cycles: %s", [sorted(c) for c in FED_SUBSCRIPTION_CYCLES])
+    _rebuild_effective_bans()
+
+
+def _cache_ban(fed_id: str, user_id, first_name, last_name, user_name, reason, time) -> None:
+    FEDERATION_BANNED_USERID.setdefault(fed_id, set()).add(int(user_id))
+    FEDERATION_BANNED_FULL.setdefault(fed_id, {})[str(user_id)] = {
+        "first_name": first_name,
+        "last_name": last_name,
+        "user_name": user_name,
+        "reason": reason,
+        "time": time,
+    }
+    for target in FED_DOWNSTREAM.get(fed_id, (fed_id,)):
+        FED_EFFECTIVE_BANS.setdefault(target, set()).add(int(user_id))
+
+
+def _uncache_ban(fed_id: str, user_id) -> None:
+    user_id = int(user_id)
+    FEDERATION_BANNED_USERID.get(fed_id, set()).discard(user_id)
+    FEDERATION_BANNED_FULL.get(fed_id, {}).pop(str(user_id), None)
+    for target in FED_DOWNSTREAM.get(fed_id, (fed_id,)):
+        # Still banned through another fed this one gets bans from
+        if any(user_id in FEDERATION_BANNED_USERID.get(src, ()) for src in FED_UPSTREAM.get(target, (target,))):
+            continue
+        FED_EFFECTIVE_BANS.get(target, set()).discard(user_id)
+
+
+def get_affected_feds(fed_id) -> FrozenSet[str]:
+    """Feds a ban in fed_id applies to: itself and every direct or indirect subscriber"""
+    return FED_DOWNSTREAM.get(str(fed_id), frozenset((str(fed_id),)))
+
+
+def get_affected_chats(fed_id) -> List[str]:
+    """Chats of every fed a ban in fed_id applies to"""
+    return [
+        chat_id
+        for affected in get_affected_feds(fed_id)
+        for chat_id in FEDERATION_CHATS_BYID.get(affected, ())
+    ]
+
+
+def is_user_fbanned_in_chat(chat_id, user_id) -> bool:
+    """Whether any fed reaching this chat's fed bans user_id; one set lookup"""
+    fed = FEDERATION_CHATS.get(str(chat_id))
+    if fed is None:
+        return False
+    return int(user_id) in FED_EFFECTIVE_BANS.get(fed["fid"], ())
+
 
 async def get_fed_info(fed_id):
     get = FEDERATION_BYFEDID.get(str(fed_id))
@@ -144,43 +386,19 @@ async def get_user_fban(fed_id, user_id):
 
 
 async def get_user_admin_fed_name(user_id):
-    user_feds = []
-    for f in FEDERATION_BYFEDID:
-        if int(user_id) in ast.literal_eval(
-            ast.literal_eval(FEDERATION_BYFEDID[f]["fusers"])["members"]
-        ):
-            user_feds.append(FEDERATION_BYFEDID[f]["fname"])
-    return user_feds
+    return [FEDERATION_BYFEDID[f].name for f in ADMIN_FEDS.get(int(user_id), ())]
 
 
 async def get_user_owner_fed_name(user_id):
-    user_feds = []
-    for f in FEDERATION_BYFEDID:
-        if int(user_id) == int(
-            ast.literal_eval(FEDERATION_BYFEDID[f]["fusers"])["owner"]
-        ):
-            user_feds.append(FEDERATION_BYFEDID[f]["fname"])
-    return user_feds
+    return [FEDERATION_BYFEDID[f].name for f in OWNER_FEDS.get(int(user_id), ())]
 
 
 async def get_user_admin_fed_full(user_id):
-    user_feds = []
-    for f in FEDERATION_BYFEDID:
-        if int(user_id) in ast.literal_eval(
-            ast.literal_eval(FEDERATION_BYFEDID[f]["fusers"])["members"]
-        ):
-            user_feds.append({"fed_id": f, "fed": FEDERATION_BYFEDID[f]})
-    return user_feds
+    return [{"fed_id": f, "fed": FEDERATION_BYFEDID[f]} for f in ADMIN_FEDS.get(int(user_id), ())]
 
 
 async def get_user_owner_fed_full(user_id):
-    user_feds = []
-    for f in FEDERATION_BYFEDID:
-        if int(user_id) == int(
-            ast.literal_eval(FEDERATION_BYFEDID[f]["fusers"])["owner"]
-        ):
-            user_feds.append({"fed_id": f, "fed": FEDERATION_BYFEDID[f]})
-    return user_feds
+    return [{"fed_id": f, "fed": FEDERATION_BYFEDID[f]} for f in OWNER_FEDS.get(int(user_id), ())]
 
 
 async def get_user_fbanlist(user_id):
@@ -197,59 +415,30 @@ async def get_user_fbanlist(user_id):
 
 async def new_fed(owner_id, fed_name, fed_id):
     async with FEDS_LOCK:
-        global FEDERATION_BYOWNER, FEDERATION_BYFEDID, FEDERATION_BYNAME
         fed = Federations(
             str(owner_id),
             fed_name,
             str(fed_id),
             "Rules is not set in this federation.",
             None,
-            str({"owner": str(owner_id), "members": "[]"}),
         )
         async with async_session() as session:
             async with session.begin():
                 session.add(fed)
-                await session.commit()
-        
-        FEDERATION_BYOWNER[str(owner_id)] = {
-            "fid": str(fed_id),
-            "fname": fed_name,
-            "frules": "Rules is not set in this federation.",
-            "flog": None,
-            "fusers": str({"owner": str(owner_id), "members": "[]"}),
-        }
-        FEDERATION_BYFEDID[str(fed_id)] = {
-            "owner": str(owner_id),
-            "fname": fed_name,
-            "frules": "Rules is not set in this federation.",
-            "flog": None,
-            "fusers": str({"owner": str(owner_id), "members": "[]"}),
-        }
-        FEDERATION_BYNAME[fed_name] = {
-            "fid": str(fed_id),
-            "owner": str(owner_id),
-            "frules": "Rules is not set in this federation.",
-            "flog": None,
-            "fusers": str({"owner": str(owner_id), "members": "[]"}),
-        }
+
+        _index_fed(FedRecord(str(fed_id), int(owner_id), fed_name, fed.fed_rules, None))
         return fed
 
 
 async def del_fed(fed_id):
     async with FEDS_LOCK:
-        global FEDERATION_BYOWNER, FEDERATION_BYFEDID, FEDERATION_BYNAME, FEDERATION_CHATS, FEDERATION_CHATS_BYID, FEDERATION_BANNED_USERID, FEDERATION_BANNED_FULL
-        getcache = FEDERATION_BYFEDID.get(fed_id)
-        if getcache is None:
+        global FEDERATION_CHATS, FEDERATION_CHATS_BYID, FEDERATION_BANNED_USERID, FEDERATION_BANNED_FULL
+        fed = FEDERATION_BYFEDID.get(fed_id)
+        if fed is None:
             return False
-        
-        getfed = FEDERATION_BYFEDID.get(fed_id)
-        owner_id = getfed["owner"]
-        fed_name = getfed["fname"]
-        
-        FEDERATION_BYOWNER.pop(owner_id)
-        FEDERATION_BYFEDID.pop(fed_id)
-        FEDERATION_BYNAME.pop(fed_name)
-        
+
+        _unindex_fed(fed)
+
         if FEDERATION_CHATS_BYID.get(fed_id):
             async with async_session() as session:
                 for x in FEDERATION_CHATS_BYID[fed_id]:
@@ -259,7 +448,7 @@ async def del_fed(fed_id):
                         await session.commit()
                     FEDERATION_CHATS.pop(x)
             FEDERATION_CHATS_BYID.pop(fed_id)
-        
+
         getall = FEDERATION_BANNED_USERID.get(fed_id)
         if getall:
             async with async_session() as session:
@@ -268,51 +457,50 @@ async def del_fed(fed_id):
                     if banlist:
                         await session.delete(banlist)
                         await session.commit()
-        
+
         if FEDERATION_BANNED_USERID.get(fed_id):
             FEDERATION_BANNED_USERID.pop(fed_id)
         if FEDERATION_BANNED_FULL.get(fed_id):
             FEDERATION_BANNED_FULL.pop(fed_id)
-        
-        getall = MYFEDS_SUBSCRIBER.get(fed_id)
-        if getall:
-            async with async_session() as session:
-                for x in getall:
-                    getsubs = await session.get(FedSubs, (fed_id, str(x)))
-                    if getsubs:
-                        await session.delete(getsubs)
-                        await session.commit()
-        
-        if FEDS_SUBSCRIBER.get(fed_id):
-            FEDS_SUBSCRIBER.pop(fed_id)
-        if MYFEDS_SUBSCRIBER.get(fed_id):
-            MYFEDS_SUBSCRIBER.pop(fed_id)
-        
+
+        # Subscriptions in both directions go, or the closures would still route through it
         async with async_session() as session:
-            curr = await session.get(Federations, fed_id)
-            if curr:
-                await session.delete(curr)
-                await session.commit()
+            async with session.begin():
+                await session.execute(
+                    delete(FedSubs).where((FedSubs.fed_id == fed_id) | (FedSubs.fed_subs == fed_id))
+                )
+        for upstream in MYFEDS_SUBSCRIBER.pop(fed_id, set()):
+            FEDS_SUBSCRIBER.get(upstream, set()).discard(fed_id)
+        for subscriber in FEDS_SUBSCRIBER.pop(fed_id, set()):
+            MYFEDS_SUBSCRIBER.get(subscriber, set()).discard(fed_id)
+        _rebuild_propagation()
+
+        async with async_session() as session:
+            async with session.begin():
+                await session.execute(delete(FedAdmins).where(FedAdmins.fed_id == fed_id))
+                await session.execute(delete(Federations).where(Federations.fed_id == fed_id))
         return True
 
 
+async def _update_fed(fed_id: str, **values) -> bool:
+    async with async_session() as session:
+        async with session.begin():
+            result = await session.execute(
+                update(Federations).where(Federations.fed_id == fed_id).values(**values)
+            )
+            return result.rowcount > 0
+
+
 async def rename_fed(fed_id, owner_id, newname):
     async with FEDS_LOCK:
-        global FEDERATION_BYFEDID, FEDERATION_BYOWNER, FEDERATION_BYNAME
-        async with async_session() as session:
-            fed = await session.get(Federations, fed_id)
-            if not fed:
-                return False
-            fed.fed_name = newname
-            await session.commit()
-
-        oldname = FEDERATION_BYFEDID[str(fed_id)]["fname"]
-        tempdata = FEDERATION_BYNAME[oldname]
-        FEDERATION_BYNAME.pop(oldname)
+        fed = FEDERATION_BYFEDID.get(str(fed_id))
+        if fed is None or not await _update_fed(str(fed_id), fed_name=newname):
+            return False
 
-        FEDERATION_BYOWNER[str(owner_id)]["fname"] = newname
-        FEDERATION_BYFEDID[str(fed_id)]["fname"] = newname
-        FEDERATION_BYNAME[newname] = tempdata
+        if FEDERATION_BYNAME.get(fed.name) is fed:
+            FEDERATION_BYNAME.pop(fed.name)
+        fed.name = newname
+        FEDERATION_BYNAME[newname] = fed
         return True
 
 
@@ -341,106 +529,49 @@ async def search_fed_by_name(fed_name):
 
 
 async def search_user_in_fed(fed_id, user_id):
-    getfed = FEDERATION_BYFEDID.get(fed_id)
-    if getfed is None:
-        return False
-    getfed = ast.literal_eval(getfed["fusers"])["members"]
-    if user_id in ast.literal_eval(getfed):
-        return True
-    else:
+    fed = FEDERATION_BYFEDID.get(fed_id)
+    if fed is None:
         return False
+    return int(user_id) in fed.admins
 
 
 async def user_demote_fed(fed_id, user_id):
     async with FEDS_LOCK:
-        global FEDERATION_BYOWNER, FEDERATION_BYFEDID, FEDERATION_BYNAME
-        getfed = FEDERATION_BYFEDID.get(str(fed_id))
-        if not getfed:
+        fed = FEDERATION_BYFEDID.get(str(fed_id))
+        user_id = int(user_id)
+        if not fed or user_id not in fed.admins:
             return False
-            
-        owner_id = getfed["owner"]
-        fed_name = getfed["fname"]
-        fed_rules = getfed["frules"]
-        fed_log = getfed["flog"]
-        
-        try:
-            members = ast.literal_eval(ast.literal_eval(getfed["fusers"])["members"])
-        except ValueError:
-            return False
-            
-        if user_id not in members:
-            return False
-            
-        members.remove(user_id)
-        
-        FEDERATION_BYOWNER[str(owner_id)]["fusers"] = str(
-            {"owner": str(owner_id), "members": str(members)},
-        )
-        FEDERATION_BYFEDID[str(fed_id)]["fusers"] = str(
-            {"owner": str(owner_id), "members": str(members)},
-        )
-        FEDERATION_BYNAME[fed_name]["fusers"] = str(
-            {"owner": str(owner_id), "members": str(members)},
-        )
-        
-        fed = Federations(
-            str(owner_id),
-            fed_name,
-            str(fed_id),
-            fed_rules,
-            fed_log,
-            str({"owner": str(owner_id), "members": str(members)}),
-        )
-        
+
         async with async_session() as session:
-            await session.merge(fed)
-            await session.commit()
-        
+            async with session.begin():
+                await session.execute(
+                    delete(FedAdmins)
+                    .where(FedAdmins.fed_id == fed.fed_id)
+                    .where(FedAdmins.user_id == user_id)
+                )
+
+        fed.admins.discard(user_id)
+        _discard(ADMIN_FEDS, user_id, fed.fed_id)
         return True
 
 
 async def user_join_fed(fed_id, user_id):
     async with FEDS_LOCK:
-        global FEDERATION_BYOWNER, FEDERATION_BYFEDID, FEDERATION_BYNAME
-        getfed = FEDERATION_BYFEDID.get(str(fed_id))
-        if not getfed:
+        fed = FEDERATION_BYFEDID.get(str(fed_id))
+        user_id = int(user_id)
+        if not fed or user_id in fed.admins:
             return False
-            
-        owner_id = getfed["owner"]
-        fed_name = getfed["fname"]
-        fed_rules = getfed["frules"]
-        fed_log = getfed["flog"]
-        
-        members = ast.literal_eval(ast.literal_eval(getfed["fusers"])["members"])
-        if user_id in members:
-            return False
-            
-        members.append(user_id)
-        
-        FEDERATION_BYOWNER[str(owner_id)]["fusers"] = str(
-            {"owner": str(owner_id), "members": str(members)},
-        )
-        FEDERATION_BYFEDID[str(fed_id)]["fusers"] = str(
-            {"owner": str(owner_id), "members": str(members)},
-        )
-        FEDERATION_BYNAME[fed_name]["fusers"] = str(
-            {"owner": str(owner_id), "members": str(members)},
-        )
-        
-        fed = Federations(
-            str(owner_id),
-            fed_name,
-            str(fed_id),
-            fed_rules,
-            fed_log,
-            str({"owner": str(owner_id), "members": str(members)}),
-        )
-        
+
         async with async_session() as session:
-            await session.merge(fed)
-            await session.commit()
-        
-        await __load_all_feds_chats()
+            async with session.begin():
+                await session.execute(
+                    pg_insert(FedAdmins)
+                    .values(fed_id=fed.fed_id, user_id=user_id)
+                    .on_conflict_do_nothing()
+                )
+
+        fed.admins.add(user_id)
+        ADMIN_FEDS.setdefault(user_id, set()).add(fed.fed_id)
         return True
 
 
@@ -474,60 +605,28 @@ async def all_fed_chats(fed_id):
 
 
 async def all_fed_users(fed_id):
-    async with FEDS_LOCK:
-        getfed = FEDERATION_BYFEDID.get(str(fed_id))
-        if getfed is None:
-            return False
-        fed_owner = ast.literal_eval(ast.literal_eval(getfed["fusers"])["owner"])
-        fed_admins = ast.literal_eval(ast.literal_eval(getfed["fusers"])["members"])
-        fed_admins.append(fed_owner)
-        return fed_admins
+    fed = FEDERATION_BYFEDID.get(str(fed_id))
+    if fed is None:
+        return False
+    return list(fed.admins) + [fed.owner_id]
 
 
 async def all_fed_members(fed_id):
-    async with FEDS_LOCK:
-        getfed = FEDERATION_BYFEDID.get(str(fed_id))
-        fed_admins = ast.literal_eval(ast.literal_eval(getfed["fusers"])["members"])
-        return fed_admins
+    fed = FEDERATION_BYFEDID.get(str(fed_id))
+    return list(fed.admins)
 
 
 async def set_frules(fed_id, rules):
     async with FEDS_LOCK:
-        global FEDERATION_BYOWNER, FEDERATION_BYFEDID, FEDERATION_BYNAME
-        getfed = FEDERATION_BYFEDID.get(str(fed_id))
-        if not getfed:
+        fed = FEDERATION_BYFEDID.get(str(fed_id))
+        if not fed or not await _update_fed(fed.fed_id, fed_rules=str(rules)):
             return False
-            
-        owner_id = getfed["owner"]
-        fed_name = getfed["fname"]
-        fed_members = getfed["fusers"]
-        fed_rules = str(rules)
-        fed_log = getfed["flog"]
-        
-        FEDERATION_BYOWNER[str(owner_id)]["frules"] = fed_rules
-        FEDERATION_BYFEDID[str(fed_id)]["frules"] = fed_rules
-        FEDERATION_BYNAME[fed_name]["frules"] = fed_rules
-        
-        fed = Federations(
-            str(owner_id),
-            fed_name,
-            str(fed_id),
-            fed_rules,
-            fed_log,
-            str(fed_members),
-        )
-        
-        async with async_session() as session:
-            await session.merge(fed)
-            await session.commit()
-        
+        fed.rules = str(rules)
         return True
 
 
 async def get_frules(fed_id):
-    async with FEDS_LOCK:
-        rules = FEDERATION_BYFEDID[str(fed_id)]["frules"]
-        return rules
+    return FEDERATION_BYFEDID[str(fed_id)].rules
 
 
 async def fban_user(fed_id, user_id, first_name, last_name, user_name, reason, time):
@@ -555,7 +654,7 @@ async def fban_user(fed_id, user_id, first_name, last_name, user_name, reason, t
                 await session.rollback()
                 return False
             
-            await __load_all_feds_banned()
+            _cache_ban(str(fed_id), user_id, first_name, last_name, user_name, reason, time)
             return r
 
 
@@ -567,44 +666,91 @@ async def multi_fban_user(
     multi_user_name,
     multi_reason,
 ):
+    by_fed: Dict[str, List[dict]] = {}
+    for fed_id, user_id, first_name, last_name, user_name, reason in zip(
+        multi_fed_id, multi_user_id, multi_first_name, multi_last_name, multi_user_name, multi_reason,
+    ):
+        by_fed.setdefault(str(fed_id), []).append({
+            "user_id": user_id,
+            "first_name": first_name,
+            "last_name": last_name,
+            "user_name": user_name,
+            "reason": reason,
+            "time": 0,
+        })
+    counter = 0
+    for fed_id, rows in by_fed.items():
+        saved = await bulk_fban_users(fed_id, rows)
+        if saved is False:
+            return False
+        counter += saved
+    return counter
+
+
+# Rows per INSERT statement in bulk_fban_users
+FBAN_BATCH_SIZE = 1000
+
+
+async def bulk_fban_users(fed_id, rows: List[dict]):
+    """Upsert many bans of one fed in a single transaction and update the caches once.
+
+    Each row has user_id and first_name, and optionally last_name, user_name,
+    reason and time. Returns the number of bans written, or False on failure.
+    """
+    fed_id = str(fed_id)
+    # One statement can't touch the same row twice, the last row of a user wins
+    unique = {}
+    for row in rows:
+        unique[str(row["user_id"])] = {
+            "fed_id": fed_id,
+            "user_id": str(row["user_id"]),
+            "first_name": row.get("first_name") or "Unknown",
+            "last_name": row.get("last_name"),
+            "user_name": row.get("user_name"),
+            "reason": row.get("reason") or "",
+            "time": int(row.get("time") or 0),
+        }
+    values = list(unique.values())
+    if not values:
+        return 0
+
     async with FEDS_LOCK:
-        counter = 0
-        time = 0
-        async with async_session() as session:
-            for x in range(len(multi_fed_id)):
-                fed_id = multi_fed_id[x]
-                user_id = multi_user_id[x]
-                first_name = multi_first_name[x]
-                last_name = multi_last_name[x]
-                user_name = multi_user_name[x]
-                reason = multi_reason[x]
-                
-                stmt = delete(BansF).where(
-                    (BansF.fed_id == str(fed_id)) & (BansF.user_id == str(user_id))
-                )
-                await session.execute(stmt)
-                
-                r = BansF(
-                    str(fed_id),
-                    str(user_id),
-                    first_name,
-                    last_name,
-                    user_name,
-                    reason,
-                    time,
-                )
-                
-                session.add(r)
-                counter += 1
-                
-            try:
-                await session.commit()
-            except:
-                await session.rollback()
-                return False
-            
-            await __load_all_feds_banned()
-            return counter
+        try:
+            async with async_session() as session:
+                async with session.begin():
+                    for i in range(0, len(values), FBAN_BATCH_SIZE):
+                        stmt = pg_insert(BansF).values(values[i:i + FBAN_BATCH_SIZE])
+                        await session.execute(
+                            stmt.on_conflict_do_update(
+                                index_elements=[BansF.fed_id, BansF.user_id],
+                                set_={
+                                    "first_name": stmt.excluded.first_name,
+                                    "last_name": stmt.excluded.last_name,
+                                    "user_name": stmt.excluded.user_name,
+                                    "reason": stmt.excluded.reason,
+                                    "time": stmt.excluded.time,
+                                },
+                            )
+                        )
+        except Exception:
+            LOGGER.exception("Bulk fban of %s rows into %s failed", len(values), fed_id)
+            return False
+
+        user_ids = {int(value["user_id"]) for value in values}
+        FEDERATION_BANNED_USERID.setdefault(fed_id, set()).update(user_ids)
+        FEDERATION_BANNED_FULL.setdefault(fed_id, {}).update(
+            (value["user_id"], {
+                "first_name": value["first_name"],
+                "last_name": value["last_name"],
+                "user_name": value["user_name"],
+                "reason": value["reason"],
+                "time": value["time"],
+            })
+            for value in values
+        )
+        for target in FED_DOWNSTREAM.get(fed_id, (fed_id,)):
+            FED_EFFECTIVE_BANS.setdefault(target, set()).update(user_ids)
+        return len(values)
 
 
 async def un_fban_user(fed_id, user_id):
@@ -619,14 +765,14 @@ async def un_fban_user(fed_id, user_id):
             if result.rowcount == 0:
                 return False
                 
-            await __load_all_feds_banned()
+            _uncache_ban(str(fed_id), user_id)
             return True
 
 
 async def get_fban_user(fed_id, user_id):
     list_fbanned = FEDERATION_BANNED_USERID.get(fed_id)
     if list_fbanned is None:
-        FEDERATION_BANNED_USERID[fed_id] = []
+        FEDERATION_BANNED_USERID[fed_id] = set()
     if user_id in FEDERATION_BANNED_USERID[fed_id]:
         async with async_session() as session:
             stmt = select(BansF).where(
@@ -643,10 +789,21 @@ async def get_fban_user(fed_id, user_id):
 async def get_all_fban_users(fed_id):
     list_fbanned = FEDERATION_BANNED_USERID.get(fed_id)
     if list_fbanned is None:
-        FEDERATION_BANNED_USERID[fed_id] = []
+        FEDERATION_BANNED_USERID[fed_id] = set()
     return FEDERATION_BANNED_USERID[fed_id]
 
 
+async def iter_fed_bans(fed_id, page_size: int = ITER_PAGE_SIZE):
+    """Yield (user_id, first_name, last_name, user_name, reason, time) of a fed's bans,
+    read from the database a keyset page at a time"""
+    async for row in iter_keyset(
+        (BansF.user_id, BansF.first_name, BansF.last_name, BansF.user_name, BansF.reason, BansF.time),
+        page_size,
+        BansF.fed_id == str(fed_id),
+    ):
+        yield row
+
+
 async def get_all_fban_users_target(fed_id, user_id):
     list_fbanned = FEDERATION_BANNED_FULL.get(fed_id)
     if list_fbanned is None:
@@ -666,11 +823,7 @@ async def get_all_fban_users_global():
 
 
 async def get_all_feds_users_global():
-    list_fed = FEDERATION_BYFEDID
-    total = []
-    for x in list(FEDERATION_BYFEDID):
-        total.append(FEDERATION_BYFEDID[x])
-    return total
+    return list(FEDERATION_BYFEDID.values())
 
 
 async def search_fed_by_id(fed_id):
@@ -726,34 +879,11 @@ async def get_fed_log(fed_id):
 
 async def set_fed_log(fed_id, chat_id):
     async with FEDS_LOCK:
-        global FEDERATION_BYOWNER, FEDERATION_BYFEDID, FEDERATION_BYNAME
-        getfed = FEDERATION_BYFEDID.get(str(fed_id))
-        if not getfed:
+        fed = FEDERATION_BYFEDID.get(str(fed_id))
+        fed_log = None if chat_id is None else str(chat_id)
+        if not fed or not await _update_fed(fed.fed_id, fed_log=fed_log):
             return False
-            
-        owner_id = getfed["owner"]
-        fed_name = getfed["fname"]
-        fed_members = getfed["fusers"]
-        fed_rules = getfed["frules"]
-        fed_log = str(chat_id)
-        
-        FEDERATION_BYOWNER[str(owner_id)]["flog"] = fed_log
-        FEDERATION_BYFEDID[str(fed_id)]["flog"] = fed_log
-        FEDERATION_BYNAME[fed_name]["flog"] = fed_log
-        
-        fed = Federations(
-            str(owner_id),
-            fed_name,
-            str(fed_id),
-            fed_rules,
-            fed_log,
-            str(fed_members),
-        )
-        
-        async with async_session() as session:
-            await session.merge(fed)
-            await session.commit()
-        
+        fed.log = fed_log
         return True
 
 
@@ -780,6 +910,7 @@ async def subs_fed(fed_id, my_fed):
         else:
             MYFEDS_SUBSCRIBER.get(my_fed, set()).add(fed_id)
         
+        _rebuild_propagation()
         return True
 
 
@@ -795,6 +926,7 @@ async def unsubs_fed(fed_id, my_fed):
 
                 await session.delete(getsubs)
                 await session.commit()
+                _rebuild_propagation()
                 return True
 
         return False
@@ -819,38 +951,64 @@ async def get_subscriber(fed_id):
     return FEDS_SUBSCRIBER.get(fed_id, set())
 
 
+def _legacy_admins(fed_users: str) -> List[int]:
+    """Admin ids out of the old stringified fed_users column"""
+    try:
+        return [int(x) for x in ast.literal_eval(ast.literal_eval(fed_users)["members"])]
+    except (ValueError, SyntaxError, KeyError, TypeError):
+        LOGGER.warning("Unreadable fed_users value %r, dropping it", fed_users)
+        return []
+
+
+async def __migrate_fed_users(session) -> None:
+    """Move admins out of feds.fed_users into feds_admins, once per federation"""
+    result = await session.execute(
+        select(Federations.fed_id, Federations.fed_users).where(Federations.fed_users.isnot(None))
+    )
+    legacy = result.all()
+    if not legacy:
+        return
+    rows = [
+        {"fed_id": fed_id, "user_id": user_id}
+        for fed_id, fed_users in legacy
+        for user_id in _legacy_admins(fed_users)
+    ]
+    if rows:
+        await session.execute(pg_insert(FedAdmins).values(rows).on_conflict_do_nothing())
+    await session.execute(
+        update(Federations)
+        .where(Federations.fed_id.in_([fed_id for fed_id, _ in legacy]))
+        .values(fed_users=None)
+    )
+    LOGGER.info("Moved the admins of %s federation(s) to feds_admins", len(legacy))
+
+
 async def __load_all_feds():
-    global FEDERATION_BYOWNER, FEDERATION_BYFEDID, FEDERATION_BYNAME
+    global FEDERATION_BYOWNER, FEDERATION_BYFEDID, FEDERATION_BYNAME, OWNER_FEDS, ADMIN_FEDS
     try:
         async with async_session() as session:
+            async with session.begin():
+                await __migrate_fed_users(session)
+
+            admins: Dict[str, List[int]] = {}
+            result = await session.execute(select(FedAdmins.fed_id, FedAdmins.user_id))
+            for fed_id, user_id in result:
+                admins.setdefault(fed_id, []).append(user_id)
+
             result = await session.execute(select(Federations))
             feds = result.scalars().all()
-            
-            for x in feds:
-                # Fed by Owner
-                FEDERATION_BYOWNER[str(x.owner_id)] = {
-                    "fid": str(x.fed_id),
-                    "fname": x.fed_name,
-                    "frules": x.fed_rules,
-                    "flog": x.fed_log,
-                    "fusers": str(x.fed_users),
-                }
-                # Fed By FedId
-                FEDERATION_BYFEDID[str(x.fed_id)] = {
-                    "owner": str(x.owner_id),
-                    "fname": x.fed_name,
-                    "frules": x.fed_rules,
-                    "flog": x.fed_log,
-                    "fusers": str(x.fed_users),
-                }
-                # Fed By Name
-                FEDERATION_BYNAME[x.fed_name] = {
-                    "fid": str(x.fed_id),
-                    "owner": str(x.owner_id),
-                    "frules": x.fed_rules,
-                    "flog": x.fed_log,
-                    "fusers": str(x.fed_users),
-                }
+
+        FEDERATION_BYOWNER, FEDERATION_BYFEDID, FEDERATION_BYNAME = {}, {}, {}
+        OWNER_FEDS, ADMIN_FEDS = {}, {}
+        for x in feds:
+            _index_fed(FedRecord(
+                str(x.fed_id),
+                int(x.owner_id),
+                x.fed_name,
+                x.fed_rules,
+                x.fed_log,
+                admins.get(str(x.fed_id), ()),
+            ))
     except Exception as e:
         print(f"Error loading feds: {e}")
 
@@ -886,10 +1044,7 @@ async def __load_all_feds_banned():
             FEDERATION_BANNED_FULL = {}
             
             for x in qall:
-                if FEDERATION_BANNED_USERID.get(x.fed_id) is None:
-                    FEDERATION_BANNED_USERID[x.fed_id] = []
-                if int(x.user_id) not in FEDERATION_BANNED_USERID[x.fed_id]:
-                    FEDERATION_BANNED_USERID[x.fed_id].append(int(x.user_id))
+                FEDERATION_BANNED_USERID.setdefault(x.fed_id, set()).add(int(x.user_id))
                 
                 if FEDERATION_BANNED_FULL.get(x.fed_id) is None:
                     FEDERATION_BANNED_FULL[x.fed_id] = {}
@@ -902,6 +1057,7 @@ async def __load_all_feds_banned():
                 }
     except Exception as e:
         print(f"Error loading fed bans: {e}")
+    _rebuild_effective_bans()
 
 
 async def __load_all_feds_settings():
@@ -949,13 +1105,22 @@ async def load_all():
     await __load_all_feds_banned()
     await __load_all_feds_settings()
     await __load_feds_subscriber()
+    _rebuild_propagation()
+
+
+_initialized = False
+_init_lock = asyncio.Lock()
 
 
 # Initialize on startup
 async def initialize():
-    await create_tables()
-    await load_all()
+    global _initialized
+    async with _init_lock:
+        if not _initialized:
+            await create_tables()
+            await load_all()
+            _initialized = True
 
 
-# Run the initialization
-asyncio.create_task(initialize())
+# Don't auto-initialize on import: there is no running loop yet, and
+# main's initialize_sql_modules() calls initialize() for every loaded sql module
@@ -1,7 +1,7 @@
 import asyncio
-from typing import Set, Union, Optional
+from typing import AsyncIterator, Optional, Set, Tuple, Union
 
-from .db_connection import BASE, async_session, async_engine
+from .db_connection import BASE, ITER_PAGE_SIZE, async_engine, async_session, iter_keyset
 from sqlalchemy import Boolean, Column, Integer, String, UnicodeText
 from sqlalchemy.future import select
 
@@ -122,6 +122,13 @@ async def get_gban_list() -> list:
         return [x.to_dict() for x in result.scalars()]
 
 
+def iter_gban_list(page_size: int = ITER_PAGE_SIZE) -> AsyncIterator[Tuple[int, str, Optional[str]]]:
+    """Yield (user_id, name, reason) for every gbanned user, a keyset page at a time"""
+    return iter_keyset(
+        (GloballyBannedUsers.user_id, GloballyBannedUsers.name, GloballyBannedUsers.reason), page_size,
+    )
+
+
 async def enable_gbans(chat_id: Union[int, str]) -> None:
     async with GBAN_SETTING_LOCK:
         async with async_session() as session:
@@ -168,8 +175,8 @@ def num_gbanned_users() -> int:
 async def __load_gbanned_userid_list() -> None:
     global GBANNED_LIST
     async with async_session() as session:
-        result = await session.execute(select(GloballyBannedUsers))
-        GBANNED_LIST = {x.user_id for x in result.scalars()}
+        result = await session.execute(select(GloballyBannedUsers.user_id))
+        GBANNED_LIST = set(result.scalars())
 
 
 async def __load_gban_stat_list() -> None:
@@ -3,6 +3,8 @@ import time
 from sqlalchemy import Column, Integer, String, Boolean
 from typing import Optional, Union
 
+from .chat_config_sql import LOCK_COLUMNS, invalidate_chat_config
+from .chat_features_sql import Feature, load_feature, set_feature
 from .db_connection import BASE, async_session, async_engine
 from sqlalchemy.future import select
 
@@ -84,6 +86,14 @@ RESTR_LOCK = asyncio.Lock()
 PERMISSIONS_CACHE = {}
 RESTRICTIONS_CACHE = {}
 
+
+def _has_locks(perm: Optional[Permissions]) -> bool:
+    return perm is not None and any(getattr(perm, column) for column in LOCK_COLUMNS)
+
+
+def _sync_feature(chat_id: Union[int, str]) -> None:
+    set_feature(chat_id, Feature.LOCKS, _has_locks(PERMISSIONS_CACHE.get(str(chat_id))))
+
 async def create_tables():
     """Initialize database tables using engine connection"""
     async with async_engine.begin() as conn:
@@ -102,7 +112,9 @@ async def init_permissions(chat_id: Union[int, str], reset: bool = False) -> Per
                 perm = Permissions(str(chat_id))
                 session.add(perm)
                 PERMISSIONS_CACHE[str(chat_id)] = perm
-                return perm
+    invalidate_chat_config(chat_id)
+    _sync_feature(chat_id)
+    return perm
 
 async def init_restrictions(chat_id: Union[int, str], reset: bool = False) -> Restrictions:
     """Initialize restrictions for a chat"""
@@ -117,7 +129,8 @@ async def init_restrictions(chat_id: Union[int, str], reset: bool = False) -> Re
                 restr = Restrictions(str(chat_id))
                 session.add(restr)
                 RESTRICTIONS_CACHE[str(chat_id)] = restr
-                return restr
+    invalidate_chat_config(chat_id)
+    return restr
 
 async def update_lock(chat_id: Union[int, str], lock_type: str, locked: bool) -> None:
     """Update a specific lock setting"""
@@ -152,6 +165,8 @@ async def update_lock(chat_id: Union[int, str], lock_type: str, locked: bool) ->
                     setattr(curr_perm, lock_attrs[lock_type], locked)
                     curr_perm.updated_at = int(time.time())
                     PERMISSIONS_CACHE[str(chat_id)] = curr_perm
+    invalidate_chat_config(chat_id)
+    _sync_feature(chat_id)
 
 async def update_restriction(chat_id: Union[int, str], restr_type: str, locked: bool) -> None:
     """Update a specific restriction setting"""
@@ -178,6 +193,7 @@ async def update_restriction(chat_id: Union[int, str], restr_type: str, locked:
 
                 curr_restr.updated_at = int(time.time())
                 RESTRICTIONS_CACHE[str(chat_id)] = curr_restr
+    invalidate_chat_config(chat_id)
 
 async def is_locked(chat_id: Union[int, str], lock_type: str) -> bool:
     """Check if a specific lock is enabled"""
@@ -285,6 +301,10 @@ async def migrate_chat(old_chat_id: Union[int, str], new_chat_id: Union[int, str
                     rest.chat_id = str(new_chat_id)
                     if str(old_chat_id) in RESTRICTIONS_CACHE:
                         RESTRICTIONS_CACHE[str(new_chat_id)] = RESTRICTIONS_CACHE.pop(str(old_chat_id))
+    # The old chat's snapshot is handed over by migrate_chat_config once every module has moved
+    invalidate_chat_config(new_chat_id)
+    _sync_feature(old_chat_id)
+    _sync_feature(new_chat_id)
 
 async def __load_permissions():
     """Load permissions into cache on startup"""
@@ -292,6 +312,10 @@ async def __load_permissions():
     async with async_session() as session:
         result = await session.execute(select(Permissions))
         PERMISSIONS_CACHE = {perm.chat_id: perm for perm in result.scalars()}
+    load_feature(
+        Feature.LOCKS,
+        [chat_id for chat_id, perm in PERMISSIONS_CACHE.items() if _has_locks(perm)],
+    )
 
 async def __load_restrictions():
     """Load restrictions into cache on startup"""
@@ -1,6 +1,7 @@
 import asyncio
 from typing import Union
 
+from .chat_config_sql import invalidate_chat_config
 from .db_connection import BASE, async_session, async_engine
 from sqlalchemy import Boolean, Column, Integer, String
 from sqlalchemy.future import select
@@ -76,6 +77,7 @@ async def set_chat_setting(chat_id: Union[int, str], setting: bool):
                 
                 chat_setting.should_report = setting
                 session.add(chat_setting)
+    invalidate_chat_config(chat_id)
 
 
 async def set_user_setting(user_id: int, setting: bool):
@@ -108,6 +110,8 @@ async def migrate_chat(old_chat_id, new_chat_id):
                 for note in chat_notes:
                     note.chat_id = str(new_chat_id)
                 session.add_all(chat_notes)
+    # The old chat's snapshot is handed over by migrate_chat_config once every module has moved
+    invalidate_chat_config(new_chat_id)
 
 
 # Improved initialization
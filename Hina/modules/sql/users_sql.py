@@ -1,9 +1,11 @@
 import asyncio
+from collections import OrderedDict
 from contextlib import asynccontextmanager
+import logging
 import time
-from typing import Dict, List, Optional, Set, Union
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple, Union
 
-from .db_connection import BASE, async_session, async_engine
+from .db_connection import BASE, ITER_PAGE_SIZE, async_engine, async_session, iter_keyset, keyset_page
 from sqlalchemy import (
     Column,
     ForeignKey,
@@ -16,9 +18,13 @@ from sqlalchemy import (
     delete,
     update
 )
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.future import select
 from sqlalchemy.orm import relationship, selectinload
 
+LOGGER = logging.getLogger(__name__)
+
 
 class Users(BASE):
     __tablename__ = "users"
@@ -157,6 +163,242 @@ async def update_user(user_id, username, chat_id=None, chat_name=None):
                 session.add(ChatMembers(str(chat_id), user_id))
 
 
+# Write-behind tracking of users, chats and memberships.
+# log_user runs on every group message, so it only records what changed here;
+# a background task writes the buffers out as bulk upserts.
+FLUSH_INTERVAL = 10          # seconds between periodic flushes
+FLUSH_THRESHOLD = 1000       # pending rows that trigger an early flush
+FLUSH_BATCH_SIZE = 1000      # rows per INSERT statement
+RECENT_LIMIT = 50000         # entries kept in each recently-seen map
+RECENT_TTL = 3600            # seconds before an unchanged entry is written again
+MAX_FLUSH_ATTEMPTS = 5       # failed flushes in a row before the buffered rows are dropped
+
+PENDING_USERS: Dict[int, Tuple[Optional[str], int]] = {}
+PENDING_CHATS: Dict[str, str] = {}
+PENDING_MEMBERS: Set[Tuple[str, int]] = set()
+
+# key -> (value, last time it was queued)
+_RECENT_USERS: "OrderedDict[int, Tuple[Optional[str], float]]" = OrderedDict()
+_RECENT_CHATS: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+_RECENT_MEMBERS: "OrderedDict[Tuple[str, int], Tuple[None, float]]" = OrderedDict()
+
+_FLUSH_LOCK = asyncio.Lock()
+_flush_event: Optional[asyncio.Event] = None
+_flush_task: Optional[asyncio.Task] = None
+_failed_flushes = 0
+
+
+def _seen_recently(recent: OrderedDict, key, value, now: float) -> bool:
+    """Return True if key was queued with the same value within RECENT_TTL"""
+    entry = recent.get(key)
+    if entry is not None and entry[0] == value and now - entry[1] < RECENT_TTL:
+        recent.move_to_end(key)
+        return True
+    recent[key] = (value, now)
+    recent.move_to_end(key)
+    if len(recent) > RECENT_LIMIT:
+        recent.popitem(last=False)
+    return False
+
+
+def _pending_count() -> int:
+    return len(PENDING_USERS) + len(PENDING_CHATS) + len(PENDING_MEMBERS)
+
+
+def queue_user_update(user_id, username, chat_id=None, chat_name=None) -> None:
+    """Non-blocking variant of update_user; the write happens on the next flush"""
+    now = time.time()
+    if not _seen_recently(_RECENT_USERS, user_id, username, now):
+        PENDING_USERS[user_id] = (username, int(now))
+
+    if chat_id and chat_name:
+        chat_id = str(chat_id)
+        if not _seen_recently(_RECENT_CHATS, chat_id, chat_name, now):
+            PENDING_CHATS[chat_id] = chat_name
+        if not _seen_recently(_RECENT_MEMBERS, (chat_id, user_id), None, now):
+            PENDING_MEMBERS.add((chat_id, user_id))
+
+    if _flush_event is not None and _pending_count() >= FLUSH_THRESHOLD:
+        _flush_event.set()
+
+
+def _forget_recent(chat_id=None, user_id=None) -> None:
+    """Drop buffered and recently-seen entries of a removed chat or user"""
+    if chat_id is not None:
+        chat_id = str(chat_id)
+        PENDING_CHATS.pop(chat_id, None)
+        _RECENT_CHATS.pop(chat_id, None)
+    if user_id is not None:
+        PENDING_USERS.pop(user_id, None)
+        _RECENT_USERS.pop(user_id, None)
+    for key in [k for k in PENDING_MEMBERS if k[0] == chat_id or k[1] == user_id]:
+        PENDING_MEMBERS.discard(key)
+    for key in [k for k in _RECENT_MEMBERS if k[0] == chat_id or k[1] == user_id]:
+        del _RECENT_MEMBERS[key]
+
+
+def _batches(rows: List[dict]):
+    for i in range(0, len(rows), FLUSH_BATCH_SIZE):
+        yield rows[i:i + FLUSH_BATCH_SIZE]
+
+
+def _upsert_users(batch: List[dict]):
+    stmt = pg_insert(Users).values(batch)
+    return stmt.on_conflict_do_update(
+        index_elements=[Users.user_id],
+        set_={"username": stmt.excluded.username, "last_updated": stmt.excluded.last_updated},
+    )
+
+
+def _insert_placeholder_users(batch: List[dict]):
+    return pg_insert(Users).values(batch).on_conflict_do_nothing(index_elements=[Users.user_id])
+
+
+def _upsert_chats(batch: List[dict]):
+    stmt = pg_insert(Chats).values(batch)
+    return stmt.on_conflict_do_update(
+        index_elements=[Chats.chat_id], set_={"chat_name": stmt.excluded.chat_name},
+    )
+
+
+def _insert_placeholder_chats(batch: List[dict]):
+    return pg_insert(Chats).values(batch).on_conflict_do_nothing(index_elements=[Chats.chat_id])
+
+
+def _insert_members(batch: List[dict]):
+    return pg_insert(ChatMembers).values(batch).on_conflict_do_nothing(constraint="_chat_members_uc")
+
+
+async def _write_steps(steps) -> None:
+    async with session_scope() as session:
+        for rows, build in steps:
+            for batch in _batches(rows):
+                await session.execute(build(batch))
+
+
+async def _write_steps_salvaging(steps) -> int:
+    """Write one transaction per batch; rows of a batch that breaks a constraint
+    are retried one by one and dropped if they still fail. Returns rows dropped."""
+    dropped = 0
+    for rows, build in steps:
+        for batch in _batches(rows):
+            try:
+                async with session_scope() as session:
+                    await session.execute(build(batch))
+                continue
+            except IntegrityError:
+                pass
+            for row in batch:
+                try:
+                    async with session_scope() as session:
+                        await session.execute(build([row]))
+                except IntegrityError as excp:
+                    dropped += 1
+                    LOGGER.warning("Dropping unwritable row %s: %s", row, excp.orig)
+    return dropped
+
+
+async def flush_pending_updates() -> int:
+    """Write all buffered user/chat/membership updates; returns rows written"""
+    global PENDING_USERS, PENDING_CHATS, PENDING_MEMBERS, _failed_flushes
+    async with _FLUSH_LOCK:
+        if not _pending_count():
+            return 0
+        users, PENDING_USERS = PENDING_USERS, {}
+        chats, PENDING_CHATS = PENDING_CHATS, {}
+        members, PENDING_MEMBERS = PENDING_MEMBERS, set()
+
+        user_rows = [
+            {"user_id": user_id, "username": username, "last_updated": seen}
+            for user_id, (username, seen) in users.items()
+        ]
+        # Membership rows need both parents, make sure every user and chat exists
+        now = int(time.time())
+        placeholder_rows = [
+            {"user_id": user_id, "username": None, "last_updated": now}
+            for user_id in {user_id for _, user_id in members} - users.keys()
+        ]
+        chat_rows = [
+            {"chat_id": chat_id, "chat_name": chat_name}
+            for chat_id, chat_name in chats.items()
+        ]
+        # The chat upsert was skipped as recently seen, but the row may be gone since.
+        # Named after its id; forgetting it lets the next message write the real name.
+        placeholder_chat_rows = []
+        for chat_id in {chat_id for chat_id, _ in members} - chats.keys():
+            placeholder_chat_rows.append({"chat_id": chat_id, "chat_name": chat_id})
+            _RECENT_CHATS.pop(chat_id, None)
+        member_rows = [
+            {"chat": chat_id, "user": user_id, "joined_date": now}
+            for chat_id, user_id in members
+        ]
+        steps = (
+            (user_rows, _upsert_users),
+            (placeholder_rows, _insert_placeholder_users),
+            (chat_rows, _upsert_chats),
+            (placeholder_chat_rows, _insert_placeholder_chats),
+            (member_rows, _insert_members),
+        )
+        written = len(user_rows) + len(chat_rows) + len(member_rows)
+
+        try:
+            try:
+                await _write_steps(steps)
+            except IntegrityError:
+                LOGGER.warning("Pending user updates broke a constraint, writing them batch by batch")
+                written -= await _write_steps_salvaging(steps)
+        except Exception:
+            _failed_flushes += 1
+            if _failed_flushes >= MAX_FLUSH_ATTEMPTS:
+                LOGGER.exception(
+                    "Dropping %s pending user updates after %s failed flushes", written, _failed_flushes
+                )
+                _failed_flushes = 0
+                return 0
+            LOGGER.exception("Failed to flush pending user updates")
+            # Put the rows back without overriding anything queued meanwhile
+            for user_id, value in users.items():
+                PENDING_USERS.setdefault(user_id, value)
+            for chat_id, chat_name in chats.items():
+                PENDING_CHATS.setdefault(chat_id, chat_name)
+            PENDING_MEMBERS.update(members)
+            return 0
+        _failed_flushes = 0
+        return written
+
+
+async def _write_behind_loop():
+    while True:
+        try:
+            await asyncio.wait_for(_flush_event.wait(), timeout=FLUSH_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        _flush_event.clear()
+        await flush_pending_updates()
+
+
+def start_write_behind() -> None:
+    """Start the background flusher (call from the running event loop)"""
+    global _flush_event, _flush_task
+    if _flush_task is not None and not _flush_task.done():
+        return
+    _flush_event = asyncio.Event()
+    _flush_task = asyncio.create_task(_write_behind_loop())
+
+
+async def stop_write_behind() -> None:
+    """Stop the background flusher and write whatever is still buffered"""
+    global _flush_task
+    if _flush_task is not None:
+        _flush_task.cancel()
+        try:
+            await _flush_task
+        except asyncio.CancelledError:
+            pass
+        _flush_task = None
+    await flush_pending_updates()
+
+
 async def get_userid_by_name(username):
     async with async_session() as session:
         result = await session.execute(
@@ -196,6 +438,31 @@ async def get_all_users():
         return result.scalars().all()
 
 
+async def get_chat_ids_after(after: Optional[str] = None, limit: int = 500) -> List[str]:
+    rows = await keyset_page((Chats.chat_id,), None if after is None else str(after), limit)
+    return [chat_id for chat_id, in rows]
+
+
+async def get_user_ids_after(after: Optional[int] = None, limit: int = 500) -> List[int]:
+    rows = await keyset_page((Users.user_id,), None if after is None else int(after), limit)
+    return [user_id for user_id, in rows]
+
+
+def iter_chats(page_size: int = ITER_PAGE_SIZE) -> AsyncIterator[Tuple[str, str]]:
+    """Yield (chat_id, chat_name) for every chat, in chat_id order"""
+    return iter_keyset((Chats.chat_id, Chats.chat_name), page_size)
+
+
+def iter_users(page_size: int = ITER_PAGE_SIZE) -> AsyncIterator[Tuple[int, Optional[str]]]:
+    """Yield (user_id, username) for every user, in user_id order"""
+    return iter_keyset((Users.user_id, Users.username), page_size)
+
+
+def iter_chat_members(chat_id, page_size: int = ITER_PAGE_SIZE) -> AsyncIterator[Tuple[int]]:
+    """Yield (user_id,) for every member recorded in chat_id"""
+    return iter_keyset((ChatMembers.user,), page_size, ChatMembers.chat == str(chat_id))
+
+
 async def get_user_num_chats(user_id):
     async with async_session() as session:
         result = await session.execute(
@@ -227,6 +494,8 @@ async def num_users():
 
 
 async def migrate_chat(old_chat_id, new_chat_id):
+    await flush_pending_updates()
+    _forget_recent(chat_id=old_chat_id)
     async with INSERTION_LOCK:
         async with session_scope() as session:
             # Update chat
@@ -244,6 +513,7 @@ async def migrate_chat(old_chat_id, new_chat_id):
 
 
 async def del_user(user_id):
+    _forget_recent(user_id=user_id)
     async with INSERTION_LOCK:
         async with session_scope() as session:
             # Delete user
@@ -262,6 +532,7 @@ async def del_user(user_id):
 
 
 async def rem_chat(chat_id):
+    _forget_recent(chat_id=chat_id)
     async with INSERTION_LOCK:
         async with session_scope() as session:
             result = await session.execute(select(Chats).where(Chats.chat_id == str(chat_id)))
@@ -2,6 +2,8 @@ import asyncio
 import time
 from typing import Dict, List, Optional, Tuple, Union
 
+from .chat_config_sql import bump_config_version, invalidate_chat_config
+from .chat_features_sql import Feature, load_feature, set_feature
 from .db_connection import BASE, async_session, async_engine
 from sqlalchemy import Boolean, Column, Integer, String, UnicodeText, distinct, func
 from sqlalchemy.future import select
@@ -141,6 +143,8 @@ async def add_warn_filter(chat_id: Union[int, str], keyword: str, reply: str) ->
                 if keyword not in WARN_FILTERS[str(chat_id)]:
                     WARN_FILTERS[str(chat_id)].append(keyword)
                     WARN_FILTERS[str(chat_id)].sort(key=lambda x: (-len(x), x))
+                set_feature(chat_id, Feature.WARN_FILTERS, True)
+                bump_config_version(chat_id)
 
                 # Update database
                 warn_filt = WarnFilters(chat_id, keyword, reply)
@@ -154,6 +158,8 @@ async def remove_warn_filter(chat_id: Union[int, str], keyword: str) -> bool:
                 # Update cache
                 if keyword in WARN_FILTERS.get(str(chat_id), []):
                     WARN_FILTERS[str(chat_id)].remove(keyword)
+                set_feature(chat_id, Feature.WARN_FILTERS, bool(WARN_FILTERS.get(str(chat_id))))
+                bump_config_version(chat_id)
 
                 # Update database
                 result = await session.execute(
@@ -194,6 +200,7 @@ async def set_warn_limit(chat_id: Union[int, str], warn_limit: int) -> None:
                     setting.updated_at = int(time.time())
                 
                 session.add(setting)
+    invalidate_chat_config(chat_id)
 
 
 async def set_warn_strength(chat_id: Union[int, str], soft_warn: bool) -> None:
@@ -208,6 +215,7 @@ async def set_warn_strength(chat_id: Union[int, str], soft_warn: bool) -> None:
                     setting.updated_at = int(time.time())
                 
                 session.add(setting)
+    invalidate_chat_config(chat_id)
 
 
 async def get_warn_setting(chat_id: Union[int, str]) -> Tuple[int, bool]:
@@ -277,6 +285,7 @@ async def __load_chat_warn_filters() -> None:
             chat_id: sorted(set(keywords), key=lambda x: (-len(x), x))
             for chat_id, keywords in WARN_FILTERS.items()
         }
+        load_feature(Feature.WARN_FILTERS, [chat_id for chat_id, keywords in WARN_FILTERS.items() if keywords])
 
 
 async def migrate_chat(old_chat_id: Union[int, str], new_chat_id: Union[int, str]) -> None:
@@ -304,6 +313,8 @@ async def migrate_chat(old_chat_id: Union[int, str], new_chat_id: Union[int, str
                 if str(old_chat_id) in WARN_FILTERS:
                     WARN_FILTERS[str(new_chat_id)] = WARN_FILTERS[str(old_chat_id)]
                     del WARN_FILTERS[str(old_chat_id)]
+                set_feature(old_chat_id, Feature.WARN_FILTERS, False)
+                set_feature(new_chat_id, Feature.WARN_FILTERS, bool(WARN_FILTERS.get(str(new_chat_id))))
 
     # Warn settings migration
     async with WARN_SETTINGS_LOCK:
@@ -314,6 +325,8 @@ async def migrate_chat(old_chat_id: Union[int, str], new_chat_id: Union[int, str
                     .where(WarnSettings.chat_id == str(old_chat_id))
                     .values(chat_id=str(new_chat_id))
                 )
+    # The old chat's snapshot is handed over by migrate_chat_config once every module has moved
+    invalidate_chat_config(new_chat_id)
 
 
 # Improved initialization with state tracking
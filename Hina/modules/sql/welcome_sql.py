@@ -2,6 +2,7 @@ import random
 from typing import Union
 
 from Hina.modules.helper_funcs.msg_types import Types
+from .chat_config_sql import invalidate_chat_config, peek_chat_config
 from .db_connection import BASE, async_session, session_scope
 from sqlalchemy import BigInteger, Boolean, Column, Integer, String, UnicodeText
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -254,7 +255,68 @@ class Welcome(BASE):
     def __repr__(self):
         return f"<Chat {self.chat_id} should Welcome new users: {self.should_welcome}>"
 
-# [Keep all the other model classes unchanged...]
+class WelcomeButtons(BASE):
+    __tablename__ = "welcome_urls"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    chat_id = Column(String(14), primary_key=True)
+    name = Column(UnicodeText, nullable=False)
+    url = Column(UnicodeText, nullable=False)
+    same_line = Column(Boolean, default=False)
+
+    def __init__(self, chat_id, name, url, same_line=False):
+        self.chat_id = str(chat_id)
+        self.name = name
+        self.url = url
+        self.same_line = same_line
+
+
+class GoodbyeButtons(BASE):
+    __tablename__ = "leave_urls"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    chat_id = Column(String(14), primary_key=True)
+    name = Column(UnicodeText, nullable=False)
+    url = Column(UnicodeText, nullable=False)
+    same_line = Column(Boolean, default=False)
+
+    def __init__(self, chat_id, name, url, same_line=False):
+        self.chat_id = str(chat_id)
+        self.name = name
+        self.url = url
+        self.same_line = same_line
+
+
+class WelcomeMute(BASE):
+    __tablename__ = "welcome_mutes"
+    chat_id = Column(String(14), primary_key=True)
+    welcomemutes = Column(UnicodeText, default=False)
+
+    def __init__(self, chat_id, welcomemutes):
+        self.chat_id = str(chat_id)
+        self.welcomemutes = welcomemutes
+
+
+class WelcomeMuteUsers(BASE):
+    __tablename__ = "human_checks"
+    user_id = Column(BigInteger, primary_key=True)
+    chat_id = Column(String(14), primary_key=True)
+    human_check = Column(Boolean)
+
+    def __init__(self, user_id, chat_id, human_check):
+        self.user_id = user_id
+        self.chat_id = str(chat_id)
+        self.human_check = human_check
+
+
+class CleanServiceSetting(BASE):
+    __tablename__ = "clean_service"
+    chat_id = Column(String(14), primary_key=True)
+    clean_service = Column(Boolean, default=True)
+
+    def __init__(self, chat_id):
+        self.chat_id = str(chat_id)
+
+    def __repr__(self):
+        return f"<Chat used clean service ({self.chat_id})>"
 
 async def welcome_mutes(chat_id):
     async with AsyncSession(async_session().bind) as session:
@@ -275,6 +337,7 @@ async def set_welcome_mutes(chat_id, welcomemutes):
             welcome_m = WelcomeMute(str(chat_id), welcomemutes)
             session.add(welcome_m)
             await session.commit()
+    invalidate_chat_config(chat_id)
 
 async def set_human_checks(user_id, chat_id):
     async with AsyncSession(async_session().bind) as session:
@@ -347,6 +410,10 @@ async def set_clean_welcome(chat_id, clean_welcome):
             curr.clean_welcome = int(clean_welcome)
             session.add(curr)
             await session.commit()
+    # Rewritten on every join; patch the snapshot rather than forcing a reload
+    config = peek_chat_config(chat_id)
+    if config is not None:
+        config.clean_welcome = int(clean_welcome)
 
 async def get_clean_pref(chat_id):
     async with AsyncSession(async_session().bind) as session:
@@ -368,6 +435,7 @@ async def set_welc_preference(chat_id, should_welcome):
 
             session.add(curr)
             await session.commit()
+    invalidate_chat_config(chat_id)
 
 async def set_gdbye_preference(chat_id, should_goodbye):
     async with AsyncSession(async_session().bind) as session:
@@ -381,6 +449,7 @@ async def set_gdbye_preference(chat_id, should_goodbye):
 
             session.add(curr)
             await session.commit()
+    invalidate_chat_config(chat_id)
 
 async def set_custom_welcome(
     chat_id,
@@ -418,6 +487,7 @@ async def set_custom_welcome(
                 session.add(button)
 
             await session.commit()
+    invalidate_chat_config(chat_id)
 
 async def get_custom_welcome(chat_id):
     async with AsyncSession(async_session().bind) as session:
@@ -456,6 +526,7 @@ async def set_custom_gdbye(chat_id, custom_goodbye, goodbye_type, buttons=None):
                 session.add(button)
 
             await session.commit()
+    invalidate_chat_config(chat_id)
 
 async def get_custom_gdbye(chat_id):
     async with AsyncSession(async_session().bind) as session:
@@ -502,6 +573,7 @@ async def set_clean_service(chat_id: Union[int, str], setting: bool):
             chat_setting.clean_service = setting
             session.add(chat_setting)
             await session.commit()
+    invalidate_chat_config(chat_id)
 
 async def migrate_chat(old_chat_id, new_chat_id):
     async with AsyncSession(async_session().bind) as session:
@@ -528,3 +600,5 @@ async def migrate_chat(old_chat_id, new_chat_id):
             )
 
             await session.commit()
+    # The old chat's snapshot is handed over by migrate_chat_config once every module has moved
+    invalidate_chat_config(new_chat_id)
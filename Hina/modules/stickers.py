@@ -1,9 +1,5 @@
 from Hina.config import app
-import os
-import math
-import requests
-import urllib.request as urllib
-from PIL import Image, ImageOps
+from io import BytesIO
 from html import escape
 from bs4 import BeautifulSoup as bs
 import re
@@ -21,6 +17,7 @@ from telegram.helpers import mention_html
 from telegram.ext import ContextTypes, CommandHandler, BaseHandler
 
 from Hina.modules.disable import DisableAbleCommandHandler
+from Hina.modules.helper_funcs import http_client, image_pipeline
 
 combot_stickers_url = "https://combot.org/telegram/stickers?q="
 
@@ -70,7 +67,7 @@ async def cb_sticker(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
     search_query = " ".join(args)
     try:
-        text = requests.get(combot_stickers_url + search_query).text
+        text = await http_client.get_text(combot_stickers_url + search_query)
         soup = bs(text, "lxml")
         results = soup.find_all("a", {"class": "sticker-pack__btn"})
         titles = soup.find_all("div", "sticker-pack__title")
@@ -112,31 +109,33 @@ async def getsticker(update: Update, context: ContextTypes.DEFAULT_TYPE):
             
         try:
             file = await context.bot.get_file(sticker.file_id)
-            await file.download_to_drive(f"{sticker.file_unique_id}.png")
-            
-            with open(f"{sticker.file_unique_id}.png", "rb") as f:
-                await context.bot.send_document(
-                    chat_id, 
-                    document=f,
-                    caption=f"Sticker PNG for @{user.username}" if user.username else "Sticker PNG",
-                    filename=f"{sticker.file_unique_id}.png"
-                )
-            os.remove(f"{sticker.file_unique_id}.png")
+            data = bytes(await file.download_as_bytearray())
+            png = await image_pipeline.convert(
+                image_pipeline.plain_png, data, user.id, sticker.file_unique_id,
+            )
+            await context.bot.send_document(
+                chat_id,
+                document=BytesIO(png),
+                caption=f"Sticker PNG for @{user.username}" if user.username else "Sticker PNG",
+                filename=f"{sticker.file_unique_id}.png"
+            )
+        except image_pipeline.PipelineBusy as e:
+            await msg.reply_text(str(e))
         except Exception as e:
             await msg.reply_text(f"Failed to process sticker: {str(e)}")
     elif replied.photo:
         try:
-            file = await context.bot.get_file(replied.photo[-1].file_id)
-            await file.download_to_drive("photo.png")
-            
-            with Image.open("photo.png") as img:
-                img.save("sticker.png", "PNG")
-                
-            with open("sticker.png", "rb") as f:
-                await context.bot.send_document(chat_id, document=f)
-                
-            os.remove("photo.png")
-            os.remove("sticker.png")
+            photo = replied.photo[-1]
+            file = await context.bot.get_file(photo.file_id)
+            data = bytes(await file.download_as_bytearray())
+            png = await image_pipeline.convert(
+                image_pipeline.plain_png, data, user.id, photo.file_unique_id,
+            )
+            await context.bot.send_document(
+                chat_id, document=BytesIO(png), filename=f"{photo.file_unique_id}.png",
+            )
+        except image_pipeline.PipelineBusy as e:
+            await msg.reply_text(str(e))
         except Exception as e:
             await msg.reply_text(f"Failed to process photo: {str(e)}")
     else:
@@ -151,7 +150,8 @@ async def kang(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Initialize variables
     pack_prefix = "a"
     pack_format = StickerFormat.STATIC
-    file_path = "kangsticker.png"
+    sticker_bytes = None
+    source_id = None
     animated = False
     video = False
     emoji = "🤔"
@@ -165,7 +165,7 @@ async def kang(update: Update, context: ContextTypes.DEFAULT_TYPE):
             url = args[0]
             try:
                 # Download from URL
-                urllib.request.urlretrieve(url, file_path)
+                sticker_bytes = await http_client.get_bytes(url)
                 kang_image = True
                 
                 # Set emoji if provided
@@ -191,28 +191,29 @@ async def kang(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 pack_prefix = "animated"
                 pack_format = StickerFormat.ANIMATED
                 animated = True
-                file_path = "kangsticker.tgs"
             elif replied.sticker.is_video:
                 pack_prefix = "video"
                 pack_format = StickerFormat.VIDEO
                 video = True
-                file_path = "kangsticker.webm"
             else:
                 kang_image = True
             kang_file = await replied.sticker.get_file()
+            source_id = replied.sticker.file_unique_id
         elif replied.photo:
             kang_image = True
             kang_file = await replied.photo[-1].get_file()
+            source_id = replied.photo[-1].file_unique_id
         elif replied.document and replied.document.mime_type in ["image/png", "image/jpeg"]:
             kang_image = True
             kang_file = await replied.document.get_file()
+            source_id = replied.document.file_unique_id
         else:
             await msg.reply_text("Unsupported file type!")
             return
 
         # Download sticker content if not URL kang
         if not url_kang:
-            await kang_file.download_to_drive(file_path)
+            sticker_bytes = bytes(await kang_file.download_as_bytearray())
 
         # Determine emoji from args or sticker
         if args:
@@ -225,36 +226,14 @@ async def kang(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Process static images (resize and make sticker-ready)
     if kang_image:
         try:
-            with Image.open(file_path) as img:
-                # Remove alpha channel for JPEG compatibility
-                if img.mode == "RGBA":
-                    img = img.convert("RGB")
-                
-                # Resize with proper aspect ratio
-                width, height = img.size
-                max_size = 512
-                
-                if width > height:
-                    new_width = max_size
-                    new_height = int(height * (max_size / width))
-                else:
-                    new_height = max_size
-                    new_width = int(width * (max_size / height))
-                
-                img = img.resize((new_width, new_height), Image.LANCZOS)
-                
-                # Create canvas with transparent background
-                canvas = Image.new("RGBA", (max_size, max_size), (0, 0, 0, 0))
-                position = (
-                    (max_size - new_width) // 2,
-                    (max_size - new_height) // 2
-                )
-                canvas.paste(img, position)
-                canvas.save(file_path, "PNG")
+            sticker_bytes = await image_pipeline.convert(
+                image_pipeline.sticker_png, sticker_bytes, user.id, source_id,
+            )
+        except image_pipeline.PipelineBusy as e:
+            await msg.reply_text(str(e))
+            return
         except Exception as e:
             await msg.reply_text(f"Error processing image: {str(e)}")
-            if os.path.exists(file_path):
-                os.remove(file_path)
             return
 
     # Find or create pack
@@ -281,37 +260,34 @@ async def kang(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 break  # Pack doesn't exist
             else:
                 await msg.reply_text(f"Error: {str(e)}")
-                if os.path.exists(file_path):
-                    os.remove(file_path)
                 return
 
     try:
         # Create input sticker
-        with open(file_path, "rb") as sticker_file:
-            sticker_data = InputSticker(
-                sticker=sticker_file,
-                emoji_list=[emoji]
+        sticker_data = InputSticker(
+            sticker=sticker_bytes,
+            emoji_list=[emoji]
+        )
+
+        if pack_found:
+            # Add to existing pack
+            await context.bot.add_sticker_to_set(
+                user_id=user.id,
+                name=pack_name,
+                sticker=sticker_data,
+                format=pack_format
+            )
+        else:
+            # Create new pack
+            await context.bot.create_new_sticker_set(
+                user_id=user.id,
+                name=pack_name,
+                title=pack_title,
+                stickers=[sticker_data],
+                sticker_format=pack_format
             )
+            created_new = True
 
-            if pack_found:
-                # Add to existing pack
-                await context.bot.add_sticker_to_set(
-                    user_id=user.id,
-                    name=pack_name,
-                    sticker=sticker_data,
-                    format=pack_format
-                )
-            else:
-                # Create new pack
-                await context.bot.create_new_sticker_set(
-                    user_id=user.id,
-                    name=pack_name,
-                    title=pack_title,
-                    stickers=[sticker_data],
-                    sticker_format=pack_format
-                )
-                created_new = True
-                
         # Format success message
         message_text = (
             f"Sticker successfully {'added to' if not created_new else 'kanged to new'} "
@@ -343,9 +319,6 @@ async def kang(update: Update, context: ContextTypes.DEFAULT_TYPE):
             error_message = "Please start a private chat with me first to create sticker packs."
             
         await msg.reply_text(error_message)
-    finally:
-        if os.path.exists(file_path):
-            os.remove(file_path)
 
 async def sticker_packs(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user = update.effective_user
@@ -1,23 +1,26 @@
 from Hina.config import app
-import requests
 from Hina.modules.disable import DisableAbleCommandHandler
+from Hina.modules.helper_funcs import http_client, response_cache
 from telegram import Update
 from telegram.constants import ParseMode
-from telegram.constants import ParseMode
 from telegram.ext import ContextTypes, BaseHandler
 
 
-def ud(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def ud(update: Update, context: ContextTypes.DEFAULT_TYPE):
     message = update.effective_message
     text = message.text[len("/ud ") :]
-    results = requests.get(
-        f"https://api.urbandictionary.com/v0/define?term={text}",
-    ).json()
+    results = await response_cache.cached(
+        "ud",
+        (text,),
+        lambda: http_client.get_json(
+            "https://api.urbandictionary.com/v0/define", params={"term": text},
+        ),
+    )
     try:
         reply_text = f'*{text}*\n\n{results["list"][0]["definition"]}\n\n_{results["list"][0]["example"]}_'
     except:
         reply_text = "No results found."
-    message.reply_text(reply_text, parse_mode=ParseMode.MARKDOWN)
+    await message.reply_text(reply_text, parse_mode=ParseMode.MARKDOWN)
 
 
 UD_HANDLER = DisableAbleCommandHandler(["ud"], ud)
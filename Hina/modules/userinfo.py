@@ -2,7 +2,6 @@ from Hina.config import app, INFOPIC, DEV_USERS, OWNER_ID, DRAGONS, DEMONS, TIGE
 import html
 import re
 import os
-import requests
 
 from telegram import (
     Update,
@@ -26,6 +25,7 @@ from Hina.modules.sql.afk_sql import is_afk, check_afk_status
 from Hina.modules.sql.users_sql import get_user_num_chats
 from Hina.modules.helper_funcs.chat_status import sudo_plus
 from Hina.modules.helper_funcs.extraction import extract_user
+from Hina.modules.helper_funcs.spamwatch_client import sw
 
 
 async def no_by_per(totalhp, percentage):
@@ -181,7 +181,7 @@ async def info(update: Update, context: ContextTypes.DEFAULT_TYPE):
         text += f"\n\n<b>Health:</b> <code>{userhp['earnedhp']}/{userhp['totalhp']}</code>\n[<i>{await make_bar(int(userhp['percentage']))} </i>{userhp['percentage']}%]"
 
     try:
-        spamwtc = await sw.get_ban(int(user.id))
+        spamwtc = await sw.get_ban(int(user.id)) if sw.configured else None
         if spamwtc:
             text += "\n\n<b>This person is Spamwatched!</b>"
             text += f"\nReason: <pre>{spamwtc.reason}</pre>"
@@ -1,6 +1,6 @@
 from Hina.config import app
-from io import BytesIO
-from time import sleep
+import tempfile
+import time
 
 from telegram import Update
 from telegram.constants import ParseMode
@@ -13,13 +13,18 @@ from telegram.ext import (
     BaseHandler
 )
 
+import Hina.modules.sql.broadcast_sql as broadcast_sql
 import Hina.modules.sql.users_sql as sql
 from Hina.config import DEV_USERS, LOGGER, OWNER_ID, app
-from Hina.modules.helper_funcs.chat_status import dev_plus, sudo_plus
-from Hina.modules.sql.users_sql import get_all_users
+from Hina.modules.helper_funcs import broadcast_jobs
+from Hina.modules.helper_funcs.chat_status import dev_plus, get_bot_member, sudo_plus
+from Hina.modules.helper_funcs.misc import LIST_SPOOL_SIZE
+from Hina.modules.helper_funcs.send_scheduler import scheduler
 
 USERS_GROUP = 4
 CHAT_GROUP = 5
+# /groups looks up this many member counts at once, and spills to disk past LIST_SPOOL_SIZE
+CHATLIST_PAGE_SIZE = 200
 DEV_USERS.add(int(OWNER_ID))
 DEV_AND_MORE = DEV_USERS
 
@@ -56,7 +61,7 @@ def get_user_id(username):
 
 
 @dev_plus
-def broadcast(update: Update, context: ContextTypes):
+async def broadcast(update: Update, context: ContextTypes):
     to_send = update.effective_message.text.split(None, 1)
 
     if len(to_send) >= 2:
@@ -64,51 +69,89 @@ def broadcast(update: Update, context: ContextTypes):
         to_user = False
         if to_send[0] == "/broadcastgroups":
             to_group = True
-        if to_send[0] == "/broadcastusers":
+        elif to_send[0] == "/broadcastusers":
             to_user = True
         else:
             to_group = to_user = True
-        chats = sql.get_all_chats() or []
-        users = get_all_users()
-        failed = 0
-        failed_user = 0
-        if to_group:
-            for chat in chats:
-                try:
-                    context.bot.sendMessage(
-                        int(chat.chat_id),
-                        to_send[1],
-                        parse_mode="MARKDOWN",
-                        disable_web_page_preview=True,
-                    )
-                    sleep(0.1)
-                except TelegramError:
-                    failed += 1
-        if to_user:
-            for user in users:
-                try:
-                    context.bot.sendMessage(
-                        int(user.user_id),
-                        to_send[1],
-                        parse_mode="MARKDOWN",
-                        disable_web_page_preview=True,
-                    )
-                    sleep(0.1)
-                except TelegramError:
-                    failed_user += 1
-        update.effective_message.reply_text(
-            f"Broadcast complete.\nGroups failed: {failed}.\nUsers failed: {failed_user}.",
+        # Runs in the background and survives restarts, see /broadcasts
+        job_id = await broadcast_jobs.start_job(
+            context.bot,
+            to_send[1],
+            to_group,
+            to_user,
+            update.effective_user.id,
+            update.effective_chat.id,
         )
+        await update.effective_message.reply_text(
+            f"Broadcast #{job_id} started. Check on it with /broadcasts, "
+            f"stop it with /broadcastcancel {job_id}.",
+        )
+
+
+def _describe(progress) -> str:
+    elapsed = int(time.time() - progress.started_at)
+    return (
+        f"#{progress.job_id}: sending to {progress.phase}, {progress.sent} done in {elapsed}s "
+        f"({progress.delivered} delivered, {progress.failed} failed, {progress.blocked} blocked)"
+    )
+
+
+@dev_plus
+async def broadcast_status(update: Update, context: ContextTypes):
+    args = context.args
+    if args and args[0].isdigit():
+        job_id = int(args[0])
+        progress = broadcast_jobs.get_progress(job_id)
+        if progress:
+            text = _describe(progress)
+        else:
+            job = await broadcast_sql.get_job(job_id)
+            if not job:
+                await update.effective_message.reply_text("No broadcast with that id.")
+                return
+            text = (
+                f"#{job.job_id}: {job.status} "
+                f"({job.delivered} delivered, {job.failed} failed, {job.blocked} blocked)"
+            )
+        await update.effective_message.reply_text(text)
+        return
 
+    running = broadcast_jobs.running_jobs()
+    if running:
+        text = "Running broadcasts:\n" + "\n".join(_describe(progress) for progress in running)
+    else:
+        text = "No broadcasts are running."
+    recent = [job for job in await broadcast_sql.get_recent_jobs() if job.status != broadcast_sql.RUNNING]
+    if recent:
+        text += "\n\nRecent broadcasts:\n" + "\n".join(
+            f"#{job.job_id}: {job.status} ({job.delivered} delivered, "
+            f"{job.failed} failed, {job.blocked} blocked)"
+            for job in recent
+        )
+    await update.effective_message.reply_text(text)
 
-def log_user(update: Update, context: ContextTypes):
+
+@dev_plus
+async def broadcast_cancel(update: Update, context: ContextTypes):
+    args = context.args
+    if not args or not args[0].isdigit():
+        await update.effective_message.reply_text("Give me the id of the broadcast to cancel.")
+        return
+    if broadcast_jobs.cancel_job(int(args[0])):
+        await update.effective_message.reply_text("Cancelling, the final report follows shortly.")
+    else:
+        await update.effective_message.reply_text("That broadcast isn't running.")
+
+
+async def log_user(update: Update, context: ContextTypes):
     chat = update.effective_chat
     msg = update.effective_message
 
-    sql.update_user(msg.from_user.id, msg.from_user.username, chat.id, chat.title)
+    # Buffered in memory, written out in batches by users_sql's write-behind task
+    sql.queue_user_update(msg.from_user.id, msg.from_user.username, chat.id, chat.title)
 
     if msg.reply_to_message:
-        sql.update_user(
+        sql.queue_user_update(
             msg.reply_to_message.from_user.id,
             msg.reply_to_message.from_user.username,
             chat.id,
@@ -116,40 +159,52 @@ def log_user(update: Update, context: ContextTypes):
         )
 
     if msg.forward_from:
-        sql.update_user(msg.forward_from.id, msg.forward_from.username)
+        sql.queue_user_update(msg.forward_from.id, msg.forward_from.username)
 
 
-@sudo_plus
-def chats(update: Update, context: ContextTypes):
-    all_chats = sql.get_all_chats() or []
-    chatfile = "List of chats.\n0. Chat name | Chat ID | Members count\n"
-    P = 1
-    for chat in all_chats:
-        try:
-            curr_chat = context.bot.getChat(chat.chat_id)
-            bot_member = curr_chat.get_member(context.bot.id)
-            chat_members = curr_chat.get_members_count(context.bot.id)
-            chatfile += "{}. {} | {} | {}\n".format(
-                P, chat.chat_name, chat.chat_id, chat_members,
-            )
-            P = P + 1
-        except:
-            pass
+async def _write_chat_page(output, bot, page, number: int) -> int:
+    counts = await scheduler.map(
+        bot.get_chat_member_count,
+        [(int(chat_id), (chat_id,)) for chat_id, _ in page],
+        per_chat=False,
+    )
+    for (chat_id, chat_name), chat_members in zip(page, counts):
+        if isinstance(chat_members, Exception):
+            continue
+        output.write(f"{number}. {chat_name} | {chat_id} | {chat_members}\n".encode())
+        number += 1
+    return number
 
-    with BytesIO(str.encode(chatfile)) as output:
-        output.name = "groups_list.txt"
-        update.effective_message.reply_document(
+
+@sudo_plus
+async def chats(update: Update, context: ContextTypes):
+    # Member counts are looked up a page at a time and written out as they arrive
+    with tempfile.SpooledTemporaryFile(max_size=LIST_SPOOL_SIZE) as output:
+        output.write(b"List of chats.\n0. Chat name | Chat ID | Members count\n")
+        number = 1
+        page = []
+        async for chat in sql.iter_chats():
+            page.append(chat)
+            if len(page) >= CHATLIST_PAGE_SIZE:
+                number = await _write_chat_page(output, context.bot, page, number)
+                page = []
+        if page:
+            await _write_chat_page(output, context.bot, page, number)
+
+        output.seek(0)
+        await update.effective_message.reply_document(
             document=output,
             filename="groups_list.txt",
             caption="Here be the list of groups in my database.",
         )
 
 
-def chat_checker(update: Update, context: ContextTypes):
+async def chat_checker(update: Update, context: ContextTypes):
     bot = context.bot
+    bot_member = await get_bot_member(update.effective_message.chat.id, bot.id)
     try:
-        if update.effective_message.chat.get_member(bot.id).can_send_messages is False:
-            bot.leaveChat(update.effective_message.chat.id)
+        if getattr(bot_member, "can_send_messages", None) is False:
+            await bot.leaveChat(update.effective_message.chat.id)
     except TelegramError:
         pass
 
@@ -177,16 +232,22 @@ __help__ = ""  # no help string
 USER_HANDLER = MessageHandler(filters.ALL & filters.ChatType.GROUPS, log_user)
 CHAT_CHECKER_HANDLER = MessageHandler(filters.ALL & filters.ChatType.GROUPS, chat_checker)
 BROADCAST_HANDLER = CommandHandler(["broadcastall", "broadcastusers", "broadcastgroups"], broadcast)
+BROADCAST_STATUS_HANDLER = CommandHandler("broadcasts", broadcast_status)
+BROADCAST_CANCEL_HANDLER = CommandHandler("broadcastcancel", broadcast_cancel)
 CHATLIST_HANDLER = CommandHandler("groups", chats)
 
 app.add_handler(USER_HANDLER, group=USERS_GROUP)
 app.add_handler(BROADCAST_HANDLER)
+app.add_handler(BROADCAST_STATUS_HANDLER)
+app.add_handler(BROADCAST_CANCEL_HANDLER)
 app.add_handler(CHATLIST_HANDLER)
 app.add_handler(CHAT_CHECKER_HANDLER, group=CHAT_GROUP)
 
 __handlers__ = [
     (USER_HANDLER, USERS_GROUP),
     BROADCAST_HANDLER,
+    BROADCAST_STATUS_HANDLER,
+    BROADCAST_CANCEL_HANDLER,
     CHATLIST_HANDLER,
     (CHAT_CHECKER_HANDLER, CHAT_GROUP)
 ]
@@ -1,9 +1,9 @@
 from Hina.config import app
 from random import randint
 
-import requests as r
 from Hina.config import SUPPORT_CHAT, WALL_API, app
 from Hina.modules.disable import DisableAbleCommandHandler
+from Hina.modules.helper_funcs import http_client
 from telegram import Update
 from telegram.constants import ParseMode
 from telegram.ext import ContextTypes, MessageHandler, BaseHandler
@@ -11,7 +11,7 @@ from telegram.ext import ContextTypes, MessageHandler, BaseHandler
 # Wallpapers module by @TheRealPhoenix using wall.alphacoders.com
 
 
-def wall(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def wall(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = update.effective_chat.id
     msg = update.effective_message
     args = context.args
@@ -19,34 +19,34 @@ def wall(update: Update, context: ContextTypes.DEFAULT_TYPE):
     bot = context.bot
     query = " ".join(args)
     if not query:
-        msg.reply_text("Please enter a query!")
+        await msg.reply_text("Please enter a query!")
         return
     else:
         caption = query
         term = query.replace(" ", "%20")
-        json_rep = r.get(
+        json_rep = (await http_client.get(
             f"https://wall.alphacoders.com/api2.0/get.php?auth={WALL_API}&method=search&term={term}",
-        ).json()
+        )).json()
         if not json_rep.get("success"):
-            msg.reply_text(f"An error occurred! Report this @{SUPPORT_CHAT}")
+            await msg.reply_text(f"An error occurred! Report this @{SUPPORT_CHAT}")
         else:
             wallpapers = json_rep.get("wallpapers")
             if not wallpapers:
-                msg.reply_text("No results found! Refine your search.")
+                await msg.reply_text("No results found! Refine your search.")
                 return
             else:
                 index = randint(0, len(wallpapers) - 1)  # Choose random index
                 wallpaper = wallpapers[index]
                 wallpaper = wallpaper.get("url_image")
                 wallpaper = wallpaper.replace("\\", "")
-                bot.send_photo(
+                await bot.send_photo(
                     chat_id,
                     photo=wallpaper,
                     caption="Preview",
                     reply_to_message_id=msg_id,
                     timeout=60,
                 )
-                bot.send_document(
+                await bot.send_document(
                     chat_id,
                     document=wallpaper,
                     filename="wallpaper",
@@ -13,15 +13,18 @@ from Hina.modules.helper_funcs.chat_status import (
     user_admin_no_reply
 )
 from Hina.modules.helper_funcs.extraction import (
-    extract_text,
     extract_user,
     extract_user_and_text,
 )
-from Hina.modules.helper_funcs.filters import CustomFilters
+from Hina.modules.helper_funcs.filters import ChatFeature, CustomFilters
 from Hina.modules.helper_funcs.misc import split_message
 from Hina.modules.helper_funcs.string_handling import split_quotes
+from Hina.modules.helper_funcs.text_view import get_text_view
+from Hina.modules.helper_funcs.verdict_cache import UNKNOWN, get_verdicts
 from Hina.modules.log_channel import loggable
 from Hina.modules.sql import warns_sql as sql
+from Hina.modules.sql.chat_config_sql import get_chat_config
+from Hina.modules.sql.chat_features_sql import Feature
 from telegram import (
     CallbackQuery,
     Chat,
@@ -48,27 +51,26 @@ WARN_HANDLER_GROUP = 9
 CURRENT_WARNING_FILTER_STRING = "<b>Current warning filters in this chat:</b>\n"
 
 
-# Not async
-def warn(
+async def warn(
     user: User, chat: Chat, reason: str, message: Message, warner: User = None
 ) -> str:
-    if is_user_admin(chat, user.id):
+    if await is_user_admin(chat, user.id):
         return ""
 
     if user.id in TIGERS:
         if warner:
-            message.reply_text("Tigers can't be warned.")
+            await message.reply_text("Tigers can't be warned.")
         else:
-            message.reply_text(
+            await message.reply_text(
                 "Tiger triggered an auto warn filter!\n I can't warn tigers but they should avoid abusing this.",
             )
         return ""
 
     if user.id in WOLVES:
         if warner:
-            message.reply_text("Wolf disasters are warn immune.")
+            await message.reply_text("Wolf disasters are warn immune.")
         else:
-            message.reply_text(
+            await message.reply_text(
                 "Wolf Disaster triggered an auto warn filter!\nI can't warn wolves but they should avoid abusing this.",
             )
         return ""
@@ -78,19 +80,20 @@ def warn(
     else:
         warner_tag = "Automated warn filter."
 
-    limit, soft_warn = sql.get_warn_setting(chat.id)
-    num_warns, reasons = sql.warn_user(user.id, chat.id, reason)
+    config = await get_chat_config(chat.id)
+    limit, soft_warn = config.warn_limit, config.soft_warn
+    num_warns, reasons = await sql.warn_user(user.id, chat.id, reason)
     if num_warns >= limit:
-        sql.reset_warns(user.id, chat.id)
+        await sql.reset_warns(user.id, chat.id)
         if soft_warn:  # punch
-            chat.ban_member(user.id, until_date=60)
+            await chat.ban_member(user.id, until_date=60)
             reply = (
                 f"<code>❕</code><b>Punch Event</b>\n"
                 f"<code> </code><b>•  User:</b> {mention_html(user.id, user.first_name)}\n"
                 f"<code> </code><b>•  Count:</b> {limit}"
             )
         else:  # ban
-            chat.ban_member(user.id)
+            await chat.ban_member(user.id)
             reply = (
                 f"<code>❕</code><b>Ban Event</b>\n"
                 f"<code> </code><b>•  User:</b> {mention_html(user.id, user.first_name)}\n"
@@ -138,11 +141,11 @@ def warn(
         )
 
     try:
-        message.reply_text(reply, reply_markup=keyboard, parse_mode=ParseMode.HTML)
+        await message.reply_text(reply, reply_markup=keyboard, parse_mode=ParseMode.HTML)
     except BadRequest as excp:
         if excp.message == "Reply message not found":
             # Do not reply
-            message.reply_text(
+            await message.reply_text(
                 reply, reply_markup=keyboard, parse_mode=ParseMode.HTML, quote=False,
             )
         else:
@@ -160,7 +163,7 @@ async def button(update: Update, context: ContextTypes.DEFAULT_TYPE) -> str:
     if match:
         user_id = match.group(1)
         chat: Optional[Chat] = update.effective_chat
-        res = sql.remove_warn(user_id, chat.id)
+        res = await sql.remove_warn(user_id, chat.id)
         if res:
             await query.message.edit_text(
                 f"Warn removed by {mention_html(user.id, user.first_name)}.",
@@ -189,7 +192,7 @@ async def warn_user(update: Update, context: ContextTypes.DEFAULT_TYPE) -> str:
     chat: Optional[Chat] = update.effective_chat
     warner: Optional[User] = update.effective_user
 
-    user_id, reason = extract_user_and_text(message, args)
+    user_id, reason = await extract_user_and_text(message, args)
     if message.text.startswith("/d") and message.reply_to_message:
         await message.reply_to_message.delete()
     if user_id:
@@ -221,10 +224,10 @@ async def reset_warns(update: Update, context: ContextTypes.DEFAULT_TYPE) -> str
     chat: Optional[Chat] = update.effective_chat
     user: Optional[User] = update.effective_user
 
-    user_id = extract_user(message, args)
+    user_id = await extract_user(message, args)
 
     if user_id:
-        sql.reset_warns(user_id, chat.id)
+        await sql.reset_warns(user_id, chat.id)
         await message.reply_text("Warns have been reset!")
         warned = await chat.get_member(user_id)
         return (
@@ -242,12 +245,13 @@ async def warns(update: Update, context: ContextTypes.DEFAULT_TYPE):
     args = context.args
     message: Optional[Message] = update.effective_message
     chat: Optional[Chat] = update.effective_chat
-    user_id = extract_user(message, args) or update.effective_user.id
-    result = sql.get_warns(user_id, chat.id)
+    user_id = await extract_user(message, args) or update.effective_user.id
+    result = await sql.get_warns(user_id, chat.id)
 
     if result and result[0] != 0:
         num_warns, reasons = result
-        limit, soft_warn = sql.get_warn_setting(chat.id)
+        config = await get_chat_config(chat.id)
+        limit, soft_warn = config.warn_limit, config.soft_warn
 
         if reasons:
             text = (
@@ -291,7 +295,7 @@ async def add_warn_filter(update: Update, context: ContextTypes.DEFAULT_TYPE):
         if handler.filters == (keyword, chat.id):
             context.application.remove_handler(handler, WARN_HANDLER_GROUP)
 
-    sql.add_warn_filter(chat.id, keyword, content)
+    await sql.add_warn_filter(chat.id, keyword, content)
 
     await update.effective_message.reply_text(f"Warn handler added for '{keyword}'!")
     raise DispatcherHandlerStop
@@ -314,7 +318,7 @@ async def remove_warn_filter(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
     to_remove = extracted[0]
 
-    chat_filters = sql.get_chat_warn_triggers(chat.id)
+    chat_filters = await sql.get_chat_warn_triggers(chat.id)
 
     if not chat_filters:
         await msg.reply_text("No warning filters are active here!")
@@ -322,7 +326,7 @@ async def remove_warn_filter(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
     for filt in chat_filters:
         if filt == to_remove:
-            sql.remove_warn_filter(chat.id, to_remove)
+            await sql.remove_warn_filter(chat.id, to_remove)
             await msg.reply_text("Okay, I'll stop warning people for that.")
             raise DispatcherHandlerStop
 
@@ -333,7 +337,7 @@ async def remove_warn_filter(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
 async def list_warn_filters(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat: Optional[Chat] = update.effective_chat
-    all_handlers = sql.get_chat_warn_triggers(chat.id)
+    all_handlers = await sql.get_chat_warn_triggers(chat.id)
 
     if not all_handlers:
         await update.effective_message.reply_text("No warning filters are active here!")
@@ -365,18 +369,20 @@ async def reply_filter(update: Update, context: ContextTypes.DEFAULT_TYPE) -> st
         return ""
     if is_approved(chat.id, user.id):
         return ""
-    chat_warn_filters = sql.get_chat_warn_triggers(chat.id)
-    to_match = extract_text(message)
-    if not to_match:
+    view = get_text_view(update, context)
+    if not view:
         return ""
-
-    for keyword in chat_warn_filters:
-        pattern = r"( |^|[^\w])" + re.escape(keyword) + r"( |$|[^\w])"
-        if re.search(pattern, to_match, flags=re.IGNORECASE):
-            user: Optional[User] = update.effective_user
-            warn_filter = sql.get_warn_filter(chat.id, keyword)
-            return await warn(user, chat, warn_filter.reply, message)
-    return ""
+    verdicts = get_verdicts(update, context)
+    keyword = verdicts.warn
+    if keyword is UNKNOWN:
+        chat_warn_filters = await sql.get_chat_warn_triggers(chat.id)
+        keyword = verdicts.warn = next(
+            (keyword for keyword in chat_warn_filters if view.contains(keyword)), None
+        )
+    if keyword is None:
+        return ""
+    warn_filter = await sql.get_warn_filter(chat.id, keyword)
+    return await warn(user, chat, warn_filter.reply, message)
 
 
 @user_admin
@@ -392,7 +398,7 @@ async def set_warn_limit(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             if int(args[0]) < 3:
                 await msg.reply_text("The minimum warn limit is 3!")
             else:
-                sql.set_warn_limit(chat.id, int(args[0]))
+                await sql.set_warn_limit(chat.id, int(args[0]))
                 await msg.reply_text(f"Updated the warn limit to {args[0]}")
                 return (
                     f"<b>{html.escape(chat.title)}:</b>\n"
@@ -403,7 +409,8 @@ async def set_warn_limit(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         else:
             await msg.reply_text("Give me a number as an arg!")
     else:
-        limit, soft_warn = sql.get_warn_setting(chat.id)
+        config = await get_chat_config(chat.id)
+        limit, soft_warn = config.warn_limit, config.soft_warn
         await msg.reply_text(f"The current warn limit is {limit}")
     return ""
 
@@ -417,7 +424,7 @@ async def set_warn_strength(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     if args:
         if args[0].lower() in ("on", "yes"):
-            sql.set_warn_strength(chat.id, False)
+            await sql.set_warn_strength(chat.id, False)
             await msg.reply_text("Too many warns will now result in a Ban!")
             return (
                 f"<b>{html.escape(chat.title)}:</b>\n"
@@ -425,7 +432,7 @@ async def set_warn_strength(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 f"Has enabled strong warns. Users will be seriously punched.(banned)"
             )
         elif args[0].lower() in ("off", "no"):
-            sql.set_warn_strength(chat.id, True)
+            await sql.set_warn_strength(chat.id, True)
             await msg.reply_text(
                 "Too many warns will now result in a normal punch! Users will be able to join again after.",
             )
@@ -437,7 +444,8 @@ async def set_warn_strength(update: Update, context: ContextTypes.DEFAULT_TYPE):
         else:
             await msg.reply_text("I only understand on/yes/no/off!")
     else:
-        limit, soft_warn = sql.get_warn_setting(chat.id)
+        config = await get_chat_config(chat.id)
+        limit, soft_warn = config.warn_limit, config.soft_warn
         if soft_warn:
             await msg.reply_text(
                 "Warns are currently set to *punch* users when they exceed the limits.",
@@ -508,7 +516,7 @@ LIST_WARN_HANDLER = DisableAbleCommandHandler(
     ["warnlist", "warnfilters"], list_warn_filters, filters=filters.ChatType.GROUPS, admin_ok=True,
 )
 WARN_FILTER_HANDLER = MessageHandler(
-    filters.TEXT & filters.ChatType.GROUPS, reply_filter,
+    filters.TEXT & filters.ChatType.GROUPS & ChatFeature(Feature.WARN_FILTERS), reply_filter,
 )
 WARN_LIMIT_HANDLER = CommandHandler("warnlimit", set_warn_limit, filters=filters.ChatType.GROUPS)
 WARN_STRENGTH_HANDLER = CommandHandler(
@@ -34,6 +34,7 @@ from Hina.modules.helper_funcs.string_handling import (
     markdown_parser,
 )
 from Hina.modules.log_channel import loggable
+from Hina.modules.sql.chat_config_sql import get_chat_config
 from Hina.modules.sql.global_bans_sql import is_user_gbanned
 from telegram import (
     ChatPermissions,
@@ -158,9 +159,13 @@ async def new_member(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user = update.effective_user
     msg = update.effective_message
 
-    should_welc, cust_welcome, cust_content, welc_type = sql.get_welc_pref(chat.id)
-    welc_mutes = sql.welcome_mutes(chat.id)
-    human_checks = sql.get_human_checks(user.id, chat.id)
+    config = await get_chat_config(chat.id)
+    should_welc = config.should_welcome
+    cust_welcome = config.custom_welcome
+    cust_content = config.custom_content
+    welc_type = config.welcome_type
+    welc_mutes = config.welcome_mutes
+    human_checks = await sql.get_human_checks(user.id, chat.id)
 
     new_members = update.effective_message.new_chat_members
 
@@ -211,7 +216,7 @@ async def new_member(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         if should_welc:
             reply = update.message.message_id
-            cleanserv = sql.clean_service(chat.id)
+            cleanserv = config.clean_service
             # Clean service welcome
             if cleanserv:
                 try:
@@ -490,7 +495,7 @@ async def new_member(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 )
             else:
                 sent = await send(update, res, keyboard, backup_message)
-            prev_welc = sql.get_clean_pref(chat.id)
+            prev_welc = config.clean_welcome
             if prev_welc:
                 try:
                     await bot.delete_message(chat.id, prev_welc)
@@ -561,14 +566,17 @@ async def left_member(update: Update, context: ContextTypes.DEFAULT_TYPE):
     bot = context.bot
     chat = update.effective_chat
     user = update.effective_user
-    should_goodbye, cust_goodbye, goodbye_type = sql.get_gdbye_pref(chat.id)
+    config = await get_chat_config(chat.id)
+    should_goodbye = config.should_goodbye
+    cust_goodbye = config.custom_leave
+    goodbye_type = config.leave_type
 
     if user.id == bot.id:
         return
 
     if should_goodbye:
         reply = update.message.message_id
-        cleanserv = sql.clean_service(chat.id)
+        cleanserv = config.clean_service
         # Clean service welcome
         if cleanserv:
             try:
@@ -910,7 +918,7 @@ async def welcomemute(update: Update, context: ContextTypes.DEFAULT_TYPE) -> str
             )
             return ""
     else:
-        curr_setting = sql.welcome_mutes(chat.id)
+        curr_setting = (await get_chat_config(chat.id)).welcome_mutes
         reply = (
             f"\n Give me a setting!\nChoose one out of: <code>off</code>/<code>no</code> or <code>soft</code> or <code>strong</code> only! \n"
             f"Current setting: <code>{curr_setting}</code>"
@@ -927,7 +935,7 @@ async def clean_welcome(update: Update, context: ContextTypes.DEFAULT_TYPE) -> s
     user = update.effective_user
 
     if not args:
-        clean_pref = sql.get_clean_pref(chat.id)
+        clean_pref = (await get_chat_config(chat.id)).clean_welcome
         if clean_pref:
             await update.effective_message.reply_text(
                 "I should be deleting welcome messages up to two days old.",
@@ -984,7 +992,7 @@ async def cleanservice(update: Update, context: ContextTypes.DEFAULT_TYPE) -> st
                 parse_mode=ParseMode.HTML,
             )
     else:
-        curr = sql.clean_service(chat.id)
+        curr = (await get_chat_config(chat.id)).clean_service
         if curr:
             await update.effective_message.reply_text(
                 "Welcome clean service is : <code>on</code>", parse_mode=ParseMode.HTML,
@@ -1045,7 +1053,7 @@ async def user_button(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     member_dict["backup_message"],
                 )
 
-            prev_welc = sql.get_clean_pref(chat.id)
+            prev_welc = (await get_chat_config(chat.id)).clean_welcome
             if prev_welc:
                 try:
                     await bot.delete_message(chat.id, prev_welc)
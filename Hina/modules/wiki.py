@@ -1,6 +1,8 @@
 from Hina.config import app
+import asyncio
 import wikipedia
 from Hina.modules.disable import DisableAbleCommandHandler
+from Hina.modules.helper_funcs import response_cache
 from telegram import Update
 from telegram.constants import ParseMode
 from telegram.constants import ParseMode
@@ -8,7 +10,7 @@ from telegram.ext import ContextTypes, MessageHandler, BaseHandler
 from wikipedia.exceptions import DisambiguationError, PageError
 
 
-def wiki(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def wiki(update: Update, context: ContextTypes.DEFAULT_TYPE):
     msg = (
         update.effective_message.reply_to_message
         if update.effective_message.reply_to_message
@@ -20,16 +22,18 @@ def wiki(update: Update, context: ContextTypes.DEFAULT_TYPE):
     else:
         search = msg.text
     try:
-        res = wikipedia.summary(search)
+        res = await response_cache.cached(
+            "wiki", (search,), lambda: asyncio.to_thread(wikipedia.summary, search),
+        )
     except DisambiguationError as e:
-        update.message.reply_text(
+        await update.message.reply_text(
             "Disambiguated pages found! Adjust your query accordingly.\n<i>{}</i>".format(
                 e,
             ),
             parse_mode=ParseMode.HTML,
         )
     except PageError as e:
-        update.message.reply_text(
+        await update.message.reply_text(
             "<code>{}</code>".format(e), parse_mode=ParseMode.HTML,
         )
     if res:
@@ -40,7 +44,7 @@ def wiki(update: Update, context: ContextTypes.DEFAULT_TYPE):
             with open("result.txt", "w") as f:
                 f.write(f"{result}\n\nUwU OwO OmO UmU")
             with open("result.txt", "rb") as f:
-                context.bot.send_document(
+                await context.bot.send_document(
                     document=f,
                     filename=f.name,
                     reply_to_message_id=update.message.message_id,
@@ -48,7 +52,7 @@ def wiki(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     parse_mode=ParseMode.HTML,
                 )
         else:
-            update.message.reply_text(
+            await update.message.reply_text(
                 result, parse_mode=ParseMode.HTML, disable_web_page_preview=True,
             )
 
@@ -0,0 +1,94 @@
+"""Throughput and latency of sed (/s) evaluation through the regex sandbox.
+
+Runs the same three steps as the sed handler (whole-message check, loop
+check, substitution) for a mix of ordinary and pathological patterns.
+
+    python benchmarks/sed_benchmark.py [--requests 500] [--concurrency 20] [--evil 0.05]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Hina.modules.helper_funcs import regex_helper  # noqa: E402
+
+TEXT = (
+    "The quick brown fox jumps over the lazy dog while the bot keeps "
+    "answering everyone in the group without missing a beat. " * 8
+)
+NORMAL = [
+    ("fox", "cat", 1, 0),
+    ("quick (brown)", r"slow \1", 1, 0),
+    (r"\bthe\b", "a", 0, 2),
+    (r"(\w+) (\w+)", r"\2 \1", 0, 0),
+    ("o", "0", 0, 0),
+]
+# Catastrophic backtracking on a string without a match
+EVIL = [(r"(a|aa)+$", "x", 1, 0)]
+EVIL_TEXT = "a" * 40 + "!"
+
+
+async def one_request(pattern, repl, count, flags, text, latencies, outcomes):
+    start = time.perf_counter()
+    try:
+        await regex_helper.regex_match(pattern, text, flags)
+        if await regex_helper.infinite_loop_check(pattern):
+            outcomes["refused"] += 1
+        else:
+            await regex_helper.regex_sub(pattern, repl, text, count, flags)
+            outcomes["ok"] += 1
+    except regex_helper.SandboxTimeout:
+        outcomes["timeout"] += 1
+    except regex_helper.SandboxError:
+        outcomes["error"] += 1
+    latencies.append(time.perf_counter() - start)
+
+
+async def main(args):
+    rng = random.Random(args.seed)
+    jobs = []
+    for _ in range(args.requests):
+        if rng.random() < args.evil:
+            jobs.append(EVIL[0] + (EVIL_TEXT,))
+        else:
+            jobs.append(rng.choice(NORMAL) + (TEXT,))
+
+    latencies = []
+    outcomes = {"ok": 0, "refused": 0, "timeout": 0, "error": 0}
+    limit = asyncio.Semaphore(args.concurrency)
+
+    async def limited(job):
+        async with limit:
+            await one_request(*job, latencies, outcomes)
+
+    # Warm up the workers so process start-up isn't measured
+    await regex_helper.regex_sub("a", "b", "a")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(limited(job) for job in jobs))
+    elapsed = time.perf_counter() - start
+    regex_helper.sandbox.shutdown()
+
+    latencies.sort()
+    print(f"requests     {len(jobs)} ({args.concurrency} concurrent, {args.evil:.0%} pathological)")
+    print(f"elapsed      {elapsed:.2f}s")
+    print(f"throughput   {len(jobs) / elapsed:.1f} req/s")
+    print(f"latency p50  {statistics.median(latencies) * 1000:.2f}ms")
+    print(f"latency p95  {latencies[int(len(latencies) * 0.95) - 1] * 1000:.2f}ms")
+    print(f"latency max  {latencies[-1] * 1000:.2f}ms")
+    print(f"outcomes     {outcomes}")
+    print(f"sandbox      {regex_helper.sandbox.stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--evil", type=float, default=0.0, help="share of pathological patterns")
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(main(parser.parse_args()))
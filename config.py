@@ -58,6 +58,12 @@ class Development:
     SUPPORT_CHAT = "your_support_chat"
     SPAMWATCH_SUPPORT_CHAT = None
     SPAMWATCH_API = None
+    SPAMWATCH_API_URL = None
+    SPAMWATCH_MIRROR = False
+    RESPONSE_CACHE_FILE = None
+    SPAM_WAVE_CHATS = 5
+    SPAM_WAVE_WINDOW = 600
+    SPAM_WAVE_DELETE = False
     BL_CHATS = []
 
 if ENV:
@@ -106,6 +112,12 @@ if ENV:
     SUPPORT_CHAT = os.environ.get("SUPPORT_CHAT")
     SPAMWATCH_SUPPORT_CHAT = os.environ.get("SPAMWATCH_SUPPORT_CHAT")
     SPAMWATCH_API = os.environ.get("SPAMWATCH_API")
+    SPAMWATCH_API_URL = os.environ.get("SPAMWATCH_API_URL")
+    SPAMWATCH_MIRROR = bool(os.environ.get("SPAMWATCH_MIRROR", False))
+    RESPONSE_CACHE_FILE = os.environ.get("RESPONSE_CACHE_FILE")
+    SPAM_WAVE_CHATS = int(os.environ.get("SPAM_WAVE_CHATS", 5))
+    SPAM_WAVE_WINDOW = int(os.environ.get("SPAM_WAVE_WINDOW", 600))
+    SPAM_WAVE_DELETE = bool(os.environ.get("SPAM_WAVE_DELETE", False))
 
     try:
         BL_CHATS = set(map(int, os.environ.get("BL_CHATS", "").split()))
@@ -146,6 +158,12 @@ else:
     SUPPORT_CHAT = Development.SUPPORT_CHAT
     SPAMWATCH_SUPPORT_CHAT = Development.SPAMWATCH_SUPPORT_CHAT
     SPAMWATCH_API = Development.SPAMWATCH_API
+    SPAMWATCH_API_URL = Development.SPAMWATCH_API_URL
+    SPAMWATCH_MIRROR = Development.SPAMWATCH_MIRROR
+    RESPONSE_CACHE_FILE = Development.RESPONSE_CACHE_FILE
+    SPAM_WAVE_CHATS = Development.SPAM_WAVE_CHATS
+    SPAM_WAVE_WINDOW = Development.SPAM_WAVE_WINDOW
+    SPAM_WAVE_DELETE = Development.SPAM_WAVE_DELETE
     BL_CHATS = set(Development.BL_CHATS)
 
 # === Shared Templates ===